@@ -4,6 +4,8 @@ from flask_login import LoginManager
 from .config import Config
 from .models.user import User
 from .celery_app import create_celery_app
+from . import database
+from .utils import query_profiler
 import pytz # <-- Import the timezone library
 
 # --- ADD THIS FUNCTION ---
@@ -28,6 +30,11 @@ def create_app():
     app.jinja_env.filters['datetime_ist'] = format_datetime_ist
 
     app.celery = create_celery_app(app)
+    query_profiler.init_app(app)
+    database.init_app(app)
+
+    from .cli import register_commands
+    register_commands(app)
 
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -45,6 +52,8 @@ def create_app():
     from .routes.scheduler_routes import scheduler_bp
     from .routes.sequence_routes import sequence_bp
     from .routes.smtp_routes import smtp_bp
+    from .routes.diagnostics_routes import diagnostics_bp
+    from .routes.segment_routes import segment_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
@@ -54,5 +63,7 @@ def create_app():
     app.register_blueprint(scheduler_bp)
     app.register_blueprint(sequence_bp)
     app.register_blueprint(smtp_bp)
+    app.register_blueprint(diagnostics_bp)
+    app.register_blueprint(segment_bp)
 
     return app
\ No newline at end of file
@@ -1,11 +1,20 @@
 # app/celery_app.py (Corrected)
 
 from celery import Celery
+from flask import g
 from celery.schedules import crontab
 
 # THE FIX: Create the celery instance globally, but without any configuration.
 # The task modules will import this instance to use its decorators.
-celery = Celery(__name__, include=['app.utils.email_scheduler'])
+celery = Celery(__name__, include=[
+    'app.utils.email_scheduler',
+    'app.utils.sent_email_archive',
+    'app.utils.contact_importer',
+    'app.utils.chunked_upload',
+    'app.utils.contact_maintenance',
+    'app.utils.background_deletes',
+    'app.utils.stats_maintenance',
+])
 
 def create_celery_app(app=None):
     """
@@ -22,6 +31,34 @@ def create_celery_app(app=None):
                 # Set the schedule to run every minute
                 'schedule': crontab(minute='*'),
             },
+            'maintain-sent-email-partitions-daily': {
+                'task': 'app.utils.sent_email_archive.maintain_sent_email_partitions',
+                'schedule': crontab(hour=2, minute=30),
+            },
+            'reconcile-list-counts-hourly': {
+                'task': 'app.utils.contact_maintenance.reconcile_list_counts',
+                'schedule': crontab(minute=45),
+            },
+            'reconcile-user-stats-hourly': {
+                'task': 'app.utils.stats_maintenance.reconcile_user_stats',
+                'schedule': crontab(minute=50),
+            },
+            'refresh-dirty-segments-every-minute': {
+                'task': 'app.utils.contact_maintenance.refresh_dirty_segments',
+                'schedule': crontab(minute='*'),
+            },
+            'refresh-time-based-segments-hourly': {
+                'task': 'app.utils.contact_maintenance.refresh_time_based_segments',
+                'schedule': crontab(minute=5),
+            },
+            'purge-tombstones-hourly': {
+                'task': 'app.utils.background_deletes.purge_tombstones',
+                'schedule': crontab(minute=35),
+            },
+            'purge-stale-chunked-uploads-hourly': {
+                'task': 'app.utils.chunked_upload.purge_stale_uploads',
+                'schedule': crontab(minute=15),
+            },
         }
     )
     celery.conf.update(app.config)
@@ -29,6 +66,8 @@ def create_celery_app(app=None):
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
             with app.app_context():
+                # Labels this task in per-task query statistics (see app.utils.query_profiler).
+                g.task_name = self.name
                 return self.run(*args, **kwargs)
 
     celery.Task = ContextTask
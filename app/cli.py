@@ -0,0 +1,154 @@
+# app/cli.py
+
+import json
+import time
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+from app.models import email_stats
+from app.utils import csv_processor, email_validator, migrations, query_explainer, sent_email_archive
+
+db_cli = AppGroup('db', help='Schema migrations and query plan checks.')
+archive_cli = AppGroup('archive', help='Archival of old sent_emails partitions.')
+contacts_cli = AppGroup('contacts', help='Contact import tooling.')
+reports_cli = AppGroup('reports', help='Reporting rollup maintenance.')
+
+
+@db_cli.command('upgrade')
+@click.option('--target', default=None, help='Stop after this migration version (e.g. 0002).')
+def upgrade_command(target):
+    """Apply pending migrations from the migrations/ directory."""
+    applied = migrations.upgrade(target)
+    if not applied:
+        click.echo('Database schema is up to date.')
+    for filename in applied:
+        click.echo(f'Applied {filename}')
+
+
+@db_cli.command('status')
+def status_command():
+    """List migrations and whether each has been applied."""
+    applied = migrations.get_applied_versions()
+    if applied is None:
+        raise click.ClickException('Could not read the schema_migrations table.')
+    for version, filename in migrations.list_migrations():
+        click.echo(f"[{'x' if version in applied else ' '}] {filename}")
+
+
+@db_cli.command('explain')
+@click.option('--verbose', is_flag=True, help='Print the plan of every query, not only the full scans.')
+def explain_command(verbose):
+    """EXPLAIN every query in app/models and report full table/index scans."""
+    results = query_explainer.explain_model_queries()
+    flagged = failed = skipped = 0
+    for result in results:
+        if result['skipped']:
+            skipped += 1
+            if verbose:
+                click.echo(f"{result['location']}: skipped (query is assembled at runtime)")
+            continue
+        if result['error']:
+            failed += 1
+            click.echo(f"{result['location']}: EXPLAIN failed: {result['error']}")
+            continue
+        if result['full_scans']:
+            flagged += 1
+            click.echo(f"{result['location']}: FULL SCAN")
+            click.echo(f"    {result['query']}")
+            for row in result['full_scans']:
+                scan = 'table' if row.get('type') == 'ALL' else 'index'
+                click.echo(f"    - full {scan} scan on {row.get('table')} (~{row.get('rows')} rows, key={row.get('key')})")
+        elif verbose:
+            click.echo(f"{result['location']}: ok")
+            for row in result['plan']:
+                click.echo(f"    - {row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}")
+    click.echo(f"{len(results) - skipped} queries checked, {flagged} with full scans, {failed} failed; "
+               f"{skipped} runtime-assembled queries skipped.")
+    if flagged or failed:
+        raise SystemExit(1)
+
+
+@archive_cli.command('run')
+def archive_run_command():
+    """Create upcoming sent_emails partitions and archive the expired ones now."""
+    created = sent_email_archive.ensure_future_partitions()
+    archived = sent_email_archive.archive_old_partitions()
+    click.echo(f"Created partitions: {', '.join(created) or 'none'}")
+    click.echo(f"Archived partitions: {', '.join(archived) or 'none'}")
+
+
+@archive_cli.command('query')
+@click.option('--start', required=True, help='Start date (YYYY-MM-DD), inclusive.')
+@click.option('--end', required=True, help='End date (YYYY-MM-DD), exclusive.')
+@click.option('--to-email', default=None)
+@click.option('--contact-id', default=None)
+@click.option('--user-id', default=None)
+@click.option('--sequence-id', default=None)
+def archive_query_command(start, end, to_email, contact_id, user_id, sequence_id):
+    """Print archived sent_emails rows in a date range as JSON lines."""
+    filters = {'to_email': to_email, 'contact_id': contact_id, 'user_id': user_id, 'sequence_id': sequence_id}
+    filters = {column: value for column, value in filters.items() if value is not None}
+    rows = sent_email_archive.iter_archived_sent_emails(
+        datetime.fromisoformat(start), datetime.fromisoformat(end), **filters
+    )
+    for row in rows:
+        click.echo(json.dumps(row))
+
+
+@contacts_cli.command('benchmark-validation')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--repeat', default=1, show_default=True, help='Timed runs per mode; the best run is reported.')
+def benchmark_validation_command(csv_path, repeat):
+    """Time row-wise against columnar (pandas) validation of a CSV file and compare their reports."""
+    modes = {
+        'row-wise': csv_processor.validate_csv_stream,
+        'columnar': csv_processor.validate_csv_stream_columnar,
+    }
+    results = {}
+    for mode, validate in modes.items():
+        best = None
+        for _ in range(repeat):
+            # Every run pays for its own domain lookups, so neither mode is timed against a warm cache.
+            email_validator.is_valid_domain.cache_clear()
+            with open(csv_path, 'rb') as csv_file:
+                start = time.perf_counter()
+                results[mode] = validate(csv_file)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        is_valid, errors, stats = results[mode]
+        rate = stats['rows_parsed'] / best if best else 0
+        click.echo(f"{mode:>9}: {best:.3f}s  {stats['rows_parsed']} rows ({rate:,.0f} rows/s), valid={is_valid}, errors={len(errors)}")
+
+    row_wise, columnar = results['row-wise'], results['columnar']
+    same = row_wise[0] == columnar[0] and row_wise[1] == columnar[1] and row_wise[2]['rows_valid'] == columnar[2]['rows_valid']
+    click.echo(f"In-file duplicate emails: {columnar[2]['duplicates']}")
+    click.echo('Reports match.' if same else 'Reports DIFFER between the two modes.')
+    if not same:
+        raise SystemExit(1)
+
+
+@reports_cli.command('rebuild-rollups')
+@click.option('--start', default=None, help='First day to rebuild (YYYY-MM-DD); defaults to the oldest sent email.')
+@click.option('--end', default=None, help='Day to stop before (YYYY-MM-DD); defaults to the day after the newest sent email.')
+def rebuild_rollups_command(start, end):
+    """Backfill or rebuild the hourly/daily email stats rollups from sent_emails, then the per-user totals."""
+    start_date = datetime.fromisoformat(start).date() if start else None
+    end_date = datetime.fromisoformat(end).date() if end else None
+    failed = 0
+    for day, counted in email_stats.rebuild_email_stats(start_date, end_date):
+        if counted is None:
+            failed += 1
+            click.echo(f"{day}: FAILED")
+        else:
+            click.echo(f"{day}: {counted} emails")
+    drifted = email_stats.reconcile_user_email_stats()
+    click.echo(f"Corrected per-user totals of {len(drifted)} users.")
+    if failed:
+        raise click.ClickException(f'{failed} days could not be rebuilt; see the log.')
+
+
+def register_commands(app):
+    app.cli.add_command(db_cli)
+    app.cli.add_command(archive_cli)
+    app.cli.add_command(contacts_cli)
+    app.cli.add_command(reports_cli)
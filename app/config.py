@@ -2,15 +2,103 @@
 
 import os
 
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'a-very-secret-key'
     MYSQL_HOST = os.environ.get('MYSQL_HOST', 'localhost')
     MYSQL_USER = os.environ.get('MYSQL_USER', 'default_user')
     MYSQL_DB = os.environ.get('MYSQL_DB', 'default_db')
 
+    # --- DATABASE POOL ---
+    # PROCESS_ROLE is 'web' for gunicorn/Passenger workers and 'worker' for the
+    # eventlet Celery worker (set in celery_worker.py); each role sizes its own pool.
+    PROCESS_ROLE = os.environ.get('PROCESS_ROLE', 'web')
+    DB_POOL_SETTINGS = {
+        'web': {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE_WEB', 5)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW_WEB', 10)),
+        },
+        'worker': {
+            'pool_size': int(os.environ.get('DB_POOL_SIZE_WORKER', 20)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW_WORKER', 30)),
+        },
+    }
+    # Seconds to wait for a free pooled connection before failing the checkout.
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 3600))
+    DB_POOL_WAIT_WARN_MS = float(os.environ.get('DB_POOL_WAIT_WARN_MS', 250))
+    DB_SESSION_TIME_ZONE = os.environ.get('DB_SESSION_TIME_ZONE', '+05:30')
+
+    # --- READ REPLICA ---
+    # When set, reporting/dashboard/listing reads go to this host while its
+    # replication lag stays within REPLICA_MAX_LAG_SECONDS (reading the lag needs
+    # the REPLICATION CLIENT privilege on the replica).
+    MYSQL_REPLICA_HOST = os.environ.get('MYSQL_REPLICA_HOST')
+    REPLICA_MAX_LAG_SECONDS = int(os.environ.get('REPLICA_MAX_LAG_SECONDS', 10))
+    REPLICA_LAG_CHECK_INTERVAL = int(os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 15))
+
     # --- GEMINI API KEY ---
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 
     # --- NEW CELERY CONFIGURATION ---
     CELERY_BROKER_URL = 'redis://127.0.0.1:6379/0'
     CELERY_RESULT_BACKEND = 'redis://127.0.0.1:6379/0'
+
+    # --- QUERY PROFILER ---
+    # Records per-request/task query counts, logs slow statements and flags
+    # statements repeated more than N_PLUS_ONE_THRESHOLD times (likely N+1 loops).
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))
+
+    # --- SENT EMAIL ARCHIVAL ---
+    # Months of sent_emails kept in the hot table; older monthly partitions are
+    # exported to gzip JSONL under ARCHIVE_DIR and dropped.
+    SENT_EMAILS_HOT_MONTHS = int(os.environ.get('SENT_EMAILS_HOT_MONTHS', 6))
+    SENT_EMAILS_PARTITIONS_AHEAD = int(os.environ.get('SENT_EMAILS_PARTITIONS_AHEAD', 2))
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+
+    # --- CONTACT IMPORTS ---
+    # Uploaded files wait here for the Celery import job; the web app and the
+    # worker must both be able to reach this directory.
+    UPLOAD_DIR = os.environ.get('UPLOAD_DIR', os.path.join(BASE_DIR, 'uploads'))
+    # Files of at least CHUNKED_UPLOAD_MIN_BYTES are sent by the browser in
+    # UPLOAD_CHUNK_SIZE pieces that can be retried and resumed; unfinished
+    # uploads are deleted after CHUNKED_UPLOAD_TTL_HOURS.
+    CHUNKED_UPLOAD_MIN_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MIN_BYTES', 20 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+    CHUNKED_UPLOAD_MAX_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+    CHUNKED_UPLOAD_TTL_HOURS = int(os.environ.get('CHUNKED_UPLOAD_TTL_HOURS', 24))
+    # Files of at least EMAIL_VALIDATION_PARALLEL_MIN_BYTES have their emails
+    # validated across this many processes (0 disables the process pool).
+    EMAIL_VALIDATION_PROCESSES = int(os.environ.get('EMAIL_VALIDATION_PROCESSES', 0))
+    EMAIL_VALIDATION_PARALLEL_MIN_BYTES = int(os.environ.get('EMAIL_VALIDATION_PARALLEL_MIN_BYTES', 20 * 1024 * 1024))
+    # Files of at least this size are validated column-wise with pandas (0 = never).
+    # Off by default: it is not measurably faster than the row-wise path without
+    # pyarrow; compare on real files with `flask contacts benchmark-validation`.
+    COLUMNAR_VALIDATION_MIN_BYTES = int(os.environ.get('COLUMNAR_VALIDATION_MIN_BYTES', 0))
+
+    # --- BACKGROUND DELETES ---
+    # Deleted lists/sequences are hidden at once and their rows removed by a
+    # Celery task DELETE_BATCH_SIZE rows per committed transaction, pausing
+    # DELETE_BATCH_PAUSE_SECONDS between batches so other queries get the locks.
+    DELETE_BATCH_SIZE = int(os.environ.get('DELETE_BATCH_SIZE', 1000))
+    DELETE_BATCH_PAUSE_SECONDS = float(os.environ.get('DELETE_BATCH_PAUSE_SECONDS', 0.2))
+
+    # --- CACHE ---
+    # Redis used for shared caches (not the Celery broker database). Dashboard
+    # stats are computed by one request at a time and shared for
+    # DASHBOARD_STATS_CACHE_SECONDS across every user and tab.
+    REDIS_URL = os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1')
+    CACHE_SOCKET_TIMEOUT = float(os.environ.get('CACHE_SOCKET_TIMEOUT', 0.5))
+    DASHBOARD_STATS_CACHE_SECONDS = int(os.environ.get('DASHBOARD_STATS_CACHE_SECONDS', 15))
+    # Scheduled-emails calendar windows are cached until a step in them changes, at most this long.
+    CALENDAR_CACHE_SECONDS = int(os.environ.get('CALENDAR_CACHE_SECONDS', 300))
+
+    # --- LIVE UPDATES ---
+    # Each open dashboard/home page holds a Server-Sent Events stream, which
+    # needs an async worker (gunicorn eventlet). Under sync workers such as
+    # Passenger's, turn it off and let the pages poll every LIVE_RESYNC_SECONDS.
+    LIVE_EVENTS_ENABLED = os.environ.get('LIVE_EVENTS_ENABLED', 'true').lower() == 'true'
+    LIVE_RESYNC_SECONDS = int(os.environ.get('LIVE_RESYNC_SECONDS', 60))
@@ -1,46 +1,408 @@
 # app/database.py (Corrected)
 
 import mysql.connector
-from sqlalchemy import create_engine
-from sqlalchemy.pool import QueuePool
+from contextlib import contextmanager
+from flask import g, has_app_context, has_request_context, session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from app.config import Config
+from app.utils.query_profiler import instrument_engine, profile_connection
 import os
 import logging
+import threading
+import time
+from datetime import timedelta
 from urllib.parse import quote_plus # <-- IMPORT THIS
 
 logger = logging.getLogger(__name__)
 
-try:
+def session_utc_offset():
+    """
+    Offset of DB_SESSION_TIME_ZONE from UTC. NOW() and every DATETIME the app
+    writes with it (e.g. sent_emails.sent_at) are in this zone, while
+    schedule_time is stored in UTC. Only fixed offsets ('+05:30') are supported.
+    """
+    zone = Config.DB_SESSION_TIME_ZONE
+    sign = -1 if zone.startswith('-') else 1
+    hours, minutes = zone.lstrip('+-').split(':')
+    return sign * timedelta(hours=int(hours), minutes=int(minutes))
+
+
+class PoolTelemetry:
+    """Checkout counters for one engine's pool, exported by get_pool_stats()."""
+
+    def __init__(self, name, engine, max_overflow):
+        self.name = name
+        self.engine = engine
+        self.max_overflow = max_overflow
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record_wait(self, wait_ms):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        if wait_ms >= Config.DB_POOL_WAIT_WARN_MS:
+            logger.warning(f"Waited {wait_ms:.0f} ms for a '{self.name}' DB connection ({self.describe()})")
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def describe(self):
+        pool = self.engine.pool
+        return f"size={pool.size()}, checked_out={pool.checkedout()}, overflow={pool.overflow()}"
+
+    def snapshot(self):
+        pool = self.engine.pool
+        with self._lock:
+            return {
+                'role': Config.PROCESS_ROLE,
+                'pool_size': pool.size(),
+                'max_overflow': self.max_overflow,
+                'timeout_s': pool.timeout(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'physical_connects': self.connects,
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait_ms, 2)
+            }
+
+
+def _build_engine(name, host):
+    """Creates a pooled engine sized for this process role, with connect-time session setup."""
     # THE FIX: We now URL-encode the password to handle special characters
     db_password = quote_plus(os.getenv('MYSQL_PASSWORD'))
-    
-    DATABASE_URI = (
+    database_uri = (
         f"mysql+mysqlconnector://{Config.MYSQL_USER}:{db_password}@"
-        f"{Config.MYSQL_HOST}/{Config.MYSQL_DB}?charset=utf8mb4"
+        f"{host}/{Config.MYSQL_DB}?charset=utf8mb4"
     )
+    pool_settings = Config.DB_POOL_SETTINGS.get(Config.PROCESS_ROLE, Config.DB_POOL_SETTINGS['web'])
 
-    engine = create_engine(
-        DATABASE_URI,
-        pool_size=5,
-        max_overflow=10,
-        pool_recycle=3600
+    new_engine = create_engine(
+        database_uri,
+        pool_size=pool_settings['pool_size'],
+        max_overflow=pool_settings['max_overflow'],
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE
     )
+    telemetry = PoolTelemetry(name, new_engine, pool_settings['max_overflow'])
+
+    @event.listens_for(new_engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        # Session settings survive for the life of the physical connection,
+        # so they are applied once here instead of on every checkout.
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET time_zone='{Config.DB_SESSION_TIME_ZONE}'")
+        cursor.close()
+        telemetry.record_connect()
+
+    instrument_engine(new_engine)
+    return new_engine, telemetry
+
+
+try:
+    engine, pool_telemetry = _build_engine('primary', Config.MYSQL_HOST)
     logger.info("Database connection pool established successfully.")
 
 except Exception as e:
     logger.critical(f"FATAL ERROR: Could not create database engine. {e}")
-    engine = None
+    engine, pool_telemetry = None, None
+
+# Optional read replica for reporting, dashboard and listing queries.
+replica_engine, replica_telemetry = None, None
+if Config.MYSQL_REPLICA_HOST:
+    try:
+        replica_engine, replica_telemetry = _build_engine('replica', Config.MYSQL_REPLICA_HOST)
+        logger.info(f"Read replica pool established for {Config.MYSQL_REPLICA_HOST}.")
+    except Exception as e:
+        logger.error(f"Could not create read replica engine, reads will use the primary. {e}")
+
+
+class ReplicaLagMonitor:
+    """Caches the replica's reported lag so it is checked at most once per interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lag_seconds = None
+        self.checked_at = 0.0
+
+    def _query_lag(self):
+        conn = _checkout_connection(replica_engine, replica_telemetry)
+        if not conn:
+            return None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+                status = cursor.fetchone()
+                lag_key = 'Seconds_Behind_Source'
+            except mysql.connector.Error:
+                # Servers older than MySQL 8.0.22 only know the legacy statement.
+                cursor.execute("SHOW SLAVE STATUS")
+                status = cursor.fetchone()
+                lag_key = 'Seconds_Behind_Master'
+            cursor.close()
+            # NULL lag means replication is stopped or broken.
+            return status.get(lag_key) if status else None
+        except mysql.connector.Error as e:
+            logger.warning(f"Could not read replica lag: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def is_healthy(self):
+        now = time.monotonic()
+        if now - self.checked_at >= Config.REPLICA_LAG_CHECK_INTERVAL:
+            with self._lock:
+                if now - self.checked_at >= Config.REPLICA_LAG_CHECK_INTERVAL:
+                    self.lag_seconds = self._query_lag()
+                    self.checked_at = now
+                    if self.lag_seconds is None or self.lag_seconds > Config.REPLICA_MAX_LAG_SECONDS:
+                        logger.warning(f"Read replica lag is {self.lag_seconds}s; routing reads to the primary.")
+        return self.lag_seconds is not None and self.lag_seconds <= Config.REPLICA_MAX_LAG_SECONDS
+
+
+replica_lag = ReplicaLagMonitor()
+
+
+def get_pool_stats():
+    """Snapshot of pool usage for the diagnostics endpoint."""
+    if not pool_telemetry:
+        return {}
+    stats = {'primary': pool_telemetry.snapshot()}
+    if replica_telemetry:
+        stats['replica'] = dict(replica_telemetry.snapshot(), lag_seconds=replica_lag.lag_seconds)
+    return stats
+
+class UnitOfWorkAborted(Exception):
+    """Raised when a unit of work had to be rolled back because one of its statements failed."""
+
+
+class ScopedConnection:
+    """
+    A connection shared by every model call made during one request or Celery task.
+
+    Model functions keep their usual `conn.commit()` / `conn.close()` calls: close()
+    only rolls back whatever the call left open (exactly what returning the
+    connection to the pool used to do), and the physical connection is handed back
+    to the pool once, when the app context is torn down. Inside a unit_of_work(),
+    commit/rollback are deferred until the unit finishes.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._unit_depth = 0
+        self._rollback_only = False
+        self.broken = False
+        self.wrote = False
+
+    def cursor(self, *args, **kwargs):
+        return self._connection.cursor(*args, **kwargs)
+
+    def is_connected(self):
+        # Avoids the server ping mysql-connector does here; liveness is
+        # checked when the connection goes back to the pool.
+        return not self.broken
 
-def get_db_connection():
-    if not engine:
+    def commit(self):
+        self.wrote = True
+        if self._unit_depth:
+            return
+        self._connection.commit()
+
+    def rollback(self):
+        if self._unit_depth:
+            self._rollback_only = True
+            return
+        self._connection.rollback()
+
+    def start_transaction(self, *args, **kwargs):
+        if self._unit_depth:
+            return
+        self._connection.start_transaction(*args, **kwargs)
+
+    def close(self):
+        if self._unit_depth:
+            return
+        try:
+            if self._connection.in_transaction or getattr(self._connection, 'unread_result', False):
+                self._connection.rollback()
+        except Exception as e:
+            logger.warning(f"Discarding request-scoped DB connection after error: {e}")
+            self.broken = True
+
+    def begin_unit(self):
+        if self._unit_depth == 0:
+            if self._connection.in_transaction:
+                self._connection.rollback()
+            self._connection.start_transaction()
+            self._rollback_only = False
+        self._unit_depth += 1
+
+    def end_unit(self, commit):
+        self._unit_depth -= 1
+        if self._unit_depth:
+            if not commit:
+                self._rollback_only = True
+            return True
+        if commit and not self._rollback_only:
+            self._connection.commit()
+            return True
+        self._connection.rollback()
+        self._rollback_only = False
+        return False
+
+    def release(self):
+        try:
+            self._connection.close()
+        except Exception as e:
+            logger.error(f"Error returning DB connection to pool: {e}")
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def _checkout_connection(pool_engine=None, telemetry=None):
+    if pool_engine is None:
+        pool_engine, telemetry = engine, pool_telemetry
+    if not pool_engine:
         logger.error("Database engine is not available.")
         return None
+    start = time.perf_counter()
     try:
-        conn = engine.raw_connection()
-        cursor = conn.cursor()
-        cursor.execute("SET time_zone='+05:30'")
-        cursor.close()
-        return conn
+        conn = pool_engine.raw_connection()
+    except PoolTimeoutError:
+        telemetry.record_timeout()
+        logger.error(
+            f"DB pool exhausted: no '{telemetry.name}' connection became free within {Config.DB_POOL_TIMEOUT}s "
+            f"({telemetry.describe()}, role={Config.PROCESS_ROLE}). "
+            f"Raise the pool size for this role or look for requests holding connections."
+        )
+        return None
     except Exception as e:
         logger.error(f"Error getting DB connection from pool: {e}")
-        return None
\ No newline at end of file
+        return None
+    telemetry.record_wait((time.perf_counter() - start) * 1000)
+    return profile_connection(conn)
+
+
+def _scoped_connection(key, pool_engine=None, telemetry=None):
+    scoped = g.get(key)
+    if scoped is not None and scoped.broken:
+        g.pop(key).release()
+        scoped = None
+    if scoped is None:
+        conn = _checkout_connection(pool_engine, telemetry)
+        if not conn:
+            return None
+        scoped = ScopedConnection(conn)
+        setattr(g, key, scoped)
+    return scoped
+
+
+def get_db_connection(reuse=True):
+    """
+    Returns a connection to the primary for a model call.
+
+    Inside an app context (every request, and every Celery task via ContextTask)
+    the same pooled connection is reused for the whole request/task. Pass
+    reuse=False for a dedicated connection the caller fully owns, e.g. one held
+    open by a streaming response.
+    """
+    if not reuse or not has_app_context():
+        return _checkout_connection()
+    return _scoped_connection('_db_connection')
+
+
+def _reads_pinned_to_primary():
+    primary = g.get('_db_connection')
+    if primary is not None and (primary._unit_depth or primary.wrote):
+        return True
+    # Users who just wrote something keep reading from the primary until the
+    # replica is guaranteed to have caught up (read-your-writes).
+    return has_request_context() and session.get('_db_primary_until', 0) > time.time()
+
+
+def get_read_connection(reuse=True):
+    """
+    Returns a connection for reporting, dashboard and listing reads.
+
+    Uses the read replica when one is configured, its lag is within
+    REPLICA_MAX_LAG_SECONDS and the current user/request has no fresh writes
+    it must see; otherwise falls back to the primary.
+    """
+    if not replica_engine or (has_app_context() and _reads_pinned_to_primary()) or not replica_lag.is_healthy():
+        return get_db_connection(reuse)
+
+    if not reuse or not has_app_context():
+        conn = _checkout_connection(replica_engine, replica_telemetry)
+    else:
+        conn = _scoped_connection('_db_replica_connection', replica_engine, replica_telemetry)
+    return conn or get_db_connection(reuse)
+
+
+def _remember_primary_writes(response):
+    primary = g.get('_db_connection')
+    if primary is not None and primary.wrote and replica_engine:
+        session['_db_primary_until'] = time.time() + Config.REPLICA_MAX_LAG_SECONDS
+    return response
+
+
+def close_db_connection(exc=None):
+    """Teardown hook: returns the request/task-scoped connections to their pools."""
+    for key in ('_db_connection', '_db_replica_connection'):
+        scoped = g.pop(key, None)
+        if scoped is not None:
+            scoped.release()
+
+
+def init_app(app):
+    app.after_request(_remember_primary_writes)
+    app.teardown_appcontext(close_db_connection)
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Runs several model calls as one transaction:
+
+        with unit_of_work():
+            list_id = create_list(...)
+            save_contact(list_id, ...)
+
+    The intermediate commits made by the model functions are deferred; the whole
+    unit commits on a clean exit and rolls back if the block raises or if any
+    statement inside it rolled back (UnitOfWorkAborted is raised in that case).
+    """
+    owned = not has_app_context()
+    conn = get_db_connection()
+    if not conn:
+        raise UnitOfWorkAborted("Database connection is not available.")
+    if owned:
+        conn = ScopedConnection(conn)
+
+    conn.begin_unit()
+    try:
+        yield conn
+    except Exception:
+        conn.end_unit(commit=False)
+        raise
+    else:
+        if not conn.end_unit(commit=True):
+            raise UnitOfWorkAborted("Unit of work rolled back because one of its statements failed.")
+    finally:
+        if owned:
+            conn.release()
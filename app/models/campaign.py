@@ -2,7 +2,7 @@
 
 import mysql.connector
 from mysql.connector import Error
-from app.database import get_db_connection
+from app.database import get_db_connection, get_read_connection
 from app.config import Config
 import os
 import logging
@@ -32,7 +32,7 @@ def create_campaign(name, subject, body, created_by):
 
 def get_campaigns():
     """Retrieves all campaigns from the database."""
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
         return []
     try:
@@ -108,7 +108,7 @@ def update_campaign(campaign_id, name, subject, body):
 
 def get_all_campaigns(user_id):
     """Retrieves all campaigns created by a specific user."""
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
         return []
     try:
@@ -2,7 +2,8 @@
 
 import mysql.connector
 from mysql.connector import Error
-from app.database import get_db_connection
+from app.database import get_db_connection, get_read_connection
+from app.models.segment import mark_segment_contacts_dirty
 from app.config import Config
 import os
 import logging
@@ -34,21 +35,62 @@ def create_list(list_name, created_by):
         cursor.close()
         conn.close()
 
-def save_contact(list_id, name, email, location, company_name):
-    """Saves a new contact to a list, checking for duplicates."""
+# Upsert of the global contact identity (one row per normalized email). The
+# latest name wins; location/company are only overwritten by non-empty values
+# and a known validation result is kept when the new row carries none.
+_UPSERT_CONTACT_UPDATE = """
+    ON DUPLICATE KEY UPDATE
+        id = LAST_INSERT_ID(id),
+        name = VALUES(name),
+        location = IF(VALUES(location) <> '', VALUES(location), location),
+        company_name = IF(VALUES(company_name) <> '', VALUES(company_name), company_name),
+        email_valid = COALESCE(VALUES(email_valid), email_valid),
+        email_validated_at = COALESCE(VALUES(email_validated_at), email_validated_at)
+"""
+
+# Copies of the contact columns the contact browser sorts and searches on,
+# kept on list_membership so they can be indexed per list (see migration 0014).
+_MEMBERSHIP_SORT_COLUMNS = ('name', 'email', 'company_name', 'location')
+_SYNC_MEMBERSHIP_SORT_COLUMNS = (
+    "UPDATE list_membership m JOIN contacts c ON c.id = m.contact_id SET "
+    + ", ".join(f"m.{column} = c.{column}" for column in _MEMBERSHIP_SORT_COLUMNS)
+)
+
+
+def save_contact(list_id, name, email, location, company_name, email_validated=False):
+    """
+    Adds a person to a list: upserts their contact identity (keyed by
+    normalized email), adds the list membership, and bumps the list's record
+    count in the same transaction. Returns False if they are already on the
+    list. Pass email_validated=True when the caller already ran check_email on it.
+    """
     conn = get_db_connection()
     if not conn:
         return False
     try:
         cursor = conn.cursor()
         query = """
-            INSERT INTO contacts (list_id, name, email, location, company_name)
-            VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (list_id, name, email, location, company_name))
+            INSERT INTO contacts (name, email, location, company_name, email_valid, email_validated_at)
+            VALUES (%s, %s, %s, %s, %s, IF(%s, NOW(), NULL))
+        """ + _UPSERT_CONTACT_UPDATE
+        cursor.execute(query, (
+            name, email, location or '', company_name or '',
+            1 if email_validated else None, email_validated
+        ))
+        contact_id = cursor.lastrowid
+        # The upsert may have renamed someone already on other lists.
+        cursor.execute(_SYNC_MEMBERSHIP_SORT_COLUMNS + " WHERE m.contact_id = %s", (contact_id,))
+        cursor.execute(
+            "INSERT INTO list_membership (list_id, contact_id, name, email, company_name, location) "
+            "SELECT %s, id, name, email, company_name, location FROM contacts WHERE id = %s",
+            (list_id, contact_id)
+        )
+        cursor.execute("UPDATE lists SET records = records + 1 WHERE id = %s", (list_id,))
+        mark_segment_contacts_dirty(cursor, [contact_id])
         conn.commit()
         return True
     except Error as e:
+        conn.rollback()
         if e.errno == 1062:
             logger.warning(f"Attempted to add duplicate email {email} to list {list_id}")
         else:
@@ -58,14 +100,87 @@ def save_contact(list_id, name, email, location, company_name):
         cursor.close()
         conn.close()
 
+def bulk_save_contacts(list_id, contact_batches, batches_per_transaction=10, on_progress=None):
+    """
+    Adds batches of contacts to a list: per batch, one multi-row upsert of the
+    contact identities and one multi-row INSERT IGNORE of the memberships,
+    committing every `batches_per_transaction` batches instead of once per row.
+    People already on the list are counted as duplicates.
+    The list's record count grows with each batch, in the batch's transaction.
+    The contacts must already have passed email validation.
+    `on_progress(inserted, duplicates)` is called with running totals after each commit.
+
+    Returns (inserted_count, duplicate_count), or None if a database error
+    stopped the import (batches committed before the error are kept).
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    inserted = 0
+    duplicates = 0
+    pending_batches = 0
+    try:
+        cursor = conn.cursor()
+        for batch in contact_batches:
+            if not batch:
+                continue
+            placeholders = ", ".join(["(%s, %s, %s, %s, 1, NOW())"] * len(batch))
+            query = (
+                "INSERT INTO contacts (name, email, location, company_name, email_valid, email_validated_at) "
+                f"VALUES {placeholders}" + _UPSERT_CONTACT_UPDATE
+            )
+            params = []
+            for contact in batch:
+                params.extend((contact['name'], contact['email'], contact['location'], contact['company_name']))
+            cursor.execute(query, params)
+
+            email_placeholders = ", ".join(["LOWER(TRIM(%s))"] * len(batch))
+            emails = [contact['email'] for contact in batch]
+            cursor.execute(
+                "INSERT IGNORE INTO list_membership (list_id, contact_id, name, email, company_name, location) "
+                "SELECT %s, id, name, email, company_name, location "
+                f"FROM contacts WHERE email_normalized IN ({email_placeholders})",
+                (list_id, *emails)
+            )
+            # INSERT IGNORE reports only the memberships actually added.
+            batch_inserted = cursor.rowcount
+            # Existing people may have been renamed by the upsert on any of their lists.
+            cursor.execute(
+                _SYNC_MEMBERSHIP_SORT_COLUMNS
+                + f" WHERE c.email_normalized IN ({email_placeholders}) AND ("
+                + " OR ".join(f"m.{column} <> c.{column}" for column in _MEMBERSHIP_SORT_COLUMNS) + ")",
+                emails
+            )
+            if batch_inserted:
+                cursor.execute("UPDATE lists SET records = records + %s WHERE id = %s", (batch_inserted, list_id))
+            inserted += batch_inserted
+            duplicates += len(batch) - batch_inserted
+            pending_batches += 1
+            if pending_batches >= batches_per_transaction:
+                conn.commit()
+                pending_batches = 0
+                if on_progress:
+                    on_progress(inserted, duplicates)
+        conn.commit()
+        if on_progress:
+            on_progress(inserted, duplicates)
+        return inserted, duplicates
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error bulk saving contacts to list {list_id} after {inserted} inserts: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
 def get_lists():
     """Retrieves all contact lists from the database."""
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
         return []
     try:
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT id, list_name, records, created_at FROM lists ORDER BY created_at DESC"
+        query = "SELECT id, list_name, records, created_at FROM lists WHERE deleted_at IS NULL ORDER BY created_at DESC"
         cursor.execute(query)
         return cursor.fetchall()
     except Error as e:
@@ -84,7 +199,13 @@ def get_contacts_for_list(list_id):
     contacts = []  # Initialize an empty list
     try:
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT id, name, email, location, company_name FROM contacts WHERE list_id = %s"
+        query = """
+            SELECT c.id, c.name, c.email, c.location, c.company_name, c.email_valid, c.email_validated_at
+            FROM list_membership m
+            JOIN lists l ON l.id = m.list_id
+            JOIN contacts c ON c.id = m.contact_id
+            WHERE m.list_id = %s AND l.deleted_at IS NULL
+        """
         cursor.execute(query, (list_id,))
         contacts = cursor.fetchall() # Fetch all results into the list
     except Error as e:
@@ -98,6 +219,167 @@ def get_contacts_for_list(list_id):
             
     return contacts
 
+def record_email_validation(valid_ids, invalid_ids):
+    """Stores validation results on contacts so they are not validated again."""
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        cursor = conn.cursor()
+        for email_valid, contact_ids in ((1, valid_ids), (0, invalid_ids)):
+            if not contact_ids:
+                continue
+            placeholders = ", ".join(["%s"] * len(contact_ids))
+            cursor.execute(
+                f"UPDATE contacts SET email_valid = %s, email_validated_at = NOW() WHERE id IN ({placeholders})",
+                (email_valid, *contact_ids)
+            )
+        conn.commit()
+        return True
+    except Error as e:
+        logger.error(f"Error recording email validation results: {e}")
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+# Columns the contact browser can sort and search on.
+CONTACT_SORT_COLUMNS = ('id', 'name', 'email', 'company_name', 'location')
+CONTACT_SEARCH_COLUMNS = ('name', 'email', 'company_name', 'location')
+# SQL for each of them. All come from list_membership, so every order walks
+# its primary key or one of its (list_id, column) indexes.
+_CONTACT_COLUMN_SQL = {
+    'id': 'm.contact_id', 'name': 'm.name', 'email': 'm.email',
+    'company_name': 'm.company_name', 'location': 'm.location'
+}
+
+
+def _like_prefix(term):
+    """LIKE pattern for values starting with `term`; a prefix match can use the column index."""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+
+def get_contacts_page(list_id, limit=50, sort='id', descending=False, after=None, search=None, filters=None):
+    """
+    Returns one page of a list's contacts using keyset pagination.
+
+    `sort` is one of CONTACT_SORT_COLUMNS; rows are ordered by (sort, id).
+    `after` is the (sort value, id) of the last row of the previous page.
+    `search` matches the start of any of CONTACT_SEARCH_COLUMNS and `filters`
+    ({'company_name': 'Acme', ...}) must each match the start of that column.
+    Fetches limit + 1 rows so the caller can tell whether another page exists.
+    """
+    if sort not in CONTACT_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort contacts by {sort}")
+    conn = get_read_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        conditions = ["m.list_id = %s"]
+        params = [list_id]
+        if search:
+            pattern = _like_prefix(search)
+            conditions.append("(" + " OR ".join(
+                f"{_CONTACT_COLUMN_SQL[column]} LIKE %s" for column in CONTACT_SEARCH_COLUMNS
+            ) + ")")
+            params.extend([pattern] * len(CONTACT_SEARCH_COLUMNS))
+        for column, value in (filters or {}).items():
+            if column not in CONTACT_SEARCH_COLUMNS:
+                raise ValueError(f"Cannot filter contacts by {column}")
+            conditions.append(f"{_CONTACT_COLUMN_SQL[column]} LIKE %s")
+            params.append(_like_prefix(value))
+
+        comparison = '<' if descending else '>'
+        column = _CONTACT_COLUMN_SQL[sort]
+        if after is not None:
+            after_value, after_id = after
+            if sort == 'id':
+                conditions.append(f"m.contact_id {comparison} %s")
+                params.append(after_id)
+            else:
+                conditions.append(
+                    f"({column} {comparison} %s OR ({column} = %s AND m.contact_id {comparison} %s))"
+                )
+                params.extend([after_value, after_value, after_id])
+
+        order = 'DESC' if descending else 'ASC'
+        order_by = f"m.contact_id {order}" if sort == 'id' else f"{column} {order}, m.contact_id {order}"
+        query = f"""
+            SELECT c.id, c.name, c.email, c.location, c.company_name
+            FROM list_membership m
+            JOIN contacts c ON c.id = m.contact_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order_by}
+            LIMIT %s
+        """
+        params.append(limit + 1)
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    except Error as e:
+        logger.error(f"Error fetching contacts page for list {list_id}: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+EXPORT_COLUMNS = ('id', 'name', 'email', 'location', 'company_name', 'created_at',
+                  'last_sent_at', 'emails_sent', 'bounced')
+
+
+def iter_contacts_for_export(list_id):
+    """
+    Yields every contact of a list as a tuple of EXPORT_COLUMNS, in id order,
+    with its send history (last send, number of sends, bounced) looked up
+    per contact as rows are read. Rows stream from an unbuffered cursor on a dedicated
+    connection, so memory stays flat however large the list is; the
+    connection is released when the generator finishes or is closed.
+    """
+    conn = get_read_connection(reuse=False)
+    if not conn:
+        return
+    cursor = None
+    finished = False
+    try:
+        cursor = conn.cursor()
+        query = """
+            SELECT c.id, c.name, c.email, c.location, c.company_name, c.created_at,
+                   (SELECT CONCAT(COUNT(*), ' ', COALESCE(MAX(se.status = 'bounced'), 0), ' ', COALESCE(MAX(se.sent_at), ''))
+                    FROM sent_emails se WHERE se.contact_id = c.id) AS history,
+                   b.email IS NOT NULL
+            FROM list_membership m
+            JOIN contacts c ON c.id = m.contact_id
+            LEFT JOIN bounced_emails b ON b.email = c.email
+            WHERE m.list_id = %s
+            ORDER BY m.contact_id
+        """
+        # The send history is one correlated lookup per contact on
+        # idx_sent_emails_contact (contact_id, sent_at, status): contact_id
+        # cannot prune sent_emails' monthly partitions, so every partition is
+        # probed once, and the three figures come back packed in one value.
+        # A GROUP BY over the list's sends would be materialized before the
+        # first row streamed (and LATERAL needs MySQL 8.0.14).
+        cursor.execute(query, (list_id,))
+        for *contact, history, on_bounce_list in cursor:
+            if isinstance(history, (bytes, bytearray)):
+                history = history.decode('ascii')
+            emails_sent, bounced, last_sent_at = history.split(' ', 2)
+            yield (*contact, datetime.fromisoformat(last_sent_at) if last_sent_at else None,
+                   int(emails_sent), bool(on_bounce_list) or bounced == '1')
+        finished = True
+    except Error as e:
+        logger.error(f"Error exporting contacts for list {list_id}: {e}")
+    finally:
+        if finished or cursor is None:
+            if cursor is not None:
+                cursor.close()
+        else:
+            # The export was abandoned (client went away) with rows still
+            # unread; drop the connection instead of draining the result set.
+            conn.invalidate()
+        conn.close()
+
 def get_list_by_id(list_id):
     """Retrieves details for a single list by its ID."""
     conn = get_db_connection()
@@ -105,7 +387,7 @@ def get_list_by_id(list_id):
         return None
     try:
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT id, list_name, records, created_at FROM lists WHERE id = %s"
+        query = "SELECT id, list_name, records, created_at FROM lists WHERE id = %s AND deleted_at IS NULL"
         cursor.execute(query, (list_id,))
         return cursor.fetchone()
     except Error as e:
@@ -116,62 +398,227 @@ def get_list_by_id(list_id):
         conn.close()
 
 def update_list_records_count(list_id):
-    """Updates the 'records' count for a specific list."""
+    """
+    Recounts the 'records' of a specific list from its memberships. The count is
+    maintained incrementally by every insert/delete; this only repairs drift
+    (see reconcile_list_records_counts).
+    Returns True if the stored count was wrong, False if it was right, None on error.
+    """
     conn = get_db_connection()
     if not conn:
-        return
+        return None
     try:
         cursor = conn.cursor()
-        count_query = "SELECT COUNT(*) FROM contacts WHERE list_id = %s"
-        cursor.execute(count_query, (list_id,))
-        count = cursor.fetchone()[0]
-        update_query = "UPDATE lists SET records = %s WHERE id = %s"
-        cursor.execute(update_query, (count, list_id))
+        # The subquery is a locking read, so members added meanwhile wait instead of being missed.
+        update_query = """
+            UPDATE lists SET records = (SELECT COUNT(*) FROM list_membership WHERE list_id = %s)
+            WHERE id = %s AND records <> (SELECT COUNT(*) FROM list_membership WHERE list_id = %s)
+        """
+        cursor.execute(update_query, (list_id, list_id, list_id))
         conn.commit()
+        return cursor.rowcount > 0
     except Error as e:
         logger.error(f"Error updating records count for list {list_id}: {e}")
+        return None
     finally:
         cursor.close()
         conn.close()
 
-def delete_contact_by_id(contact_id):
-    """Deletes a single contact by their ID."""
+def reconcile_list_records_counts():
+    """Recounts every list, one short transaction per list. Returns the ids that had drifted."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM lists WHERE deleted_at IS NULL")
+        list_ids = [row[0] for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error listing lists for record count reconciliation: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+    return [list_id for list_id in list_ids if update_list_records_count(list_id)]
+
+def delete_contact_by_id(contact_id, list_id):
+    """
+    Removes a contact from a list and decrements the list's record count in
+    the same transaction. The contact identity and its send history are kept.
+    """
     conn = get_db_connection()
     if not conn:
         return False
     try:
         cursor = conn.cursor()
-        query = "DELETE FROM contacts WHERE id = %s"
-        cursor.execute(query, (contact_id,))
+        query = "DELETE FROM list_membership WHERE contact_id = %s AND list_id = %s"
+        cursor.execute(query, (contact_id, list_id))
+        deleted = cursor.rowcount
+        if deleted:
+            cursor.execute("UPDATE lists SET records = records - %s WHERE id = %s", (deleted, list_id))
+            mark_segment_contacts_dirty(cursor, [contact_id])
         conn.commit()
-        return cursor.rowcount > 0
+        return deleted > 0
     except Error as e:
+        conn.rollback()
         logger.error(f"Error deleting contact {contact_id}: {e}")
         return False
     finally:
         cursor.close()
         conn.close()
 
-def delete_list_by_id(list_id):
-    """Deletes a list and all its associated contacts."""
+def remove_contacts_from_list(list_id, contact_ids):
+    """
+    Removes several contacts from a list with one statement and decrements the
+    list's record count in the same transaction. Callers keep `contact_ids`
+    short (see app.utils.background_deletes for large selections).
+    Returns the number removed, or None on error.
+    """
+    if not contact_ids:
+        return 0
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        placeholders = ", ".join(["%s"] * len(contact_ids))
+        cursor.execute(
+            f"DELETE FROM list_membership WHERE list_id = %s AND contact_id IN ({placeholders})",
+            (list_id, *contact_ids)
+        )
+        removed = cursor.rowcount
+        if removed:
+            cursor.execute("UPDATE lists SET records = records - %s WHERE id = %s", (removed, list_id))
+            mark_segment_contacts_dirty(cursor, contact_ids)
+        conn.commit()
+        return removed
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error removing {len(contact_ids)} contacts from list {list_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+def mark_list_deleted(list_id):
+    """
+    Tombstones a list: it disappears from every read at once, its name is
+    freed for reuse and the live sequences sending to it are paused, so none
+    of its contacts is mailed while the memberships are removed afterwards in
+    batches by purge_list_batch. Returns False if there is no such (live) list.
+    """
     conn = get_db_connection()
     if not conn:
         return False
     try:
         cursor = conn.cursor()
-        conn.start_transaction()
-        cursor.execute("DELETE FROM contacts WHERE list_id = %s", (list_id,))
-        cursor.execute("DELETE FROM lists WHERE id = %s", (list_id,))
+        cursor.execute("""
+            UPDATE lists SET deleted_at = NOW(), list_name = CONCAT(LEFT(list_name, 200), ' [deleted #', id, ']')
+            WHERE id = %s AND deleted_at IS NULL
+        """, (list_id,))
+        deleted = cursor.rowcount > 0
+        if deleted:
+            cursor.execute(
+                "UPDATE sequences SET status = 'paused' WHERE list_id = %s AND status = 'active' AND deleted_at IS NULL",
+                (list_id,)
+            )
         conn.commit()
-        return True
+        return deleted
     except Error as e:
         conn.rollback()
-        logger.error(f"Error deleting list and its contacts for list_id {list_id}: {e}")
+        logger.error(f"Error marking list {list_id} deleted: {e}")
         return False
     finally:
         cursor.close()
         conn.close()
 
+def purge_list_batch(list_id, batch_size):
+    """
+    Removes up to `batch_size` memberships of a tombstoned list in one short
+    transaction; once none are left, removes the list row itself.
+    Returns the number of memberships removed (0 = finished), or None on error.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT deleted_at FROM lists WHERE id = %s", (list_id,))
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            return 0
+        cursor.execute(
+            "SELECT contact_id FROM list_membership WHERE list_id = %s ORDER BY contact_id LIMIT %s",
+            (list_id, batch_size)
+        )
+        contact_ids = [contact_id for (contact_id,) in cursor.fetchall()]
+        if not contact_ids:
+            cursor.execute("DELETE FROM lists WHERE id = %s AND deleted_at IS NOT NULL", (list_id,))
+            conn.commit()
+            return 0
+        # The affected people may fall out of segments that filter on this list.
+        mark_segment_contacts_dirty(cursor, contact_ids)
+        placeholders = ", ".join(["%s"] * len(contact_ids))
+        cursor.execute(
+            f"DELETE FROM list_membership WHERE list_id = %s AND contact_id IN ({placeholders})",
+            (list_id, *contact_ids)
+        )
+        removed = cursor.rowcount
+        conn.commit()
+        return removed
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error purging memberships of deleted list {list_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_deleted_list_ids():
+    """Tombstoned lists whose purge has not finished yet."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM lists WHERE deleted_at IS NOT NULL")
+        return [row[0] for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error fetching deleted lists: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+def was_mailed_within(email, days):
+    """
+    True if the person with this email (any list) was sent an email in the
+    last `days` days: one unique-key lookup on contacts plus a range probe on
+    sent_emails (contact_id, sent_at). Returns None on error.
+    """
+    conn = get_read_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        query = """
+            SELECT 1
+            FROM contacts c
+            JOIN sent_emails se ON se.contact_id = c.id
+            WHERE c.email_normalized = LOWER(TRIM(%s))
+              AND se.sent_at >= NOW() - INTERVAL %s DAY
+              AND se.status = 'sent'
+            LIMIT 1
+        """
+        cursor.execute(query, (email, days))
+        return cursor.fetchone() is not None
+    except Error as e:
+        logger.error(f"Error checking recent emails to {email}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
 # --- MODIFICATION START: Added missing functions ---
 def get_bounced_emails():
     """Fetches a set of all email addresses that have bounced."""
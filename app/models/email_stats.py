@@ -0,0 +1,235 @@
+# app/models/email_stats.py
+
+import logging
+from datetime import date, datetime, timedelta
+from mysql.connector import Error
+from app.database import get_db_connection, get_read_connection
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_HOURLY = """
+    INSERT INTO email_stats_hourly (bucket_hour, user_id, sequence_id, smtp_config_id, status, email_count)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE email_count = email_count + VALUES(email_count)
+"""
+_UPSERT_DAILY = """
+    INSERT INTO email_stats_daily (bucket_date, user_id, sequence_id, smtp_config_id, status, email_count)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE email_count = email_count + VALUES(email_count)
+"""
+
+_UPSERT_USER = """
+    INSERT INTO user_email_stats (user_id, total_sent, delivered, bounced_failed)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_sent = total_sent + VALUES(total_sent),
+        delivered = delivered + VALUES(delivered),
+        bounced_failed = bounced_failed + VALUES(bounced_failed)
+"""
+USER_STATS_COLUMNS = ('total_sent', 'delivered', 'bounced_failed')
+BOUNCED_FAILED_STATUSES = ('bounced', 'failed')
+
+
+def _hour_start(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def record_email_stats(cursor, sent_at, user_id, sequence_id, smtp_config_id, status, count=1):
+    """
+    Adds `count` (negative to subtract) to the hourly and daily rollups and to
+    the user's running totals for one email, on the caller's cursor so it
+    commits with the sent_emails change. The user row is written last (see
+    reconcile_user_email_stats_row).
+    """
+    dimensions = (user_id, sequence_id or 0, smtp_config_id or 0, status, count)
+    cursor.execute(_UPSERT_HOURLY, (_hour_start(sent_at), *dimensions))
+    cursor.execute(_UPSERT_DAILY, (sent_at.date(), *dimensions))
+    cursor.execute(_UPSERT_USER, (
+        user_id, count,
+        count if status == 'sent' else 0,
+        count if status in BOUNCED_FAILED_STATUSES else 0
+    ))
+
+
+def shift_email_stats(cursor, email, from_status, to_status):
+    """Moves one logged email (a sent_emails row dict) from one status to another in the rollups."""
+    dimensions = (email['user_id'], email['sequence_id'], email['smtp_config_id'])
+    record_email_stats(cursor, email['sent_at'], *dimensions, from_status, count=-1)
+    record_email_stats(cursor, email['sent_at'], *dimensions, to_status, count=1)
+
+
+def _day_range(start_date, end_date):
+    day = start_date
+    while day < end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def get_sent_emails_date_range():
+    """(first_date, last_date) of the rows still in sent_emails, or None when it is empty."""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(sent_at), MAX(sent_at) FROM sent_emails")
+        first, last = cursor.fetchone()
+        return (first.date(), last.date()) if first else None
+    except Error as e:
+        logger.error(f"Error reading the sent_emails date range: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def rebuild_email_stats_day(day):
+    """
+    Recomputes both rollups for one day from sent_emails in a single
+    transaction. Returns the number of emails counted, or None on error.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM email_stats_hourly WHERE bucket_hour >= %s AND bucket_hour < %s", (start, end))
+        cursor.execute("DELETE FROM email_stats_daily WHERE bucket_date = %s", (day,))
+        cursor.execute("""
+            INSERT INTO email_stats_hourly (bucket_hour, user_id, sequence_id, smtp_config_id, status, email_count)
+            SELECT TIMESTAMP(DATE(sent_at), MAKETIME(HOUR(sent_at), 0, 0)), user_id, COALESCE(sequence_id, 0),
+                   COALESCE(smtp_config_id, 0), status, COUNT(*)
+            FROM sent_emails
+            WHERE sent_at >= %s AND sent_at < %s
+            GROUP BY 1, 2, 3, 4, 5
+        """, (start, end))
+        cursor.execute("""
+            INSERT INTO email_stats_daily (bucket_date, user_id, sequence_id, smtp_config_id, status, email_count)
+            SELECT %s, user_id, sequence_id, smtp_config_id, status, SUM(email_count)
+            FROM email_stats_hourly
+            WHERE bucket_hour >= %s AND bucket_hour < %s
+            GROUP BY user_id, sequence_id, smtp_config_id, status
+        """, (day, start, end))
+        cursor.execute("SELECT COALESCE(SUM(email_count), 0) FROM email_stats_daily WHERE bucket_date = %s", (day,))
+        counted = int(cursor.fetchone()[0])
+        conn.commit()
+        return counted
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error rebuilding email stats for {day}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def rebuild_email_stats(start_date=None, end_date=None):
+    """
+    Rebuilds the rollups day by day for [start_date, end_date). Days before
+    the oldest row still in sent_emails are skipped: their rows may have been
+    archived, and the rollups are then the only remaining totals.
+    Yields (day, emails_counted) as each day finishes.
+    """
+    date_range = get_sent_emails_date_range()
+    if not date_range:
+        return
+    first, last = date_range
+    start_date = max(start_date or first, first)
+    end_date = end_date or last + timedelta(days=1)
+    for day in _day_range(start_date, end_date):
+        yield day, rebuild_email_stats_day(day)
+
+
+def month_bounds(year, month):
+    """[first day, first day of next month) for a calendar month."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def get_user_email_stats(user_id):
+    """The user's running totals as a dict of USER_STATS_COLUMNS (zeros when the user has none yet)."""
+    stats = dict.fromkeys(USER_STATS_COLUMNS, 0)
+    conn = get_read_connection()
+    if not conn:
+        return stats
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT total_sent, delivered, bounced_failed FROM user_email_stats WHERE user_id = %s", (user_id,)
+        )
+        row = cursor.fetchone()
+        if row:
+            stats.update({column: int(row[column]) for column in USER_STATS_COLUMNS})
+        return stats
+    except Error as e:
+        logger.error(f"Error reading email stats of user {user_id}: {e}")
+        return stats
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def reconcile_user_email_stats_row(user_id):
+    """
+    Recomputes one user's totals from email_stats_daily and fixes the row if
+    it drifted. The row is locked first, so sends logged meanwhile either are
+    already in the sums or add to the corrected value afterwards.
+    Returns True if the row was wrong, False if it was right, None on error.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT total_sent, delivered, bounced_failed FROM user_email_stats WHERE user_id = %s FOR UPDATE",
+            (user_id,)
+        )
+        stored = cursor.fetchone()
+        cursor.execute("""
+            SELECT COALESCE(SUM(email_count), 0),
+                   COALESCE(SUM(CASE WHEN status = 'sent' THEN email_count ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN status IN ('bounced', 'failed') THEN email_count ELSE 0 END), 0)
+            FROM email_stats_daily
+            WHERE user_id = %s
+        """, (user_id,))
+        expected = tuple(int(value) for value in cursor.fetchone())
+        if stored is not None and tuple(int(value) for value in stored) == expected:
+            conn.rollback()
+            return False
+        cursor.execute("""
+            INSERT INTO user_email_stats (user_id, total_sent, delivered, bounced_failed)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                total_sent = VALUES(total_sent), delivered = VALUES(delivered), bounced_failed = VALUES(bounced_failed)
+        """, (user_id, *expected))
+        conn.commit()
+        return True
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error reconciling email stats of user {user_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def reconcile_user_email_stats():
+    """Reconciles every user's totals, one short transaction per user. Returns the ids that had drifted."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM users")
+        user_ids = [row[0] for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error listing users for email stats reconciliation: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+    return [user_id for user_id in user_ids if reconcile_user_email_stats_row(user_id)]
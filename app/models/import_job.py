@@ -0,0 +1,91 @@
+# app/models/import_job.py
+
+import json
+from mysql.connector import Error
+from app.database import get_db_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Statuses a job moves through; 'completed' and 'failed' are final.
+STATUS_QUEUED = 'queued'
+STATUS_VALIDATING = 'validating'
+STATUS_IMPORTING = 'importing'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+FINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+_UPDATABLE_COLUMNS = {
+    'list_id', 'status', 'rows_parsed', 'rows_valid', 'rows_inserted', 'rows_duplicate',
+    'error', 'started_at', 'import_started_at', 'finished_at'
+}
+
+
+def create_import_job(user_id, list_name, file_path, column_map=None):
+    """
+    Records a queued import for an uploaded file and returns its id.
+    `column_map` ({'email': 'Work Email', ...}) overrides header detection.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO import_jobs (user_id, list_name, file_path, column_map, status) VALUES (%s, %s, %s, %s, %s)",
+            (user_id, list_name, file_path, json.dumps(column_map) if column_map else None, STATUS_QUEUED)
+        )
+        conn.commit()
+        return cursor.lastrowid
+    except Error as e:
+        logger.error(f"Error creating import job for user {user_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_import_job(job_id, user_id=None):
+    """Fetches one import job; pass user_id to only return the caller's own job."""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        query = "SELECT * FROM import_jobs WHERE id = %s"
+        params = [job_id]
+        if user_id is not None:
+            query += " AND user_id = %s"
+            params.append(user_id)
+        cursor.execute(query, params)
+        return cursor.fetchone()
+    except Error as e:
+        logger.error(f"Error fetching import job {job_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def update_import_job(job_id, **fields):
+    """Sets the given columns of an import job (e.g. status='failed', error='...')."""
+    unknown = set(fields) - _UPDATABLE_COLUMNS
+    if unknown:
+        raise ValueError(f"Cannot update import_jobs columns: {', '.join(sorted(unknown))}")
+    if not fields:
+        return True
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        cursor = conn.cursor()
+        assignments = ", ".join(f"{column} = %s" for column in fields)
+        cursor.execute(f"UPDATE import_jobs SET {assignments} WHERE id = %s", (*fields.values(), job_id))
+        conn.commit()
+        return True
+    except Error as e:
+        logger.error(f"Error updating import job {job_id}: {e}")
+        return False
+    finally:
+        cursor.close()
+        conn.close()
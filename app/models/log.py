@@ -1,9 +1,11 @@
 # app/models/log.py (Corrected)
 
-from datetime import datetime
 import mysql.connector
 from mysql.connector import Error
 from app.database import get_db_connection
+from app.models.email_stats import record_email_stats, shift_email_stats
+from app.models.segment import mark_segment_contacts_dirty
+from app.utils.live_events import publish_event
 import os
 import logging
 
@@ -12,78 +14,72 @@ logger = logging.getLogger(__name__)
 
 class SentEmail:
     @classmethod
-    def log_email(cls, user_id, contact_id, subject, status, campaign_id, message_id, references, sequence_id, step_id, body, from_name, from_email, to_email):
+    def log_email(cls, user_id, contact_id, subject, status, campaign_id, message_id, references, sequence_id, step_id, body, from_name, from_email, to_email, smtp_config_id=None):
         conn = get_db_connection()
         if not conn: return False
         try:
             cursor = conn.cursor()
+            # One timestamp for the row and its rollup buckets.
+            cursor.execute("SELECT NOW()")
+            sent_at = cursor.fetchone()[0]
             query = """
-                INSERT INTO sent_emails (user_id, contact_id, subject, status, campaign_id, message_id, `references`, sequence_id, step_id, body, from_name, from_email, to_email, sent_at)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,NOW())
+                INSERT INTO sent_emails (user_id, contact_id, subject, status, campaign_id, message_id, `references`, sequence_id, step_id, body, from_name, from_email, to_email, smtp_config_id, sent_at)
+                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
             """
-            cursor.execute(query, (user_id, contact_id, subject, status, campaign_id, message_id, references, sequence_id, step_id, body, from_name, from_email, to_email))
+            cursor.execute(query, (user_id, contact_id, subject, status, campaign_id, message_id, references, sequence_id, step_id, body, from_name, from_email, to_email, smtp_config_id, sent_at))
+            record_email_stats(cursor, sent_at, user_id, sequence_id, smtp_config_id, status)
+            # Send history feeds segment filters such as "not mailed in 14 days".
+            mark_segment_contacts_dirty(cursor, [contact_id])
             conn.commit()
+            publish_event('email', user_id=user_id, status=status, sent_at=sent_at.isoformat())
             return True
         except Error as e:
+            conn.rollback()
             logger.error(f"Error logging email: {e}")
             return False
         finally:
             if conn and conn.is_connected():
                 cursor.close()
                 conn.close()
-    @classmethod
-    def get_total_sent(cls, user_id):
-        """Gets the total number of emails sent by a user."""
-        conn = get_db_connection()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            query = "SELECT COUNT(*) FROM sent_emails WHERE user_id = %s"
-            cursor.execute(query, (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except Error as e:
-            logger.error(f"Error getting total sent emails: {e}")
-            return 0
-        finally:
-            if conn and conn.is_connected():
-                cursor.close()
-                conn.close()
 
     @classmethod
-    def get_bounced_failed(cls, user_id):
-        """Gets the total number of bounced or failed emails for a user."""
+    def mark_bounced(cls, email):
+        """
+        Marks the latest 'sent' email to `email` as bounced and moves it between
+        statuses in the rollups. Returns True when an email was updated.
+        """
         conn = get_db_connection()
-        if not conn: return 0
+        if not conn: return False
         try:
-            cursor = conn.cursor()
-            query = "SELECT COUNT(*) FROM sent_emails WHERE user_id = %s AND (status = 'bounced' OR status = 'failed')"
-            cursor.execute(query, (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT se.id, se.contact_id, se.user_id, se.sequence_id, se.smtp_config_id, se.sent_at
+                FROM contacts c
+                JOIN sent_emails se ON se.contact_id = c.id
+                WHERE c.email_normalized = LOWER(TRIM(%s)) AND se.status = 'sent'
+                ORDER BY se.sent_at DESC, se.id DESC
+                LIMIT 1
+                FOR UPDATE
+            """, (email,))
+            sent_email = cursor.fetchone()
+            if not sent_email:
+                conn.rollback()
+                return False
+            # sent_at prunes the update to the row's monthly partition.
+            cursor.execute(
+                "UPDATE sent_emails SET status = 'bounced' WHERE id = %s AND sent_at = %s",
+                (sent_email['id'], sent_email['sent_at'])
+            )
+            shift_email_stats(cursor, sent_email, 'sent', 'bounced')
+            mark_segment_contacts_dirty(cursor, [sent_email['contact_id']])
+            conn.commit()
+            publish_event('bounce', user_id=sent_email['user_id'], sent_at=sent_email['sent_at'].isoformat())
+            return True
         except Error as e:
-            logger.error(f"Error getting bounced/failed emails: {e}")
-            return 0
+            conn.rollback()
+            logger.error(f"Error marking email to {email} as bounced: {e}")
+            return False
         finally:
             if conn and conn.is_connected():
                 cursor.close()
                 conn.close()
-    
-    @classmethod
-    def get_successfully_delivered(cls, user_id):
-        """Gets the total number of successfully delivered emails (status='sent') for a user."""
-        conn = get_db_connection()
-        if not conn: return 0
-        try:
-            cursor = conn.cursor()
-            query = "SELECT COUNT(*) FROM sent_emails WHERE user_id = %s AND status = 'sent'"
-            cursor.execute(query, (user_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except Error as e:
-            logger.error(f"Error getting successfully delivered emails: {e}")
-            return 0
-        finally:
-            if conn and conn.is_connected():
-                cursor.close()
-                conn.close()
\ No newline at end of file
@@ -2,8 +2,10 @@
 
 import mysql.connector
 from mysql.connector import Error
-from app.database import get_db_connection
+from app.database import get_read_connection, session_utc_offset
 from app.config import Config
+from app.models.email_stats import month_bounds
+from app.utils import cache
 import os
 import logging
 from datetime import datetime, timedelta
@@ -11,57 +13,229 @@ from datetime import datetime, timedelta
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# --- (All other functions like get_total_sent_count, _get_count, etc. remain unchanged) ---
-def _get_count(query, params=None):
-    conn = get_db_connection()
+# Latest bounces shown on the dashboard; walks idx_sent_emails_status_sent_at backwards.
+BOUNCED_REPORT_LIMIT = 100
+DASHBOARD_STAT_KEYS = ('total_sent', 'sent_monthly', 'sent_last_24h', 'total_scheduled',
+                       'scheduled_monthly', 'total_contacts', 'total_lists')
+
+def get_dashboard_stats(year, month):
+    """
+    Every dashboard counter in one round trip: the send counts come from the
+    rollups, the scheduled counts from one conditional aggregate over
+    sequence_steps. `year`/`month` select the monthly figures. Returns None
+    on a database error, so a failure is never cached as zeros.
+    """
+    month_start, month_end = month_bounds(year, month)
+    # Months are in session time like the rollups; schedule_time is UTC.
+    utc_offset = session_utc_offset()
+    scheduled_month = (datetime.combine(month_start, datetime.min.time()) - utc_offset,
+                       datetime.combine(month_end, datetime.min.time()) - utc_offset)
+    conn = get_read_connection()
     if not conn:
-        return 0
+        return None
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, params or ())
-        result = cursor.fetchone()
-        return result[0] if result else 0
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT sent.total_sent, sent.sent_monthly, recent.sent_last_24h,
+                   scheduled.total_scheduled, scheduled.scheduled_monthly,
+                   -- People on at least one live list; contacts rows outlive their lists.
+                   (SELECT COUNT(DISTINCT lm.contact_id)
+                    FROM list_membership lm
+                    JOIN lists l ON l.id = lm.list_id AND l.deleted_at IS NULL) AS total_contacts,
+                   (SELECT COUNT(*) FROM lists WHERE deleted_at IS NULL) AS total_lists
+            FROM (
+                SELECT SUM(email_count) AS total_sent,
+                       SUM(CASE WHEN bucket_date >= %s AND bucket_date < %s THEN email_count ELSE 0 END) AS sent_monthly
+                FROM email_stats_daily
+                WHERE status = 'sent'
+            ) AS sent
+            CROSS JOIN (
+                -- Hourly buckets are in session time, like NOW(): counts from
+                -- the start of the hour 24 hours ago.
+                SELECT SUM(email_count) AS sent_last_24h
+                FROM email_stats_hourly
+                WHERE status = 'sent'
+                  AND bucket_hour >= TIMESTAMP(DATE(NOW() - INTERVAL 24 HOUR), MAKETIME(HOUR(NOW() - INTERVAL 24 HOUR), 0, 0))
+            ) AS recent
+            CROSS JOIN (
+                SELECT SUM(ss.schedule_time > UTC_TIMESTAMP()) AS total_scheduled,
+                       SUM(ss.schedule_time >= %s AND ss.schedule_time < %s) AS scheduled_monthly
+                FROM sequence_steps ss
+                JOIN sequences s ON ss.sequence_id = s.id
+                WHERE ss.status = 'scheduled' AND s.deleted_at IS NULL
+            ) AS scheduled
+        """, (month_start, month_end, *scheduled_month))
+        row = cursor.fetchone()
+        return {key: int(row[key] or 0) for key in DASHBOARD_STAT_KEYS}
     except Error as e:
-        logger.error(f"Error executing count query '{query}': {e}")
-        return 0
+        logger.error(f"Error fetching dashboard stats: {e}")
+        return None
     finally:
         if conn.is_connected():
             cursor.close()
             conn.close()
 
-def get_total_sent_count():
-    return _get_count("SELECT COUNT(*) FROM sent_emails WHERE status = 'sent'")
 
-def get_total_scheduled_count():
-    return _get_count("SELECT COUNT(*) FROM sequence_steps WHERE status = 'scheduled' AND schedule_time > UTC_TIMESTAMP()")
+def get_cached_dashboard_stats(year, month, fresh=False):
+    """
+    get_dashboard_stats shared through Redis for DASHBOARD_STATS_CACHE_SECONDS.
+    `fresh` recomputes (and re-caches) it, for live pages whose counters may
+    already be ahead of the cached copy.
+    """
+    key = f"reports:dashboard_stats:{year}-{month:02d}"
+    if fresh:
+        return cache.refresh(key, Config.DASHBOARD_STATS_CACHE_SECONDS, lambda: get_dashboard_stats(year, month))
+    return cache.get_or_compute(
+        key,
+        Config.DASHBOARD_STATS_CACHE_SECONDS,
+        lambda: get_dashboard_stats(year, month)
+    )
+
+SERIES_GRANULARITIES = ('hour', 'day', 'week')
+SERIES_STATUSES = ('sent', 'failed', 'bounced')
+# Upper bound on buckets per request, so hour-level series cannot span a year.
+MAX_SERIES_BUCKETS = 800
+_BUCKET_STEPS = {'hour': timedelta(hours=1), 'day': timedelta(days=1), 'week': timedelta(weeks=1)}
+
+
+class ReportRangeError(ValueError):
+    """A time-series request with an unsupported granularity or range."""
+
 
-def get_total_contacts_count():
-    return _get_count("SELECT COUNT(*) FROM contacts")
+def _series_buckets(start, end, granularity):
+    """Bucket starts covering [start, end); weeks start on Monday like WEEKDAY()."""
+    if granularity == 'hour':
+        bucket = start.replace(minute=0, second=0, microsecond=0)
+    else:
+        bucket = datetime.combine(start.date(), datetime.min.time())
+        if granularity == 'week':
+            bucket -= timedelta(days=bucket.weekday())
+    buckets = []
+    while bucket < end:
+        buckets.append(bucket)
+        bucket += _BUCKET_STEPS[granularity]
+    return buckets
 
-def get_total_lists_count():
-    return _get_count("SELECT COUNT(*) FROM lists")
 
-def get_sent_last_24_hours_count():
-    twenty_four_hours_ago = datetime.utcnow() - timedelta(hours=24)
-    query = "SELECT COUNT(*) FROM sent_emails WHERE status = 'sent' AND sent_at >= %s"
-    return _get_count(query, (twenty_four_hours_ago,))
+def _series_rows(cursor, query, params):
+    cursor.execute(query, params)
+    for bucket, series, count in cursor.fetchall():
+        if not isinstance(bucket, datetime):  # DATE buckets
+            bucket = datetime.combine(bucket, datetime.min.time())
+        yield bucket, series, int(count or 0)
 
-def get_sent_monthly_count(year, month):
-    query = "SELECT COUNT(*) FROM sent_emails WHERE status = 'sent' AND YEAR(sent_at) = %s AND MONTH(sent_at) = %s"
-    return _get_count(query, (year, month))
 
-def get_scheduled_monthly_count(year, month):
-    query = "SELECT COUNT(*) FROM sequence_steps WHERE status = 'scheduled' AND YEAR(schedule_time) = %s AND MONTH(schedule_time) = %s"
-    return _get_count(query, (year, month))
+def get_email_series(start, end, granularity='day', sequence_id=None, list_id=None, smtp_config_id=None):
+    """
+    sent/failed/bounced/scheduled counts per hour, day or week over [start, end).
+
+    Send counts come from the email_stats rollups (hourly for 'hour', daily
+    otherwise); scheduled counts are steps still waiting to go out, from
+    sequence_steps over idx_sequence_steps_status_schedule. A list filter
+    matches the sequences that target that list.
+
+    Buckets, `start` and `end` are naive datetimes in the database session zone
+    (Config.DB_SESSION_TIME_ZONE), the zone the rollups are written in;
+    schedule_time is stored in UTC and converted to match.
+
+    Returns {'granularity', 'buckets': [datetime...], 'series': {name: [count...]}}
+    with zero-filled buckets, or None on a database error.
+    """
+    if granularity not in SERIES_GRANULARITIES:
+        raise ReportRangeError(f"Granularity must be one of {', '.join(SERIES_GRANULARITIES)}.")
+    if start >= end:
+        raise ReportRangeError('The range must end after it starts.')
+    buckets = _series_buckets(start, end, granularity)
+    if len(buckets) > MAX_SERIES_BUCKETS:
+        raise ReportRangeError(f"That range has more than {MAX_SERIES_BUCKETS} {granularity}s; pick a coarser granularity.")
+
+    # Ranges start at the first bucket so a leading week is counted whole.
+    range_start = buckets[0]
+    # schedule_time is UTC: bucket it in session time, filter it on UTC bounds.
+    schedule_time = f"CONVERT_TZ(ss.schedule_time, '+00:00', '{Config.DB_SESSION_TIME_ZONE}')"
+    utc_offset = session_utc_offset()
+    if granularity == 'hour':
+        stats_table, stats_column = 'email_stats_hourly', 'bucket_hour'
+        stats_range = (range_start, end)
+        stats_bucket = 'bucket_hour'
+        scheduled_bucket = f'TIMESTAMP(DATE({schedule_time}), MAKETIME(HOUR({schedule_time}), 0, 0))'
+    else:
+        stats_table, stats_column = 'email_stats_daily', 'bucket_date'
+        # A day is in range when it starts before `end`.
+        stats_range = (range_start.date(), (end - timedelta(microseconds=1)).date() + timedelta(days=1))
+        stats_bucket = 'bucket_date'
+        scheduled_bucket = f'DATE({schedule_time})'
+    if granularity == 'week':
+        stats_bucket = 'bucket_date - INTERVAL WEEKDAY(bucket_date) DAY'
+        scheduled_bucket = f'DATE({schedule_time}) - INTERVAL WEEKDAY({schedule_time}) DAY'
 
-def get_bounced_emails_report():
-    conn = get_db_connection()
+    stats_conditions = [f"{stats_column} >= %s", f"{stats_column} < %s",
+                        f"status IN ({', '.join(['%s'] * len(SERIES_STATUSES))})"]
+    stats_params = [*stats_range, *SERIES_STATUSES]
+    scheduled_conditions = ["ss.status = 'scheduled'", "ss.schedule_time >= %s", "ss.schedule_time < %s",
+                            "s.deleted_at IS NULL"]
+    scheduled_params = [range_start - utc_offset, end - utc_offset]
+    if sequence_id is not None:
+        stats_conditions.append("sequence_id = %s")
+        stats_params.append(sequence_id)
+        scheduled_conditions.append("ss.sequence_id = %s")
+        scheduled_params.append(sequence_id)
+    if list_id is not None:
+        stats_conditions.append("sequence_id IN (SELECT id FROM sequences WHERE list_id = %s)")
+        stats_params.append(list_id)
+        scheduled_conditions.append("s.list_id = %s")
+        scheduled_params.append(list_id)
+    if smtp_config_id is not None:
+        stats_conditions.append("smtp_config_id = %s")
+        stats_params.append(smtp_config_id)
+        scheduled_conditions.append("s.config_id = %s")
+        scheduled_params.append(smtp_config_id)
+
+    series = {name: dict.fromkeys(buckets, 0) for name in (*SERIES_STATUSES, 'scheduled')}
+    conn = get_read_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        rows = list(_series_rows(cursor, f"""
+            SELECT {stats_bucket} AS bucket, status, SUM(email_count)
+            FROM {stats_table}
+            WHERE {' AND '.join(stats_conditions)}
+            GROUP BY bucket, status
+        """, stats_params))
+        rows += _series_rows(cursor, f"""
+            SELECT {scheduled_bucket} AS bucket, 'scheduled', COUNT(*)
+            FROM sequence_steps ss
+            JOIN sequences s ON ss.sequence_id = s.id
+            WHERE {' AND '.join(scheduled_conditions)}
+            GROUP BY bucket
+        """, scheduled_params)
+    except Error as e:
+        logger.error(f"Error fetching email series: {e}")
+        return None
+    finally:
+        if conn.is_connected():
+            cursor.close()
+            conn.close()
+
+    for bucket, name, count in rows:
+        if bucket in series[name]:
+            series[name][bucket] += count
+    return {
+        'granularity': granularity,
+        'buckets': buckets,
+        'series': {name: list(counts.values()) for name, counts in series.items()}
+    }
+
+
+def get_bounced_emails_report(limit=BOUNCED_REPORT_LIMIT):
+    conn = get_read_connection()
     if not conn:
         return []
     try:
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT se.sent_at, c.name AS contact_name, c.email AS contact_email, se.subject FROM sent_emails se JOIN contacts c ON se.contact_id = c.id WHERE se.status = 'bounced' ORDER BY se.sent_at DESC"
-        cursor.execute(query)
+        query = "SELECT se.sent_at, c.name AS contact_name, c.email AS contact_email, se.subject FROM sent_emails se JOIN contacts c ON se.contact_id = c.id WHERE se.status = 'bounced' ORDER BY se.sent_at DESC LIMIT %s"
+        cursor.execute(query, (limit,))
         return cursor.fetchall()
     except Error as e:
         logger.error(f"Error fetching bounced emails report: {e}")
@@ -72,59 +246,83 @@ def get_bounced_emails_report():
             conn.close()
 
 
-# --- MODIFICATION START: Simplified query to always get totals across all lists ---
-def get_future_scheduled_emails_summary():
+def get_future_scheduled_emails_summary(start, end):
     """
-    Calculates the total number of recipients for each unique future schedule time
-    by aggregating data across all sequences and lists.
+    Future steps scheduled in [start, end) (UTC), grouped by schedule time
+    with the total recipients of every sequence firing at that moment.
+    Recipient counts are the maintained lists.records / segments.records.
+    Returns None on a database error.
     """
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
-        return []
+        return None
     try:
         cursor = conn.cursor(dictionary=True)
-        
-        # This query first finds each scheduled step, determines the recipient count
-        # for the list associated with that step's sequence, and then groups by the
-        # exact schedule time to sum up the recipient counts from all sequences
-        # firing at that moment.
         query = """
             SELECT
-                T.schedule_time,
-                SUM(T.recipient_count) AS total_recipients,
-                GROUP_CONCAT(DISTINCT T.sequence_name SEPARATOR ', ') AS sequence_names,
-                GROUP_CONCAT(DISTINCT T.list_name SEPARATOR ', ') AS list_names
-            FROM (
-                SELECT
-                    ss.schedule_time,
-                    s.name AS sequence_name,
-                    l.list_name AS list_name,
-                    (SELECT COUNT(*) FROM contacts c WHERE c.list_id = s.list_id) AS recipient_count
-                FROM
-                    sequence_steps ss
-                JOIN
-                    sequences s ON ss.sequence_id = s.id
-                JOIN
-                    lists l ON s.list_id = l.id
-                WHERE
-                    ss.status = 'scheduled' AND ss.schedule_time > UTC_TIMESTAMP()
-            ) AS T
-            GROUP BY
-                T.schedule_time
-            ORDER BY
-                T.schedule_time ASC;
+                ss.schedule_time,
+                SUM(CASE WHEN s.segment_id IS NOT NULL THEN COALESCE(sg.records, 0) ELSE COALESCE(l.records, 0) END) AS total_recipients,
+                GROUP_CONCAT(DISTINCT s.name SEPARATOR ', ') AS sequence_names,
+                GROUP_CONCAT(DISTINCT COALESCE(l.list_name, CONCAT('Segment: ', sg.name)) SEPARATOR ', ') AS list_names
+            FROM sequence_steps ss
+            JOIN sequences s ON ss.sequence_id = s.id
+            LEFT JOIN lists l ON s.list_id = l.id
+            LEFT JOIN segments sg ON s.segment_id = sg.id
+            WHERE ss.status = 'scheduled'
+              AND ss.schedule_time >= GREATEST(%s, UTC_TIMESTAMP()) AND ss.schedule_time < %s
+              AND s.deleted_at IS NULL
+            GROUP BY ss.schedule_time
+            ORDER BY ss.schedule_time ASC
         """
-        cursor.execute(query)
-        scheduled_summary = cursor.fetchall()
-        return scheduled_summary
+        cursor.execute(query, (start, end))
+        return cursor.fetchall()
     except Error as e:
         logger.error(f"Error fetching future scheduled emails summary with recipient count: {e}")
-        return []
+        return None
     finally:
         if conn.is_connected():
             cursor.close()
             conn.close()
-# --- MODIFICATION END ---
+
+
+def _calendar_version_keys(first, last):
+    """Version keys of every month from the one containing `first` to the one containing `last`."""
+    keys = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        keys.append(f"reports:calendar_version:{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def invalidate_scheduled_calendar(first, last=None):
+    """
+    Called after steps scheduled between `first` and `last` (UTC, inclusive)
+    change, so cached calendar windows overlapping those months are rebuilt.
+    """
+    if first is None:
+        return
+    cache.bump_versions(_calendar_version_keys(first, last or first))
+
+
+def get_cached_scheduled_calendar(start, end, build_events):
+    """
+    Calendar events for [start, end) from build_events(summary rows), cached
+    per window until a step in one of its months changes (see
+    invalidate_scheduled_calendar), or at most CALENDAR_CACHE_SECONDS.
+    Returns None (uncached) on a database error.
+    """
+    versions = cache.get_versions(_calendar_version_keys(start, end - timedelta(microseconds=1)))
+
+    def compute():
+        summary = get_future_scheduled_emails_summary(start, end)
+        return build_events(summary) if summary is not None else None
+
+    if versions is None:
+        return compute()
+    key = f"reports:calendar:{start.isoformat()}:{end.isoformat()}:{'.'.join(map(str, versions))}"
+    return cache.get_or_compute(key, Config.CALENDAR_CACHE_SECONDS, compute)
+
 
 # --- MODIFICATION START: Removed the get_all_list_names_with_sequences function ---
 # The function get_all_list_names_with_sequences has been removed as it is no longer needed.
@@ -0,0 +1,408 @@
+# app/models/segment.py
+
+import json
+import logging
+from mysql.connector import Error
+from app.database import get_db_connection, get_read_connection
+
+logger = logging.getLogger(__name__)
+
+# A segment filter is JSON of the form
+#   {"match": "all", "conditions": [
+#       {"field": "location", "op": "eq", "value": "Pune"},
+#       {"field": "last_sent", "op": "not_within_days", "value": 14}]}
+# "match" is "all" (AND) or "any" (OR). Each condition compiles to a SQL
+# predicate over `contacts c`.
+TEXT_FIELDS = ('name', 'email', 'location', 'company_name')
+TEXT_OPERATORS = ('eq', 'neq', 'starts_with', 'contains')
+FILTER_FIELDS = {
+    **{field: TEXT_OPERATORS for field in TEXT_FIELDS},
+    'list': ('member_of', 'not_member_of'),
+    'last_sent': ('within_days', 'not_within_days'),
+    'bounced': ('is',),
+}
+# Conditions whose result changes with the clock alone, not only when a
+# contact or its sends change; segments using them are also refreshed hourly.
+TIME_BASED_FIELDS = ('last_sent',)
+
+# Contacts re-evaluated per pass over segment_dirty_contacts.
+DIRTY_BATCH_SIZE = 5000
+
+
+class SegmentFilterError(ValueError):
+    """The segment filter is malformed or uses an unknown field/operator."""
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _compile_condition(condition):
+    field = condition.get('field')
+    op = condition.get('op')
+    value = condition.get('value')
+    if field not in FILTER_FIELDS:
+        raise SegmentFilterError(f"Unknown field '{field}'.")
+    if op not in FILTER_FIELDS[field]:
+        raise SegmentFilterError(f"Field '{field}' does not support '{op}'.")
+
+    if field in TEXT_FIELDS:
+        if not isinstance(value, str) or not value.strip():
+            raise SegmentFilterError(f"'{field}' needs a text value.")
+        value = value.strip()
+        if op == 'eq':
+            return f"c.{field} = %s", [value]
+        if op == 'neq':
+            return f"c.{field} <> %s", [value]
+        if op == 'starts_with':
+            return f"c.{field} LIKE %s", [_escape_like(value) + '%']
+        return f"c.{field} LIKE %s", ['%' + _escape_like(value) + '%']
+
+    if field == 'list':
+        try:
+            list_id = int(value)
+        except (TypeError, ValueError):
+            raise SegmentFilterError("'list' needs a list id.")
+        sql = (
+            "EXISTS (SELECT 1 FROM list_membership lm JOIN lists l ON l.id = lm.list_id "
+            "WHERE lm.list_id = %s AND lm.contact_id = c.id AND l.deleted_at IS NULL)"
+        )
+        return (sql if op == 'member_of' else f"NOT {sql}"), [list_id]
+
+    if field == 'last_sent':
+        try:
+            days = int(value)
+        except (TypeError, ValueError):
+            raise SegmentFilterError("'last_sent' needs a number of days.")
+        if days < 1:
+            raise SegmentFilterError("'last_sent' needs at least 1 day.")
+        # Range probe on sent_emails (contact_id, sent_at, status).
+        sql = (
+            "EXISTS (SELECT 1 FROM sent_emails se WHERE se.contact_id = c.id "
+            "AND se.sent_at >= NOW() - INTERVAL %s DAY AND se.status = 'sent')"
+        )
+        return (sql if op == 'within_days' else f"NOT {sql}"), [days]
+
+    # bounced
+    if not isinstance(value, bool):
+        raise SegmentFilterError("'bounced' needs true or false.")
+    sql = "EXISTS (SELECT 1 FROM bounced_emails b WHERE b.email = c.email)"
+    return (sql if value else f"NOT {sql}"), []
+
+
+def compile_segment_filter(filters):
+    """
+    Validates a segment filter and returns (where_sql, params, time_based).
+    Raises SegmentFilterError for anything it cannot compile.
+    """
+    if not isinstance(filters, dict):
+        raise SegmentFilterError("A segment filter must be a JSON object.")
+    match = filters.get('match', 'all')
+    if match not in ('all', 'any'):
+        raise SegmentFilterError("'match' must be 'all' or 'any'.")
+    conditions = filters.get('conditions')
+    if not isinstance(conditions, list) or not conditions:
+        raise SegmentFilterError("A segment needs at least one condition.")
+
+    clauses, params = [], []
+    for condition in conditions:
+        if not isinstance(condition, dict):
+            raise SegmentFilterError("Each condition must be a JSON object.")
+        sql, condition_params = _compile_condition(condition)
+        clauses.append(f"({sql})")
+        params.extend(condition_params)
+    joiner = ' AND ' if match == 'all' else ' OR '
+    time_based = any(condition['field'] in TIME_BASED_FIELDS for condition in conditions)
+    return joiner.join(clauses), params, time_based
+
+
+def create_segment(name, created_by, filters):
+    """Saves a segment (its membership is filled by refresh_segment). Returns its id or None."""
+    _sql, _params, time_based = compile_segment_filter(filters)
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        query = "INSERT INTO segments (name, created_by, filter, time_based) VALUES (%s, %s, %s, %s)"
+        cursor.execute(query, (name, created_by, json.dumps(filters), time_based))
+        conn.commit()
+        return cursor.lastrowid
+    except Error as e:
+        logger.error(f"Error creating segment {name}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_segments():
+    conn = get_read_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, name, created_by, filter, time_based, records, refreshed_at, created_at
+            FROM segments ORDER BY created_at DESC
+        """)
+        return cursor.fetchall()
+    except Error as e:
+        logger.error(f"Error fetching segments: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_segment(segment_id):
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, name, created_by, filter, time_based, records, refreshed_at, created_at
+            FROM segments WHERE id = %s
+        """, (segment_id,))
+        return cursor.fetchone()
+    except Error as e:
+        logger.error(f"Error fetching segment {segment_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def delete_segment(segment_id):
+    """Deletes a segment and its membership. Refuses (returns False) while a sequence targets it."""
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sequences WHERE segment_id = %s AND deleted_at IS NULL", (segment_id,))
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute("DELETE FROM segment_membership WHERE segment_id = %s", (segment_id,))
+        cursor.execute("DELETE FROM segments WHERE id = %s", (segment_id,))
+        conn.commit()
+        return True
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error deleting segment {segment_id}: {e}")
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _refresh_membership(cursor, segment, contact_ids=None, list_id=None):
+    """
+    Re-evaluates `segment` for the given contacts (or the members of
+    `list_id`, or everyone) and applies the difference to segment_membership.
+    Returns (added, removed).
+    """
+    where_sql, params, _time_based = compile_segment_filter(json.loads(segment['filter']))
+    scope_sql, scope_params = '', []
+    if contact_ids is not None:
+        scope_sql = f" AND c.id IN ({', '.join(['%s'] * len(contact_ids))})"
+        scope_params = list(contact_ids)
+    elif list_id is not None:
+        scope_sql = " AND c.id IN (SELECT contact_id FROM list_membership WHERE list_id = %s)"
+        scope_params = [list_id]
+
+    cursor.execute(
+        f"INSERT IGNORE INTO segment_membership (segment_id, contact_id) "
+        f"SELECT %s, c.id FROM contacts c WHERE ({where_sql}){scope_sql}",
+        [segment['id'], *params, *scope_params]
+    )
+    added = cursor.rowcount
+    # NULL-safe negation: a condition that evaluates to NULL does not match.
+    cursor.execute(
+        f"DELETE sm FROM segment_membership sm JOIN contacts c ON c.id = sm.contact_id "
+        f"WHERE sm.segment_id = %s AND NOT COALESCE(({where_sql}), 0){scope_sql}",
+        [segment['id'], *params, *scope_params]
+    )
+    removed = cursor.rowcount
+    if contact_ids is None and list_id is None:
+        # Memberships of contacts that no longer exist at all.
+        cursor.execute("""
+            DELETE sm FROM segment_membership sm LEFT JOIN contacts c ON c.id = sm.contact_id
+            WHERE sm.segment_id = %s AND c.id IS NULL
+        """, (segment['id'],))
+        removed += cursor.rowcount
+    if added or removed:
+        cursor.execute(
+            "UPDATE segments SET records = records + %s - %s WHERE id = %s",
+            (added, removed, segment['id'])
+        )
+    return added, removed
+
+
+def refresh_segment(segment_id):
+    """Fully re-evaluates one segment. Returns (added, removed), or None on error."""
+    segment = get_segment(segment_id)
+    if not segment:
+        return None
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        result = _refresh_membership(cursor, segment)
+        cursor.execute(
+            "UPDATE segments SET records = (SELECT COUNT(*) FROM segment_membership WHERE segment_id = %s), "
+            "refreshed_at = NOW() WHERE id = %s",
+            (segment_id, segment_id)
+        )
+        conn.commit()
+        return result
+    except (Error, SegmentFilterError) as e:
+        conn.rollback()
+        logger.error(f"Error refreshing segment {segment_id}: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def refresh_segments_for(contact_ids=None, list_id=None):
+    """
+    Re-evaluates every segment for some contacts only: the given ids or the
+    members of a list (e.g. right after an import). Returns the number of
+    membership rows changed, or None on error.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    changed = 0
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id, filter FROM segments")
+        for segment in cursor.fetchall():
+            added, removed = _refresh_membership(cursor, segment, contact_ids=contact_ids, list_id=list_id)
+            changed += added + removed
+        conn.commit()
+        return changed
+    except (Error, SegmentFilterError) as e:
+        conn.rollback()
+        logger.error(f"Error refreshing segments incrementally: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def mark_segment_contacts_dirty(cursor, contact_ids=None, list_id=None):
+    """
+    Queues contacts for segment re-evaluation, on the caller's cursor so it
+    commits with the change that made them dirty. Pass contact ids, or a
+    list_id to queue all of that list's current members.
+    """
+    if list_id is not None:
+        cursor.execute("""
+            INSERT INTO segment_dirty_contacts (contact_id, marked_at)
+            SELECT contact_id, NOW(6) FROM list_membership WHERE list_id = %s
+            ON DUPLICATE KEY UPDATE marked_at = VALUES(marked_at)
+        """, (list_id,))
+        return
+    if not contact_ids:
+        return
+    placeholders = ", ".join(["(%s, NOW(6))"] * len(contact_ids))
+    cursor.execute(
+        f"INSERT INTO segment_dirty_contacts (contact_id, marked_at) VALUES {placeholders} "
+        "ON DUPLICATE KEY UPDATE marked_at = VALUES(marked_at)",
+        list(contact_ids)
+    )
+
+
+def refresh_dirty_segment_contacts(batch_size=DIRTY_BATCH_SIZE):
+    """
+    Re-evaluates every segment for the queued contacts, batch_size at a time,
+    until the queue is empty. A contact marked again while its batch was
+    being processed stays queued. Returns the number of contacts processed.
+    """
+    processed = 0
+    while True:
+        conn = get_db_connection()
+        if not conn:
+            return processed
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT contact_id, marked_at FROM segment_dirty_contacts ORDER BY marked_at LIMIT %s",
+                (batch_size,)
+            )
+            batch = cursor.fetchall()
+        except Error as e:
+            logger.error(f"Error reading dirty segment contacts: {e}")
+            return processed
+        finally:
+            cursor.close()
+            conn.close()
+        if not batch:
+            return processed
+
+        if refresh_segments_for(contact_ids=[contact_id for contact_id, _marked_at in batch]) is None:
+            return processed
+
+        conn = get_db_connection()
+        if not conn:
+            return processed
+        try:
+            cursor = conn.cursor()
+            placeholders = ", ".join(["(%s, %s)"] * len(batch))
+            cursor.execute(
+                f"DELETE FROM segment_dirty_contacts WHERE (contact_id, marked_at) IN ({placeholders})",
+                [value for row in batch for value in row]
+            )
+            conn.commit()
+        except Error as e:
+            logger.error(f"Error clearing dirty segment contacts: {e}")
+            return processed
+        finally:
+            cursor.close()
+            conn.close()
+        processed += len(batch)
+        if len(batch) < batch_size:
+            return processed
+
+
+def get_time_based_segment_ids():
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM segments WHERE time_based = 1")
+        return [row[0] for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error fetching time-based segments: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_contacts_for_segment(segment_id):
+    """Retrieves all contacts currently in a segment (same columns as get_contacts_for_list)."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        query = """
+            SELECT c.id, c.name, c.email, c.location, c.company_name, c.email_valid, c.email_validated_at
+            FROM segment_membership sm
+            JOIN contacts c ON c.id = sm.contact_id
+            WHERE sm.segment_id = %s
+        """
+        cursor.execute(query, (segment_id,))
+        return cursor.fetchall()
+    except Error as e:
+        logger.error(f"Error fetching contacts for segment {segment_id}: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
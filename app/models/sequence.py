@@ -1,25 +1,28 @@
 # app/models/sequence.py
 import mysql.connector
 from mysql.connector import Error
-from app.database import get_db_connection
+from app.config import Config
+from app.database import get_db_connection, get_read_connection, session_utc_offset
+from app.models.reports import invalidate_scheduled_calendar
+from app.utils.live_events import publish_event
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def create_sequence(name, list_id, created_by, config_type, config_id, status='active'):
-    """Creates a new sequence."""
+def create_sequence(name, list_id, created_by, config_type, config_id, status='active', segment_id=None):
+    """Creates a new sequence targeting a list, or a segment when segment_id is given (list_id None)."""
     conn = get_db_connection()
     if not conn:
         return None
     try:
         cursor = conn.cursor()
         query = """
-            INSERT INTO sequences (name, list_id, created_by, config_type, config_id, status)
-            VALUES (%s, %s, %s, %s, %s, %s)
+            INSERT INTO sequences (name, list_id, segment_id, created_by, config_type, config_id, status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (name, list_id, created_by, config_type, config_id, status))
+        cursor.execute(query, (name, list_id, segment_id, created_by, config_type, config_id, status))
         conn.commit()
         sequence_id = cursor.lastrowid
         return sequence_id
@@ -32,6 +35,43 @@ def create_sequence(name, list_id, created_by, config_type, config_id, status='a
             conn.close()
 
 # --- THIS FUNCTION HAS BEEN FIXED ---
+def _is_upcoming(step):
+    """Whether a (schedule_time, status) pair counts as a future scheduled step on the dashboard."""
+    if step is None or step[1] != 'scheduled':
+        return False
+    schedule_time = step[0]
+    if schedule_time.tzinfo is not None:
+        schedule_time = schedule_time.astimezone(timezone.utc).replace(tzinfo=None)
+    return schedule_time > datetime.utcnow()
+
+
+def _schedule_month(schedule_time):
+    """'YYYY-MM' of a UTC schedule_time in session time, the zone of the dashboard's month selector."""
+    if schedule_time.tzinfo is not None:
+        schedule_time = schedule_time.astimezone(timezone.utc).replace(tzinfo=None)
+    return (schedule_time + session_utc_offset()).strftime('%Y-%m')
+
+
+def _scheduled_step_changed(before, after):
+    """
+    After a committed step change, given its (schedule_time, status) before
+    and after (None when it did not exist), drops the cached calendar months
+    and pushes the change in the upcoming-steps count, and in the scheduled
+    count of each month it touches, to live dashboards.
+    """
+    months = {}
+    for step, sign in ((before, -1), (after, 1)):
+        if step is not None:
+            invalidate_scheduled_calendar(step[0])
+            if step[1] == 'scheduled':
+                month = _schedule_month(step[0])
+                months[month] = months.get(month, 0) + sign
+    months = {month: change for month, change in months.items() if change}
+    delta = _is_upcoming(after) - _is_upcoming(before)
+    if delta or months:
+        publish_event('schedule', delta=delta, months=months)
+
+
 def create_sequence_step(sequence_id, step_number, schedule_time, reply_body, is_re_reply, campaign_id=None):
     """Creates a step within a sequence."""
     conn = get_db_connection()
@@ -58,6 +98,7 @@ def create_sequence_step(sequence_id, step_number, schedule_time, reply_body, is
         cursor.execute(query, params)
         
         conn.commit()
+        _scheduled_step_changed(None, (schedule_time, 'scheduled'))
         return True
     except Error as e:
         logger.error(f"Database error while creating sequence step: {e}", exc_info=True)
@@ -69,19 +110,22 @@ def create_sequence_step(sequence_id, step_number, schedule_time, reply_body, is
 
 def get_sequences():
     """Fetches a summary of all sequences with their step counts."""
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
         return []
     try:
         cursor = conn.cursor(dictionary=True)
         query = """
             SELECT
-                s.id, s.name, s.status, s.created_at, l.list_name,
+                s.id, s.name, s.status, s.created_at,
+                COALESCE(l.list_name, CONCAT('Segment: ', sg.name)) AS list_name,
                 COUNT(ss.id) AS total_steps,
                 SUM(CASE WHEN ss.status = 'sent' THEN 1 ELSE 0 END) AS sent_steps
             FROM sequences s
-            JOIN lists l ON s.list_id = l.id
+            LEFT JOIN lists l ON s.list_id = l.id
+            LEFT JOIN segments sg ON s.segment_id = sg.id
             LEFT JOIN sequence_steps ss ON s.id = ss.sequence_id
+            WHERE s.deleted_at IS NULL
             GROUP BY s.id
             ORDER BY s.created_at DESC;
         """
@@ -102,7 +146,13 @@ def get_sequence(sequence_id):
         return None
     try:
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT s.*, l.list_name FROM sequences s JOIN lists l ON s.list_id = l.id WHERE s.id = %s;"
+        query = """
+            SELECT s.*, COALESCE(l.list_name, CONCAT('Segment: ', sg.name)) AS list_name
+            FROM sequences s
+            LEFT JOIN lists l ON s.list_id = l.id
+            LEFT JOIN segments sg ON s.segment_id = sg.id
+            WHERE s.id = %s AND s.deleted_at IS NULL;
+        """
         cursor.execute(query, (sequence_id,))
         return cursor.fetchone()
     except Error as e:
@@ -115,19 +165,21 @@ def get_sequence(sequence_id):
 
 def get_sequences_by_user(user_id):
     """Fetches a summary of all sequences for a specific user, including step counts."""
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
         return []
     try:
         cursor = conn.cursor(dictionary=True)
         query = """
             SELECT
-                s.id, s.name, s.status, s.created_at, l.list_name,
+                s.id, s.name, s.status, s.created_at,
+                COALESCE(l.list_name, CONCAT('Segment: ', sg.name)) AS list_name,
                 COUNT(ss.id) AS total_steps
             FROM sequences s
-            JOIN lists l ON s.list_id = l.id
+            LEFT JOIN lists l ON s.list_id = l.id
+            LEFT JOIN segments sg ON s.segment_id = sg.id
             LEFT JOIN sequence_steps ss ON s.id = ss.sequence_id
-            WHERE s.created_by = %s
+            WHERE s.created_by = %s AND s.deleted_at IS NULL
             GROUP BY s.id ORDER BY s.created_at DESC;
         """
         cursor.execute(query, (user_id,))
@@ -177,14 +229,15 @@ def get_due_steps_for_utc_time(now_utc):
         query = """
             SELECT 
                 ss.id, ss.sequence_id, ss.campaign_id, ss.reply_body, ss.is_re_reply,
-                ss.step_number, s.list_id, s.config_type, s.config_id, s.created_by AS user_id,
+                ss.step_number, s.list_id, s.segment_id, s.config_type, s.config_id, s.created_by AS user_id,
                 c.subject AS campaign_subject, c.body AS campaign_body
             FROM sequence_steps ss
             JOIN sequences s ON ss.sequence_id = s.id
             LEFT JOIN campaigns c ON ss.campaign_id = c.id
             WHERE ss.status = 'scheduled' 
               AND ss.schedule_time <= %s
-              AND s.status = 'active';
+              AND s.status = 'active'
+              AND s.deleted_at IS NULL;
         """
         cursor.execute(query, (now_utc,))
         due_steps = cursor.fetchall()
@@ -206,9 +259,13 @@ def update_step_status(step_id, status):
         return False
     try:
         cursor = conn.cursor()
+        cursor.execute("SELECT schedule_time, status FROM sequence_steps WHERE id = %s", (step_id,))
+        before = cursor.fetchone()
         query = "UPDATE sequence_steps SET status = %s WHERE id = %s"
         cursor.execute(query, (status, step_id))
         conn.commit()
+        if before:
+            _scheduled_step_changed(before, (before[0], status))
         return True
     except Error as e:
         logger.error(f"Database error updating step {step_id} to status {status}: {e}", exc_info=True)
@@ -256,8 +313,12 @@ def update_sequence_step(step_id, step_number, campaign_id, reply_body, schedule
                 logger.error(f"Invalid campaign_id '{campaign_id}' passed for step {step_id}. It must be a number.")
                 return False
 
+        cursor.execute("SELECT schedule_time, status FROM sequence_steps WHERE id = %s", (step_id,))
+        before = cursor.fetchone()
         cursor.execute(query, (step_number, campaign_id_int, reply_body, schedule_time, is_re_reply, step_id))
         conn.commit()
+        if before:
+            _scheduled_step_changed(before, (schedule_time, before[1]))
         return True
     except Error as e:
         logger.error(f"Error updating sequence step {step_id}: {e}")
@@ -274,8 +335,12 @@ def delete_sequence_step(step_id):
         return False
     try:
         cursor = conn.cursor()
+        cursor.execute("SELECT schedule_time, status FROM sequence_steps WHERE id = %s", (step_id,))
+        before = cursor.fetchone()
         cursor.execute("DELETE FROM sequence_steps WHERE id = %s", (step_id,))
         conn.commit()
+        if before:
+            _scheduled_step_changed(before, None)
         return True
     except Error as e:
         logger.error(f"Error deleting sequence step {step_id}: {e}")
@@ -285,27 +350,97 @@ def delete_sequence_step(step_id):
             cursor.close()
             conn.close()
 
-def delete_sequence(sequence_id):
-    """Deletes a sequence and all its associated steps."""
+def mark_sequence_deleted(sequence_id):
+    """
+    Tombstones a sequence: it is hidden and stops sending at once; its steps
+    are removed afterwards in batches by purge_sequence_batch.
+    Returns False if there is no such (live) sequence.
+    """
     conn = get_db_connection()
     if not conn:
         return False
     try:
         cursor = conn.cursor()
-        conn.start_transaction()
-        cursor.execute("DELETE FROM sequence_steps WHERE sequence_id = %s", (sequence_id,))
-        cursor.execute("DELETE FROM sequences WHERE id = %s", (sequence_id,))
+        cursor.execute(
+            "UPDATE sequences SET deleted_at = NOW(), status = 'deleted' WHERE id = %s AND deleted_at IS NULL",
+            (sequence_id,)
+        )
+        deleted = cursor.rowcount > 0
+        # Scheduled steps per session-time month, as the dashboard counts them.
+        cursor.execute(f"""
+            SELECT YEAR(local_time), MONTH(local_time), MIN(schedule_time), MAX(schedule_time),
+                   COUNT(*), SUM(schedule_time > UTC_TIMESTAMP())
+            FROM (
+                SELECT schedule_time, CONVERT_TZ(schedule_time, '+00:00', '{Config.DB_SESSION_TIME_ZONE}') AS local_time
+                FROM sequence_steps WHERE sequence_id = %s AND status = 'scheduled'
+            ) steps
+            GROUP BY YEAR(local_time), MONTH(local_time)
+        """, (sequence_id,))
+        rows = cursor.fetchall()
         conn.commit()
-        return True
+        if deleted and rows:
+            invalidate_scheduled_calendar(min(row[2] for row in rows), max(row[3] for row in rows))
+            publish_event(
+                'schedule',
+                delta=-sum(int(row[5] or 0) for row in rows),
+                months={f"{row[0]:04d}-{row[1]:02d}": -int(row[4]) for row in rows}
+            )
+        return deleted
     except Error as e:
-        conn.rollback()
-        logger.error(f"Error deleting sequence {sequence_id}: {e}")
+        logger.error(f"Error marking sequence {sequence_id} deleted: {e}")
         return False
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
 
+def purge_sequence_batch(sequence_id, batch_size):
+    """
+    Deletes up to `batch_size` steps of a tombstoned sequence in one short
+    transaction; once none are left, deletes the sequence row itself.
+    Returns the number of steps deleted (0 = finished), or None on error.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT deleted_at FROM sequences WHERE id = %s", (sequence_id,))
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            return 0
+        cursor.execute("DELETE FROM sequence_steps WHERE sequence_id = %s LIMIT %s", (sequence_id, batch_size))
+        deleted = cursor.rowcount
+        if not deleted:
+            cursor.execute("DELETE FROM sequences WHERE id = %s AND deleted_at IS NOT NULL", (sequence_id,))
+        conn.commit()
+        return deleted
+    except Error as e:
+        conn.rollback()
+        logger.error(f"Error purging steps of deleted sequence {sequence_id}: {e}")
+        return None
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+def get_deleted_sequence_ids():
+    """Tombstoned sequences whose purge has not finished yet."""
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM sequences WHERE deleted_at IS NOT NULL")
+        return [row[0] for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error fetching deleted sequences: {e}")
+        return []
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
 def get_last_sent_email_for_contact(sequence_id, contact_id):
     """Fetches the most recent sent email to a contact within a specific sequence for threading + quoting."""
     conn = get_db_connection()
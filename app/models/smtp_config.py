@@ -1,7 +1,7 @@
 # app/models/smtp_config.py
 import mysql.connector
 from mysql.connector import Error
-from app.database import get_db_connection
+from app.database import get_db_connection, get_read_connection
 from app.config import Config
 import os
 import logging
@@ -73,7 +73,7 @@ def save_smtp_config(user_id, name, host, port, username, password, use_tls, fro
 
 def get_smtp_configs(user_id):
     """Retrieves all SMTP configurations for a user."""
-    conn = get_db_connection()
+    conn = get_read_connection()
     if not conn:
         return []
     try:
@@ -1,15 +1,28 @@
 from flask import (Blueprint, render_template, request, flash, redirect, url_for,
-                   jsonify, send_from_directory)
+                   jsonify, send_from_directory, Response, stream_with_context)
 from flask_login import login_required, current_user
 from app.models.contact import (
-    create_list, save_contact, get_lists, get_contacts_for_list,
-    update_list_records_count, delete_contact_by_id, get_list_by_id,
-    delete_list_by_id
+    save_contact, get_lists, get_contacts_page,
+    delete_contact_by_id, get_list_by_id,
+    mark_list_deleted, remove_contacts_from_list, iter_contacts_for_export, CONTACT_SORT_COLUMNS, CONTACT_SEARCH_COLUMNS,
+    EXPORT_COLUMNS
 )
-# --- MODIFICATION START: Import the new validation function ---
-from app.utils.csv_processor import validate_csv_data
-# --- MODIFICATION END ---
+from app.models.import_job import create_import_job, get_import_job, update_import_job, STATUS_FAILED
+from app.utils.contact_importer import import_contacts, store_upload, new_import_path, describe_import_job
+from app.utils.chunked_upload import (
+    ChunkedUploadError, create_upload, load_upload, save_chunk, received_chunks, assemble_upload
+)
+from app.utils.contact_file_reader import CONTACT_COLUMNS
 from app.utils.email_validator import check_email
+from app.utils.background_deletes import purge_list, remove_list_contacts
+from app.config import Config
+import base64
+import csv
+import io
+import json
+import os
+import re
+import zlib
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -41,7 +54,9 @@ def delete_list(list_id):
         flash('List not found.', 'error')
         return redirect(url_for('contact.lists'))
 
-    if delete_list_by_id(list_id):
+    # The list is hidden immediately; its contacts are detached in the background.
+    if mark_list_deleted(list_id):
+        purge_list.delay(list_id)
         flash(f"Successfully deleted list '{list_to_delete['list_name']}' and its contacts.", 'success')
     else:
         flash('An error occurred while trying to delete the list.', 'error')
@@ -56,40 +71,118 @@ def upload_contacts_file():
     csv_file = request.files.get('file')
 
     if not list_name or not csv_file:
-        return jsonify({'message': 'List name and CSV file are required.'}), 400
-
-    # Step 1: Validate the entire CSV file first
-    is_valid, data_or_errors = validate_csv_data(csv_file)
-
-    if not is_valid:
-        # The file has errors, so reject the upload
-        error_message = "Upload failed. Please fix the following errors: " + ", ".join(data_or_errors)
-        logger.error(f"CSV Upload Failed for user {current_user.id}: {error_message}")
-        return jsonify({'message': error_message}), 400
-
-    # Step 2: If validation passed, create the list
-    list_id = create_list(list_name, current_user.id)
-    if not list_id:
-        return jsonify({'message': 'Failed to create list. A list with this name may already exist.'}), 400
-
-    # Step 3: Save the validated contacts
-    saved_count = 0
-    skipped_count = 0 # For duplicates
-    valid_contacts = data_or_errors # The data is in this variable if validation passed
-
-    for contact_data in valid_contacts:
-        if save_contact(list_id, **contact_data):
-            saved_count += 1
-        else:
-            skipped_count += 1 # This contact was a duplicate in the database
-
-    update_list_records_count(list_id)
-    
-    message = f"Successfully uploaded {saved_count} contacts."
-    if skipped_count > 0:
-        message += f" Skipped {skipped_count} duplicates."
-    
-    return jsonify({'message': message}), 200
+        return jsonify({'message': 'List name and a contacts file are required.'}), 400
+
+    # Validation and inserting run in a Celery job; the request only stores the file.
+    file_path = store_upload(csv_file)
+    return _start_import(list_name, file_path, _column_map_from(request.form))
+
+
+def _column_map_from(values):
+    """Optional overrides for files whose headers are not recognised automatically."""
+    return {
+        column: (values.get(f'column_{column}') or '').strip()
+        for column in CONTACT_COLUMNS
+        if (values.get(f'column_{column}') or '').strip()
+    }
+
+
+def _start_import(list_name, file_path, column_map):
+    """Creates and enqueues the import job for a stored file; returns the JSON response."""
+    job_id = create_import_job(current_user.id, list_name, file_path, column_map)
+    if not job_id:
+        os.remove(file_path)
+        return jsonify({'message': 'Could not start the import. Please try again.'}), 500
+
+    try:
+        import_contacts.delay(job_id)
+    except Exception as e:
+        logger.error(f"Could not enqueue import job {job_id}: {e}")
+        update_import_job(job_id, status=STATUS_FAILED, error='The import queue is unavailable.')
+        os.remove(file_path)
+        return jsonify({'message': 'The import queue is unavailable. Please try again later.'}), 503
+
+    return jsonify({
+        'message': 'Upload received. Importing contacts...',
+        'job_id': job_id,
+        'status_url': url_for('contact.import_job_status', job_id=job_id)
+    }), 202
+
+
+# --- Chunked uploads: initiate, PUT numbered chunks (resumable), then complete ---
+@contact_bp.route('/uploads', methods=['POST'])
+@login_required
+def initiate_chunked_upload():
+    data = request.get_json(silent=True) or {}
+    list_name = (data.get('list_name') or '').strip()
+    try:
+        size = int(data.get('size') or 0)
+    except (TypeError, ValueError):
+        size = 0
+    if not list_name or not size:
+        return jsonify({'message': 'List name and file size are required.'}), 400
+
+    try:
+        manifest = create_upload(
+            current_user.id, data.get('filename') or '', size, list_name,
+            _column_map_from(data.get('column_map') or {})
+        )
+    except ChunkedUploadError as e:
+        return jsonify({'message': str(e)}), e.status
+    return jsonify(_describe_upload(manifest)), 201
+
+
+@contact_bp.route('/uploads/<upload_id>', methods=['GET'])
+@login_required
+def chunked_upload_status(upload_id):
+    manifest = load_upload(upload_id, current_user.id)
+    if not manifest:
+        return jsonify({'message': 'Upload not found.'}), 404
+    return jsonify(_describe_upload(manifest))
+
+
+@contact_bp.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id, index):
+    manifest = load_upload(upload_id, current_user.id)
+    if not manifest:
+        return jsonify({'message': 'Upload not found.'}), 404
+    try:
+        save_chunk(manifest, index, request.stream, request.headers.get('X-Chunk-SHA256'))
+    except ChunkedUploadError as e:
+        return jsonify({'message': str(e)}), e.status
+    return jsonify({'index': index, 'stored': True})
+
+
+@contact_bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_chunked_upload(upload_id):
+    manifest = load_upload(upload_id, current_user.id)
+    if not manifest:
+        return jsonify({'message': 'Upload not found.'}), 404
+    try:
+        file_path = assemble_upload(manifest, new_import_path())
+    except ChunkedUploadError as e:
+        return jsonify({'message': str(e)}), e.status
+    return _start_import(manifest['list_name'], file_path, manifest['column_map'])
+
+
+def _describe_upload(manifest):
+    return {
+        'upload_id': manifest['upload_id'],
+        'chunk_size': manifest['chunk_size'],
+        'total_chunks': manifest['total_chunks'],
+        'received': received_chunks(manifest)
+    }
+
+
+@contact_bp.route('/import_jobs/<int:job_id>', methods=['GET'])
+@login_required
+def import_job_status(job_id):
+    job = get_import_job(job_id, user_id=current_user.id)
+    if not job:
+        return jsonify({'message': 'Import job not found.'}), 404
+    return jsonify(describe_import_job(job))
 # --- MODIFICATION END ---
 
 
@@ -120,8 +213,7 @@ def add_contact(list_id):
         if errors:
             for error in errors:
                 flash(error, 'error')
-        elif save_contact(list_id, name, email, location, company_name):
-            update_list_records_count(list_id)
+        elif save_contact(list_id, name, email, location, company_name, email_validated=True):
             flash(f"Contact '{name}' added successfully!", 'success')
             return redirect(url_for('contact.view_contacts', list_id=list_id))
         else:
@@ -132,18 +224,156 @@ def add_contact(list_id):
 @contact_bp.route('/view_contacts/<int:list_id>', methods=['GET'])
 @login_required
 def view_contacts(list_id):
-    contacts = get_contacts_for_list(list_id)
     list_details = get_list_by_id(list_id)
     if not list_details:
         flash('The requested list does not exist.', 'error')
         return redirect(url_for('contact.lists'))
-    return render_template('view_contacts.html', contacts=contacts, list_id=list_id, list_details=list_details)
+    # Rows are loaded page by page from contacts_api by the template.
+    return render_template('view_contacts.html', list_id=list_id, list_details=list_details)
+
+
+CONTACTS_PAGE_SIZE = 100
+MAX_CONTACTS_PAGE_SIZE = 500
+
+
+def _encode_cursor(sort_value, contact_id):
+    raw = json.dumps([sort_value, contact_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    try:
+        sort_value, contact_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return sort_value, int(contact_id)
+    except (ValueError, TypeError):
+        return None
+
+
+@contact_bp.route('/api/lists/<int:list_id>/contacts', methods=['GET'])
+@login_required
+def contacts_api(list_id):
+    """
+    One page of a list's contacts as JSON. Query parameters: sort (column),
+    dir (asc/desc), q (prefix search), name/email/company_name/location
+    (prefix filters), limit, and cursor (next_cursor of the previous page).
+    """
+    sort = request.args.get('sort', 'id')
+    if sort not in CONTACT_SORT_COLUMNS:
+        return jsonify({'message': f"Cannot sort by '{sort}'."}), 400
+    descending = request.args.get('dir', 'asc') == 'desc'
+    limit = min(max(request.args.get('limit', CONTACTS_PAGE_SIZE, type=int), 1), MAX_CONTACTS_PAGE_SIZE)
+
+    after = None
+    if request.args.get('cursor'):
+        after = _decode_cursor(request.args['cursor'])
+        if after is None:
+            return jsonify({'message': 'Invalid cursor.'}), 400
+
+    filters = {
+        column: request.args[column].strip()
+        for column in CONTACT_SEARCH_COLUMNS
+        if request.args.get(column, '').strip()
+    }
+    rows = get_contacts_page(
+        list_id, limit=limit, sort=sort, descending=descending, after=after,
+        search=request.args.get('q', '').strip() or None, filters=filters
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = _encode_cursor(rows[-1][sort], rows[-1]['id']) if has_more else None
+    return jsonify({'contacts': rows, 'next_cursor': next_cursor})
+
+# Bytes of CSV collected before a chunk is handed to the client.
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _export_chunks(list_id, compress):
+    """Yields the list as CSV, chunk by chunk, gzip-compressed on the fly when `compress`."""
+    # wbits=31 writes a gzip header/trailer instead of a raw zlib stream.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        if compressor:
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    # The header goes out before the query runs, so the download starts at once.
+    writer.writerow(EXPORT_COLUMNS)
+    yield take()
+    for row in iter_contacts_for_export(list_id):
+        *values, bounced = row
+        writer.writerow(['' if value is None else value for value in values] + ['yes' if bounced else 'no'])
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield take()
+    data = take()
+    if compressor:
+        data += compressor.flush()
+    if data:
+        yield data
+
+
+@contact_bp.route('/lists/<int:list_id>/export', methods=['GET'])
+@login_required
+def export_contacts(list_id):
+    """Streams a list as CSV (add ?gzip=1 for a .csv.gz) including each contact's send status."""
+    list_details = get_list_by_id(list_id)
+    if not list_details:
+        flash('The requested list does not exist.', 'error')
+        return redirect(url_for('contact.lists'))
+
+    compress = request.args.get('gzip') in ('1', 'true', 'yes')
+    filename = re.sub(r'[^A-Za-z0-9._-]+', '_', list_details['list_name']).strip('_') or f"list_{list_id}"
+    filename += '.csv.gz' if compress else '.csv'
+    response = Response(
+        stream_with_context(_export_chunks(list_id, compress)),
+        mimetype='application/gzip' if compress else 'text/csv'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Stop reverse proxies from buffering the whole export before sending it on.
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Most contacts one bulk delete request may select.
+MAX_BULK_DELETE_IDS = 10000
+
+
+@contact_bp.route('/api/lists/<int:list_id>/contacts/delete', methods=['POST'])
+@login_required
+def bulk_delete_contacts(list_id):
+    """
+    Removes the contacts whose ids are posted as JSON {"contact_ids": [...]}.
+    Up to DELETE_BATCH_SIZE are removed in the request (200); larger
+    selections are handed to a background job (202).
+    """
+    if not get_list_by_id(list_id):
+        return jsonify({'message': 'List not found.'}), 404
+    payload = request.get_json(silent=True) or {}
+    try:
+        contact_ids = sorted({int(contact_id) for contact_id in payload.get('contact_ids', [])})
+    except (TypeError, ValueError):
+        return jsonify({'message': 'contact_ids must be a list of ids.'}), 400
+    if not contact_ids:
+        return jsonify({'message': 'No contacts selected.'}), 400
+    if len(contact_ids) > MAX_BULK_DELETE_IDS:
+        return jsonify({'message': f'Select at most {MAX_BULK_DELETE_IDS} contacts at a time.'}), 413
+
+    if len(contact_ids) > Config.DELETE_BATCH_SIZE:
+        remove_list_contacts.delay(list_id, contact_ids)
+        return jsonify({'queued': len(contact_ids)}), 202
+    removed = remove_contacts_from_list(list_id, contact_ids)
+    if removed is None:
+        return jsonify({'message': 'Failed to delete the selected contacts.'}), 500
+    return jsonify({'removed': removed})
 
 @contact_bp.route('/delete_contact/<int:list_id>/<int:contact_id>', methods=['POST'])
 @login_required
 def delete_contact(list_id, contact_id):
-    if delete_contact_by_id(contact_id):
-        update_list_records_count(list_id)
+    if delete_contact_by_id(contact_id, list_id):
         flash('Contact deleted successfully.', 'success')
     else:
         flash('Failed to delete contact.', 'error')
@@ -0,0 +1,32 @@
+# app/routes/diagnostics_routes.py
+from flask import Blueprint, abort, current_app, request, jsonify
+from flask_login import login_required
+from app.utils import query_profiler
+from app.database import get_pool_stats
+
+diagnostics_bp = Blueprint('diagnostics', __name__, url_prefix='/diagnostics')
+
+@diagnostics_bp.before_request
+def _debug_only():
+    """Statement fingerprints and pool internals are for debugging, not for every logged-in user."""
+    if not current_app.debug:
+        abort(404)
+
+@diagnostics_bp.route('/queries')
+@login_required
+def query_report():
+    """Aggregated per-statement and per-endpoint/task query statistics for this process."""
+    limit = request.args.get('limit', default=50, type=int)
+    return jsonify(query_profiler.report.snapshot(limit=limit))
+
+@diagnostics_bp.route('/queries/reset', methods=['POST'])
+@login_required
+def reset_query_report():
+    query_profiler.report.reset()
+    return jsonify({'message': 'Query report reset.'})
+
+@diagnostics_bp.route('/pool')
+@login_required
+def pool_stats():
+    """Checked-out/overflow counts and checkout wait times for this process's DB pools."""
+    return jsonify(get_pool_stats())
@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, redirect, url_for
+from flask import Blueprint, render_template, redirect, url_for, jsonify
 from flask_login import login_required, current_user
-from app.models.log import SentEmail
+from app.config import Config
+from app.models.email_stats import get_user_email_stats
+from app.utils.live_events import event_stream_response
 
 # Create a new Blueprint for main application routes
 main_bp = Blueprint('main', __name__)
@@ -12,20 +14,32 @@ def home():
     Renders the main home page/dashboard.
     Passes all required stats to the template.
     """
-    user_id = current_user.id if current_user.is_authenticated else None
-    
-    total_sent = SentEmail.get_total_sent(user_id) if user_id else 0
-    bounced_failed = SentEmail.get_bounced_failed(user_id) if user_id else 0
-    
-    # --- MODIFICATION START: Added the missing calculation ---
-    successfully_delivered = SentEmail.get_successfully_delivered(user_id) if user_id else 0
-    # --- MODIFICATION END ---
+    # One precomputed row, however many emails the user has sent.
+    stats = get_user_email_stats(current_user.id)
 
     return render_template('home.html', 
                            current_user=current_user, 
-                           total_sent=total_sent, 
-                           bounced_failed=bounced_failed,
-                           successfully_delivered=successfully_delivered) # <-- Pass the new data
+                           total_sent=stats['total_sent'], 
+                           bounced_failed=stats['bounced_failed'],
+                           successfully_delivered=stats['delivered'],
+                           live_resync_seconds=Config.LIVE_RESYNC_SECONDS)
+
+@main_bp.route('/home/stats')
+@login_required
+def home_stats():
+    """The home page counters, for live pages that need to resync."""
+    stats = get_user_email_stats(current_user.id)
+    return jsonify({
+        'total_sent': stats['total_sent'],
+        'successfully_delivered': stats['delivered'],
+        'bounced_failed': stats['bounced_failed']
+    })
+
+@main_bp.route('/home/live')
+@login_required
+def home_live():
+    """Server-Sent Events stream of the current user's sends and bounces."""
+    return event_stream_response(user_id=current_user.id)
 
 @main_bp.route('/')
 @login_required # Protect the root URL
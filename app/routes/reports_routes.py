@@ -1,12 +1,17 @@
 # app/routes/reports_routes.py
-from flask import Blueprint, render_template, request, jsonify
-from flask_login import login_required
+from flask import Blueprint, flash, render_template, request, jsonify
+from flask_login import current_user, login_required
 from app.models import reports
-from datetime import datetime, timedelta
+from app.models.contact import get_lists
+from app.models.sequence import get_sequences
+from app.models.smtp_config import get_smtp_configs
+from app.config import Config
+from app.database import session_utc_offset
+from app.utils.live_events import event_stream_response
+from datetime import date, datetime, time, timedelta, timezone
 
 reports_bp = Blueprint('reports', __name__)
 
-# --- (The reports_dashboard and reports_data routes remain unchanged) ---
 @reports_bp.route('/reports')
 @login_required
 def reports_dashboard():
@@ -14,40 +19,86 @@ def reports_dashboard():
     current_month = datetime.utcnow().month
     selected_year = request.args.get('year', default=current_year, type=int)
     selected_month = request.args.get('month', default=current_month, type=int)
-    stats = {
-        'total_sent': reports.get_total_sent_count(),
-        'total_scheduled': reports.get_total_scheduled_count(),
-        'total_contacts': reports.get_total_contacts_count(),
-        'total_lists': reports.get_total_lists_count(),
-        'sent_last_24h': reports.get_sent_last_24_hours_count(),
-        'sent_monthly': reports.get_sent_monthly_count(selected_year, selected_month),
-        'scheduled_monthly': reports.get_scheduled_monthly_count(selected_year, selected_month)
-    }
+    if not 1 <= selected_month <= 12:
+        selected_month = current_month
+    stats = reports.get_cached_dashboard_stats(selected_year, selected_month)
+    if stats is None:
+        flash('Could not load the dashboard figures. Please try again.', 'error')
+        stats = dict.fromkeys(reports.DASHBOARD_STAT_KEYS, 0)
     bounced_emails = reports.get_bounced_emails_report()
     months = [(i, datetime(2000, i, 1).strftime('%B')) for i in range(1, 13)]
     years = list(range(current_year - 5, current_year + 2))
     return render_template('reports_dashboard.html',
                            stats=stats,
+                           series_granularities=reports.SERIES_GRANULARITIES,
+                           sequences=get_sequences(),
+                           lists=get_lists(),
+                           smtp_configs=get_smtp_configs(current_user.id),
                            months=months,
                            years=years,
                            selected_month=selected_month,
                            selected_year=selected_year,
-                           bounced_emails=bounced_emails)
+                           bounced_emails=bounced_emails,
+                           session_utc_offset_minutes=int(session_utc_offset().total_seconds() // 60),
+                           live_resync_seconds=Config.LIVE_RESYNC_SECONDS)
 
 
 @reports_bp.route('/reports/data')
 @login_required
 def reports_data():
-    stats = {
-        'total_sent': reports.get_total_sent_count(),
-        'total_scheduled': reports.get_total_scheduled_count(),
-        'total_contacts': reports.get_total_contacts_count(),
-        'total_lists': reports.get_total_lists_count(),
-        'sent_last_24h': reports.get_sent_last_24_hours_count()
-    }
+    """Dashboard figures for ?year=&month=; ?fresh=1 bypasses the shared cache (live resyncs)."""
+    now = datetime.utcnow()
+    year = request.args.get('year', default=now.year, type=int)
+    month = request.args.get('month', default=now.month, type=int)
+    if not 1 <= month <= 12:
+        month = now.month
+    stats = reports.get_cached_dashboard_stats(year, month, fresh=request.args.get('fresh') == '1')
+    if stats is None:
+        return jsonify({'message': 'Could not load the dashboard figures. Please try again.'}), 500
     return jsonify(stats)
 
 
+@reports_bp.route('/reports/live')
+@login_required
+def reports_live():
+    """Server-Sent Events stream of every user's stat changes (sends, bounces, schedule changes)."""
+    return event_stream_response()
+
+
+@reports_bp.route('/reports/series')
+@login_required
+def reports_series():
+    """
+    Chart data: ?start=&end= (YYYY-MM-DD, end inclusive; default the last 30
+    days), ?granularity=hour|day|week and optional sequence_id, list_id and
+    smtp_config_id filters. Dates and the returned buckets are in the database
+    session zone (DB_SESSION_TIME_ZONE), which the response names as time_zone.
+    """
+    today = (datetime.utcnow() + session_utc_offset()).date()
+    try:
+        start_date = date.fromisoformat(request.args.get('start') or (today - timedelta(days=29)).isoformat())
+        end_date = date.fromisoformat(request.args.get('end') or today.isoformat())
+    except ValueError:
+        return jsonify({'message': 'start and end must be dates (YYYY-MM-DD).'}), 400
+    start = datetime.combine(start_date, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    try:
+        series = reports.get_email_series(
+            start, end,
+            granularity=request.args.get('granularity', 'day'),
+            sequence_id=request.args.get('sequence_id', type=int),
+            list_id=request.args.get('list_id', type=int),
+            smtp_config_id=request.args.get('smtp_config_id', type=int)
+        )
+    except reports.ReportRangeError as e:
+        return jsonify({'message': str(e)}), 400
+    if series is None:
+        return jsonify({'message': 'Could not load the report. Please try again.'}), 500
+    series['buckets'] = [bucket.isoformat() for bucket in series['buckets']]
+    series['time_zone'] = Config.DB_SESSION_TIME_ZONE
+    return jsonify(series)
+
+
 @reports_bp.route('/reports/future-scheduled')
 @login_required
 def future_scheduled_emails():
@@ -59,38 +110,52 @@ def future_scheduled_emails():
 # --- MODIFICATION END ---
 
 
-@reports_bp.route('/reports/future-scheduled/events')
-@login_required
-def future_scheduled_emails_events():
-    # --- MODIFICATION START: Simplified to fetch all events without filtering ---
-    # The list_name_filter logic has been removed.
+IST_OFFSET = timedelta(hours=5, minutes=30)
+# Widest window the calendar may ask for (its month view spans six weeks).
+MAX_CALENDAR_WINDOW = timedelta(days=92)
 
-    # Fetch the aggregated summary for all upcoming emails.
-    scheduled_summary_utc = reports.get_future_scheduled_emails_summary()
-    # --- MODIFICATION END ---
 
-    ist_offset = timedelta(hours=5, minutes=30)
+def _calendar_bound_to_utc(value):
+    """
+    FullCalendar sends window bounds in the calendar's time zone (IST, without
+    an offset for named zones) or, for other setups, with an explicit offset.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed - IST_OFFSET
+
+
+def _calendar_events(scheduled_summary_utc):
     events = []
     for item in scheduled_summary_utc:
         if item.get('schedule_time'):
-            ist_time = item['schedule_time'] + ist_offset
-
-            list_names = item.get('list_names', 'Unknown List')
-            total_recipients = item.get('total_recipients', 0)
-
-            # --- MODIFICATION START: Changed event title to show the aggregated count ---
-            # The title now clearly states the total number of emails for that time slot.
-            event_title = f"{int(total_recipients)} Emails"
-            # --- MODIFICATION END ---
-
+            ist_time = item['schedule_time'] + IST_OFFSET
+            total_recipients = int(item.get('total_recipients') or 0)
             events.append({
-                'title': event_title,
+                'title': f"{total_recipients} Emails",
                 'start': ist_time.isoformat(),
                 'extendedProps': {
                     'sequenceNames': item.get('sequence_names'),
-                    'listNames': list_names,
-                    'recipientCount': int(total_recipients)
+                    'listNames': item.get('list_names') or 'Unknown List',
+                    'recipientCount': total_recipients
                 }
             })
+    return events
 
-    return jsonify(events)
\ No newline at end of file
+
+@reports_bp.route('/reports/future-scheduled/events')
+@login_required
+def future_scheduled_emails_events():
+    """Events for the calendar's visible window (?start=&end=, default the next six weeks)."""
+    try:
+        start = _calendar_bound_to_utc(request.args['start']) if request.args.get('start') else datetime.utcnow()
+        end = _calendar_bound_to_utc(request.args['end']) if request.args.get('end') else start + timedelta(weeks=6)
+    except ValueError:
+        return jsonify({'message': 'start and end must be ISO 8601 dates.'}), 400
+    if end <= start or end - start > MAX_CALENDAR_WINDOW:
+        return jsonify({'message': 'The calendar window must be positive and at most 92 days.'}), 400
+    events = reports.get_cached_scheduled_calendar(start, end, _calendar_events)
+    if events is None:
+        return jsonify({'message': 'Could not load the scheduled emails. Please try again.'}), 500
+    return jsonify(events)
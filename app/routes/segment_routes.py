@@ -0,0 +1,62 @@
+# app/routes/segment_routes.py
+from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask_login import login_required, current_user
+from app.models.segment import (
+    create_segment, get_segments, delete_segment, SegmentFilterError, FILTER_FIELDS
+)
+from app.models.contact import get_lists
+from app.utils.contact_maintenance import refresh_segment_membership
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+segment_bp = Blueprint('segment', __name__, url_prefix='/segments')
+
+
+@segment_bp.route('/', methods=['GET', 'POST'])
+@login_required
+def segments():
+    if request.method == 'POST':
+        name = request.form.get('name', '').strip()
+        if not name:
+            flash('A segment needs a name.', 'error')
+            return redirect(url_for('segment.segments'))
+        try:
+            filters = json.loads(request.form.get('filter') or '{}')
+            segment_id = create_segment(name, current_user.id, filters)
+        except (ValueError, SegmentFilterError) as e:
+            flash(f'Invalid segment filter: {e}', 'error')
+            return redirect(url_for('segment.segments'))
+        if not segment_id:
+            flash('Failed to save the segment.', 'error')
+            return redirect(url_for('segment.segments'))
+        # Membership is computed in the background; the count fills in once it is done.
+        refresh_segment_membership.delay(segment_id)
+        flash(f"Segment '{name}' saved. Its contacts are being selected now.", 'success')
+        return redirect(url_for('segment.segments'))
+
+    all_segments = get_segments()
+    for segment in all_segments:
+        segment['filter'] = json.loads(segment['filter'])
+    return render_template(
+        'segments.html', segments=all_segments, lists=get_lists(),
+        filter_fields={field: list(ops) for field, ops in FILTER_FIELDS.items()}
+    )
+
+
+@segment_bp.route('/<int:segment_id>/refresh', methods=['POST'])
+@login_required
+def refresh(segment_id):
+    refresh_segment_membership.delay(segment_id)
+    flash('Segment refresh started.', 'info')
+    return redirect(url_for('segment.segments'))
+
+
+@segment_bp.route('/<int:segment_id>/delete', methods=['POST'])
+@login_required
+def delete(segment_id):
+    if delete_segment(segment_id):
+        flash('Segment deleted.', 'success')
+    else:
+        flash('Could not delete the segment. Sequences that target it must be deleted first.', 'error')
+    return redirect(url_for('segment.segments'))
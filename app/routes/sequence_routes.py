@@ -2,13 +2,16 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 from flask_login import login_required, current_user
 from app.models.sequence import (
-    create_sequence, get_sequences_by_user, get_sequence, delete_sequence,
+    create_sequence, get_sequences_by_user, get_sequence, mark_sequence_deleted,
     create_sequence_step, get_sequence_steps, get_sequence_step,
     update_sequence_step, delete_sequence_step, get_previous_step_subject
 )
 from app.models.contact import get_lists
+from app.models.segment import get_segments
 from app.models.campaign import get_campaigns
 from app.models.smtp_config import get_smtp_configs
+from app.database import unit_of_work, UnitOfWorkAborted
+from app.utils.background_deletes import purge_sequence
 from datetime import datetime
 import pytz
 import logging
@@ -32,19 +35,31 @@ def create_sequence_route():
     if request.method == 'POST':
         try:
             name = request.form.get('sequence_name')
-            list_id = request.form.get('list_id')
+            # The target is a list id, or "segment:<id>" for a saved segment.
+            target = request.form.get('list_id', '')
+            list_id, segment_id = None, None
+            if target.startswith('segment:'):
+                segment_id = int(target.split(':', 1)[1])
+            else:
+                list_id = int(target)
             config_id = request.form.get('sending_config')
-            sequence_id = create_sequence(name, int(list_id), current_user.id, 'smtp', int(config_id))
-            if sequence_id:
-                steps_data = {}
-                step_pattern = re.compile(r'step\[(\d+)\]\[(\w+)\]')
-                for key, value in request.form.items():
-                    match = step_pattern.match(key)
-                    if match:
-                        step_number, field_name = match.groups()
-                        if step_number not in steps_data: steps_data[step_number] = {}
-                        steps_data[step_number][field_name] = value
-                
+            steps_data = {}
+            step_pattern = re.compile(r'step\[(\d+)\]\[(\w+)\]')
+            for key, value in request.form.items():
+                match = step_pattern.match(key)
+                if match:
+                    step_number, field_name = match.groups()
+                    if step_number not in steps_data: steps_data[step_number] = {}
+                    steps_data[step_number][field_name] = value
+
+            # The sequence and all of its steps are saved together or not at all.
+            with unit_of_work():
+                sequence_id = create_sequence(
+                    name, list_id, current_user.id, 'smtp', int(config_id), segment_id=segment_id
+                )
+                if not sequence_id:
+                    raise UnitOfWorkAborted("Could not create the sequence.")
+
                 for step_num_str in sorted(steps_data.keys(), key=int):
                     step_data = steps_data[step_num_str]
                     naive_schedule_time = datetime.fromisoformat(step_data['schedule_time'])
@@ -52,7 +67,7 @@ def create_sequence_route():
                     
                     # --- FIXED FUNCTION CALL ---
                     # Removed incorrect 'step_type' argument and used keywords for clarity.
-                    create_sequence_step(
+                    step_created = create_sequence_step(
                         sequence_id=sequence_id, 
                         step_number=int(step_num_str), 
                         schedule_time=utc_schedule_time,
@@ -60,8 +75,11 @@ def create_sequence_route():
                         is_re_reply='is_re_reply' in step_data,
                         campaign_id=step_data.get('campaign_id')
                     )
-                flash('Sequence created successfully!', 'success')
-                return redirect(url_for('sequence.manage_sequence', sequence_id=sequence_id))
+                    if not step_created:
+                        raise UnitOfWorkAborted(f"Could not create step {step_num_str}.")
+
+            flash('Sequence created successfully!', 'success')
+            return redirect(url_for('sequence.manage_sequence', sequence_id=sequence_id))
         except Exception as e:
             logger.error(f"Error during sequence creation: {e}")
             flash('An error occurred during creation.', 'error')
@@ -69,7 +87,9 @@ def create_sequence_route():
     lists = get_lists()
     smtp_configs = get_smtp_configs(current_user.id)
     campaigns = get_campaigns()
-    return render_template('create_sequence.html', lists=lists, smtp_configs=smtp_configs, campaigns=campaigns)
+    return render_template(
+        'create_sequence.html', lists=lists, segments=get_segments(), smtp_configs=smtp_configs, campaigns=campaigns
+    )
 
 @sequence_bp.route('/add_step/<int:sequence_id>', methods=['GET', 'POST'])
 @login_required
@@ -146,7 +166,10 @@ def manage_sequence(sequence_id):
 @sequence_bp.route('/delete/<int:sequence_id>', methods=['POST'])
 @login_required
 def delete_sequence_route(sequence_id):
-    if delete_sequence(sequence_id): flash('Sequence deleted.', 'success')
+    # Hidden (and stopped) immediately; its steps are deleted in the background.
+    if mark_sequence_deleted(sequence_id):
+        purge_sequence.delay(sequence_id)
+        flash('Sequence deleted.', 'success')
     else: flash('Error deleting sequence.', 'error')
     return redirect(url_for('sequence.list_sequences'))
 
@@ -0,0 +1,71 @@
+# app/utils/background_deletes.py
+
+import logging
+import time
+from app.celery_app import celery
+from app.config import Config
+from app.models.contact import (
+    purge_list_batch, get_deleted_list_ids, remove_contacts_from_list
+)
+from app.models.sequence import purge_sequence_batch, get_deleted_sequence_ids
+from app.models.segment import refresh_segments_for
+
+logger = logging.getLogger(__name__)
+
+
+def _pause():
+    # Gives the scheduler and web requests a window to take the locks between batches.
+    if Config.DELETE_BATCH_PAUSE_SECONDS > 0:
+        time.sleep(Config.DELETE_BATCH_PAUSE_SECONDS)
+
+
+def _purge_in_batches(purge_batch, object_id, label):
+    """Calls purge_batch(object_id, DELETE_BATCH_SIZE) until it reports nothing left. Returns rows removed."""
+    total = 0
+    while True:
+        removed = purge_batch(object_id, Config.DELETE_BATCH_SIZE)
+        if removed is None:
+            logger.error(f"Purge of {label} {object_id} stopped after {total} rows; the hourly sweep will resume it.")
+            return total
+        if removed == 0:
+            logger.info(f"Purged {label} {object_id} ({total} rows).")
+            return total
+        total += removed
+        _pause()
+
+
+@celery.task
+def purge_list(list_id):
+    """Removes a tombstoned list's memberships in small committed batches, then the list."""
+    # Segments filtering on the list drop its members now rather than batch by batch.
+    refresh_segments_for(list_id=list_id)
+    return _purge_in_batches(purge_list_batch, list_id, 'list')
+
+
+@celery.task
+def purge_sequence(sequence_id):
+    """Removes a tombstoned sequence's steps in small committed batches, then the sequence."""
+    return _purge_in_batches(purge_sequence_batch, sequence_id, 'sequence')
+
+
+@celery.task
+def remove_list_contacts(list_id, contact_ids):
+    """Removes a large selection of contacts from a list, DELETE_BATCH_SIZE per transaction."""
+    removed = 0
+    for start in range(0, len(contact_ids), Config.DELETE_BATCH_SIZE):
+        batch_removed = remove_contacts_from_list(list_id, contact_ids[start:start + Config.DELETE_BATCH_SIZE])
+        if batch_removed is None:
+            break
+        removed += batch_removed
+        _pause()
+    logger.info(f"Removed {removed} contacts from list {list_id}.")
+    return removed
+
+
+@celery.task
+def purge_tombstones():
+    """Hourly: finishes purges that were interrupted (worker restart, DB error)."""
+    for list_id in get_deleted_list_ids():
+        purge_list(list_id)
+    for sequence_id in get_deleted_sequence_ids():
+        purge_sequence(sequence_id)
@@ -0,0 +1,121 @@
+# app/utils/cache.py
+
+import json
+import logging
+import time
+import uuid
+import redis
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Seconds between cache checks while another process computes the value.
+WAIT_POLL_SECONDS = 0.05
+# Releases the compute lock only if it is still ours (it may have expired and
+# been taken by another process meanwhile).
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+_client = None
+
+
+def get_redis():
+    """The shared Redis client for caches, created on first use."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            Config.REDIS_URL,
+            socket_timeout=Config.CACHE_SOCKET_TIMEOUT,
+            socket_connect_timeout=Config.CACHE_SOCKET_TIMEOUT,
+            decode_responses=True
+        )
+    return _client
+
+
+def _read(client, key):
+    cached = client.get(key)
+    return json.loads(cached) if cached is not None else None
+
+
+def get_or_compute(key, ttl, compute, lock_seconds=10, wait_seconds=5):
+    """
+    Returns the JSON-serializable value cached under `key`, computing and
+    caching it for `ttl` seconds on a miss.
+
+    Concurrent misses are coalesced: one caller takes a short-lived lock and
+    runs `compute()` while the others poll the cache for up to `wait_seconds`
+    before giving up and computing it themselves. If Redis is unavailable the
+    value is simply computed. `compute()` returns None on failure; that is
+    passed back without being cached.
+    """
+    try:
+        client = get_redis()
+        value = _read(client, key)
+        if value is not None:
+            return value
+
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        if client.set(lock_key, token, nx=True, ex=lock_seconds):
+            try:
+                value = compute()
+                if value is not None:
+                    client.set(key, json.dumps(value), ex=ttl)
+                return value
+            finally:
+                client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_POLL_SECONDS)
+            value = _read(client, key)
+            if value is not None:
+                return value
+        logger.warning(f"Timed out waiting for cache key {key}; computing it here.")
+    except redis.RedisError as e:
+        logger.error(f"Cache unavailable for {key}: {e}")
+    return compute()
+
+
+def refresh(key, ttl, compute):
+    """
+    Computes the value now, bypassing the cache, and stores it for `ttl`
+    seconds so other readers get it too. A None from `compute()` is not stored.
+    """
+    value = compute()
+    if value is not None:
+        try:
+            get_redis().set(key, json.dumps(value), ex=ttl)
+        except redis.RedisError as e:
+            logger.error(f"Cache unavailable for {key}: {e}")
+    return value
+
+
+def get_versions(keys):
+    """
+    Current values of version counters (0 when never bumped), for building
+    cache keys that change whenever the data behind them does. Returns None
+    when Redis is unavailable, in which case nothing should be cached.
+    """
+    try:
+        return [int(value or 0) for value in get_redis().mget(keys)]
+    except redis.RedisError as e:
+        logger.error(f"Could not read cache versions {keys}: {e}")
+        return None
+
+
+def bump_versions(keys):
+    """Increments version counters so every cache key built from them is skipped from now on."""
+    if not keys:
+        return
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for key in keys:
+            pipeline.incr(key)
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.error(f"Could not bump cache versions {keys}: {e}")
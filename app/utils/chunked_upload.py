@@ -0,0 +1,188 @@
+# app/utils/chunked_upload.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from app.celery_app import celery
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+_UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+MANIFEST_NAME = 'manifest.json'
+# Created with O_EXCL by the one request allowed to assemble an upload.
+ASSEMBLY_LOCK_NAME = 'assembling.lock'
+# Bytes read from the request body at a time while a chunk is written.
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class ChunkedUploadError(ValueError):
+    """A chunked upload request that cannot be honoured; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def uploads_dir():
+    return os.path.join(Config.UPLOAD_DIR, 'chunked')
+
+
+def _upload_dir(upload_id):
+    return os.path.join(uploads_dir(), upload_id)
+
+
+def _chunk_path(upload_id, index):
+    return os.path.join(_upload_dir(upload_id), f"chunk_{index:06d}")
+
+
+def create_upload(user_id, filename, size, list_name, column_map=None):
+    """Starts a chunked upload and returns its manifest (upload_id, chunk_size, total_chunks, ...)."""
+    if size <= 0:
+        raise ChunkedUploadError('The file is empty.')
+    if size > Config.CHUNKED_UPLOAD_MAX_BYTES:
+        raise ChunkedUploadError('The file is too large.', status=413)
+
+    chunk_size = Config.UPLOAD_CHUNK_SIZE
+    manifest = {
+        'upload_id': uuid.uuid4().hex,
+        'user_id': user_id,
+        'filename': filename,
+        'size': size,
+        'chunk_size': chunk_size,
+        'total_chunks': (size + chunk_size - 1) // chunk_size,
+        'list_name': list_name,
+        'column_map': column_map or {},
+        'created_at': time.time()
+    }
+    os.makedirs(_upload_dir(manifest['upload_id']))
+    with open(os.path.join(_upload_dir(manifest['upload_id']), MANIFEST_NAME), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file)
+    return manifest
+
+
+def load_upload(upload_id, user_id):
+    """Returns the manifest of one of the user's uploads, or None."""
+    if not _UPLOAD_ID_RE.match(upload_id):
+        return None
+    try:
+        with open(os.path.join(_upload_dir(upload_id), MANIFEST_NAME), encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        return None
+    return manifest if manifest['user_id'] == user_id else None
+
+
+def expected_chunk_size(manifest, index):
+    if index == manifest['total_chunks'] - 1:
+        return manifest['size'] - index * manifest['chunk_size']
+    return manifest['chunk_size']
+
+
+def received_chunks(manifest):
+    """Indices of the chunks already stored and verified."""
+    received = []
+    for name in os.listdir(_upload_dir(manifest['upload_id'])):
+        if name.startswith('chunk_') and name[6:].isdigit():
+            received.append(int(name[6:]))
+    return sorted(received)
+
+
+def save_chunk(manifest, index, stream, sha256):
+    """
+    Streams one chunk from the request body to disk and keeps it only if its
+    size and SHA-256 match. Re-sending a chunk simply replaces it.
+    """
+    if not 0 <= index < manifest['total_chunks']:
+        raise ChunkedUploadError('Chunk index out of range.')
+    sha256 = (sha256 or '').lower()
+    if not _SHA256_RE.match(sha256):
+        raise ChunkedUploadError('A SHA-256 checksum of the chunk is required.')
+
+    expected = expected_chunk_size(manifest, index)
+    final_path = _chunk_path(manifest['upload_id'], index)
+    temp_path = f"{final_path}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(temp_path, 'wb') as chunk_file:
+            while True:
+                data = stream.read(COPY_BUFFER_SIZE)
+                if not data:
+                    break
+                written += len(data)
+                if written > expected:
+                    raise ChunkedUploadError('Chunk is larger than expected.', status=413)
+                digest.update(data)
+                chunk_file.write(data)
+        if written != expected:
+            raise ChunkedUploadError(f'Chunk {index} should be {expected} bytes but {written} arrived.')
+        if digest.hexdigest() != sha256:
+            raise ChunkedUploadError(f'Checksum mismatch for chunk {index}.', status=422)
+        os.replace(temp_path, final_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def assemble_upload(manifest, destination):
+    """
+    Concatenates every chunk, in order, into `destination` and deletes the
+    chunks. Only one request may complete an upload: a concurrent call gets
+    a 409 instead of importing the same file twice.
+    """
+    lock_path = os.path.join(_upload_dir(manifest['upload_id']), ASSEMBLY_LOCK_NAME)
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        raise ChunkedUploadError('This upload is already being completed.', status=409)
+    except FileNotFoundError:
+        raise ChunkedUploadError('Upload not found.', status=404)
+
+    temp_path = f"{destination}.part"
+    try:
+        missing = sorted(set(range(manifest['total_chunks'])) - set(received_chunks(manifest)))
+        if missing:
+            raise ChunkedUploadError(f"{len(missing)} chunks are still missing.", status=409)
+        with open(temp_path, 'wb') as assembled:
+            for index in range(manifest['total_chunks']):
+                with open(_chunk_path(manifest['upload_id'], index), 'rb') as chunk_file:
+                    shutil.copyfileobj(chunk_file, assembled, COPY_BUFFER_SIZE)
+        if os.path.getsize(temp_path) != manifest['size']:
+            raise ChunkedUploadError('The assembled file does not have the announced size.', status=422)
+        os.replace(temp_path, destination)
+    except BaseException:
+        # Let the client fix the upload and complete it again.
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        os.remove(lock_path)
+        raise
+    discard_upload(manifest['upload_id'])
+    return destination
+
+
+def discard_upload(upload_id):
+    shutil.rmtree(_upload_dir(upload_id), ignore_errors=True)
+
+
+@celery.task
+def purge_stale_uploads():
+    """Hourly: removes chunked uploads that were never completed within CHUNKED_UPLOAD_TTL_HOURS."""
+    if not os.path.isdir(uploads_dir()):
+        return 0
+    cutoff = time.time() - Config.CHUNKED_UPLOAD_TTL_HOURS * 3600
+    purged = 0
+    for upload_id in os.listdir(uploads_dir()):
+        path = _upload_dir(upload_id)
+        if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            discard_upload(upload_id)
+            purged += 1
+    if purged:
+        logger.info(f"Purged {purged} abandoned chunked uploads.")
+    return purged
@@ -0,0 +1,199 @@
+# app/utils/contact_file_reader.py
+
+import csv
+import gzip
+import io
+import re
+import zipfile
+from contextlib import contextmanager
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTACT_COLUMNS = ('name', 'email', 'location', 'company_name')
+REQUIRED_COLUMNS = ('name', 'email')
+
+# Header spellings recognised for each contact column, compared after
+# normalize_header(); a user-supplied column map takes precedence.
+HEADER_ALIASES = {
+    'name': ('name', 'full name', 'fullname', 'contact name', 'contact'),
+    'email': ('email', 'e mail', 'email address', 'e mail address', 'mail', 'work email'),
+    'location': ('location', 'city', 'address', 'country', 'region'),
+    'company_name': ('company name', 'company', 'organization', 'organisation', 'account name', 'employer'),
+}
+
+SUPPORTED_FORMATS = ('csv', 'gzip', 'zip', 'xlsx')
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZIP_MAGIC = b'PK\x03\x04'
+_HEADER_SEPARATORS_RE = re.compile(r'[\s_\-]+')
+
+
+class ContactFileError(ValueError):
+    """The uploaded file cannot be read as a contact list."""
+
+
+def normalize_header(value):
+    return _HEADER_SEPARATORS_RE.sub(' ', str(value or '')).strip().lower()
+
+
+def resolve_columns(header, column_map=None):
+    """
+    Maps contact columns to positions in `header`. `column_map` is an optional
+    {'email': 'Work Email', ...} override. Raises ContactFileError if name or
+    email cannot be found.
+    """
+    positions = {}
+    normalized = [normalize_header(value) for value in header]
+    for column in CONTACT_COLUMNS:
+        wanted = (column_map or {}).get(column)
+        candidates = (normalize_header(wanted),) if wanted else HEADER_ALIASES[column]
+        for candidate in candidates:
+            if candidate in normalized:
+                positions[column] = normalized.index(candidate)
+                break
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in positions]
+    if missing:
+        raise ContactFileError(
+            f"Could not find a column for {' and '.join(missing)} in the header "
+            f"({', '.join(str(value) for value in header)})."
+        )
+    return positions
+
+
+def _zip_data_member(archive):
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+    ]
+    if len(members) != 1:
+        raise ContactFileError("A zip upload must contain exactly one CSV or TSV file.")
+    return members[0]
+
+
+def detect_format(path):
+    """Returns 'csv' (any delimited text), 'gzip', 'zip' or 'xlsx' from the file's leading bytes."""
+    with open(path, 'rb') as upload:
+        magic = upload.read(4)
+    if magic.startswith(_GZIP_MAGIC):
+        return 'gzip'
+    if magic == _ZIP_MAGIC:
+        try:
+            with zipfile.ZipFile(path) as archive:
+                if 'xl/workbook.xml' in archive.namelist():
+                    return 'xlsx'
+        except zipfile.BadZipFile as e:
+            raise ContactFileError(f"Corrupt zip file: {e}")
+        return 'zip'
+    return 'csv'
+
+
+def _sniff_delimiter(binary_stream):
+    """Picks tab, semicolon or comma from the header line without consuming the stream."""
+    head = binary_stream.peek(65536)[:65536]
+    header_line = head.split(b'\n', 1)[0]
+    if b'\t' in header_line:
+        return '\t'
+    if header_line.count(b';') > header_line.count(b','):
+        return ';'
+    return ','
+
+
+@contextmanager
+def open_delimited(path):
+    """
+    Yields (binary_stream, delimiter) for a plain, gzip- or zip-compressed
+    delimited text upload. Decompression streams; nothing is buffered whole.
+    """
+    file_format = detect_format(path)
+    if file_format == 'xlsx':
+        raise ContactFileError("XLSX files are not delimited text.")
+
+    if file_format == 'zip':
+        with zipfile.ZipFile(path) as archive:
+            member = _zip_data_member(archive)
+            with archive.open(member) as raw:
+                binary_stream = io.BufferedReader(raw)
+                yield binary_stream, _sniff_delimiter(binary_stream)
+        return
+
+    opener = gzip.open if file_format == 'gzip' else open
+    with opener(path, 'rb') as raw:
+        binary_stream = raw if hasattr(raw, 'peek') else io.BufferedReader(raw)
+        yield binary_stream, _sniff_delimiter(binary_stream)
+
+
+def iter_delimited_rows(binary_stream, delimiter=',', column_map=None):
+    """Yields contact dicts from a delimited text stream, decoding it incrementally."""
+    text_stream = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from _mapped_rows(csv.reader(text_stream, delimiter=delimiter), column_map)
+    finally:
+        text_stream.detach()
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _iter_xlsx_rows(path, column_map=None):
+    from openpyxl import load_workbook
+
+    # read_only streams the sheet XML row by row instead of building the whole workbook.
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except Exception as e:
+        raise ContactFileError(f"Could not open the spreadsheet: {e}")
+    try:
+        sheet = workbook.worksheets[0]
+        # Formatted-but-empty rows are common in spreadsheets; drop them.
+        rows = (
+            [_cell_text(value) for value in values]
+            for values in sheet.iter_rows(values_only=True)
+            if any(value is not None for value in values)
+        )
+        yield from _mapped_rows(rows, column_map)
+    finally:
+        workbook.close()
+
+
+def _mapped_rows(rows, column_map):
+    try:
+        header = next(rows, None)
+        if header is None:
+            return
+        positions = resolve_columns(header, column_map)
+        for values in rows:
+            # Blank lines are skipped, as csv.DictReader does.
+            if not values:
+                continue
+            yield {
+                column: values[position] if position < len(values) else ''
+                for column, position in positions.items()
+            }
+    except (OSError, EOFError, zipfile.BadZipFile) as e:
+        raise ContactFileError(f"Could not read the file: {e}")
+
+
+@contextmanager
+def open_contact_rows(path, column_map=None):
+    """Yields an iterator of contact dicts (name/email/location/company_name) read from any supported upload."""
+    if detect_format(path) == 'xlsx':
+        rows = _iter_xlsx_rows(path, column_map)
+        try:
+            yield rows
+        finally:
+            rows.close()
+        return
+
+    with open_delimited(path) as (binary_stream, delimiter):
+        rows = iter_delimited_rows(binary_stream, delimiter, column_map)
+        try:
+            yield rows
+        finally:
+            rows.close()
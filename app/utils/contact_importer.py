@@ -0,0 +1,154 @@
+# app/utils/contact_importer.py
+
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from app.celery_app import celery
+from app.config import Config
+from app.models.contact import create_list, bulk_save_contacts, mark_list_deleted
+from app.models.import_job import (
+    get_import_job, update_import_job, STATUS_VALIDATING, STATUS_IMPORTING,
+    STATUS_COMPLETED, STATUS_FAILED, FINAL_STATUSES
+)
+from app.utils.contact_file_reader import open_contact_rows
+from app.utils.csv_processor import validate_upload_file, iter_row_batches
+from app.utils.contact_maintenance import refresh_list_segments
+from app.utils.background_deletes import purge_list
+
+logger = logging.getLogger(__name__)
+
+
+def imports_dir():
+    return os.path.join(Config.UPLOAD_DIR, 'imports')
+
+
+def new_import_path():
+    """Returns a fresh path under UPLOAD_DIR/imports for an import job's file."""
+    os.makedirs(imports_dir(), exist_ok=True)
+    return os.path.join(imports_dir(), f"{uuid.uuid4().hex}.upload")
+
+
+def store_upload(file_storage):
+    """Saves an uploaded file under UPLOAD_DIR/imports and returns its path."""
+    path = new_import_path()
+    file_storage.save(path)
+    return path
+
+
+def _remove_upload(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove import file {path}: {e}")
+
+
+def _fail(job_id, message):
+    logger.error(f"Import job {job_id} failed: {message}")
+    update_import_job(job_id, status=STATUS_FAILED, error=message, finished_at=datetime.now())
+
+
+def _discard_list(list_id):
+    """Tombstones a list whose import failed half-way; its saved memberships are purged in the background."""
+    if mark_list_deleted(list_id):
+        purge_list.delay(list_id)
+    else:
+        logger.error(f"Could not remove list {list_id} after its import failed.")
+
+
+def _run_import(job):
+    job_id = job['id']
+    update_import_job(job_id, status=STATUS_VALIDATING, started_at=datetime.now())
+
+    column_map = json.loads(job['column_map']) if job.get('column_map') else None
+
+    # Pass 1: validate everything first so a bad file never creates a half-filled list.
+    is_valid, errors, stats = validate_upload_file(job['file_path'], column_map)
+    update_import_job(job_id, rows_parsed=stats['rows_parsed'], rows_valid=stats['rows_valid'])
+    if not is_valid:
+        _fail(job_id, "Upload failed. Please fix the following errors: " + ", ".join(errors))
+        return
+
+    list_id = create_list(job['list_name'], job['user_id'])
+    if not list_id:
+        _fail(job_id, "Failed to create list. A list with this name may already exist.")
+        return
+    update_import_job(job_id, list_id=list_id, status=STATUS_IMPORTING, import_started_at=datetime.now())
+
+    # Pass 2: re-read the file and bulk insert, publishing the running totals after every commit.
+    try:
+        with open_contact_rows(job['file_path'], column_map) as rows:
+            result = bulk_save_contacts(
+                list_id, iter_row_batches(rows, prevalidated=True),
+                on_progress=lambda inserted, duplicates: update_import_job(
+                    job_id, rows_inserted=inserted, rows_duplicate=duplicates
+                )
+            )
+    except Exception:
+        _discard_list(list_id)
+        raise
+    if result is None:
+        # Batches already committed would leave a half-filled list behind.
+        _discard_list(list_id)
+        _fail(job_id, "Saving the contacts failed, so the list was not created. Please try again.")
+        return
+
+    # Imported people may now match (or no longer match) saved segments.
+    refresh_list_segments.delay(list_id)
+    inserted, duplicates = result
+    update_import_job(
+        job_id, status=STATUS_COMPLETED, rows_inserted=inserted, rows_duplicate=duplicates,
+        finished_at=datetime.now()
+    )
+    logger.info(f"Import job {job_id}: {inserted} contacts saved to list {list_id}, {duplicates} duplicates skipped.")
+
+
+@celery.task
+def import_contacts(job_id):
+    """Validates and loads the file of one import job; the file is deleted afterwards."""
+    job = get_import_job(job_id)
+    if not job:
+        logger.error(f"Import job {job_id} not found.")
+        return
+    if job['status'] in FINAL_STATUSES:
+        return
+    try:
+        _run_import(job)
+    except Exception as e:
+        _fail(job_id, f"Unexpected error while importing: {e}")
+    finally:
+        _remove_upload(job['file_path'])
+
+
+def describe_import_job(job):
+    """Returns the JSON status of a job, with an ETA once inserting has started."""
+    processed = job['rows_inserted'] + job['rows_duplicate']
+    eta_seconds = None
+    if job['status'] == STATUS_IMPORTING and job['import_started_at'] and processed:
+        elapsed = (datetime.now() - job['import_started_at']).total_seconds()
+        remaining = max(job['rows_valid'] - processed, 0)
+        eta_seconds = round(remaining * elapsed / processed)
+
+    if job['status'] == STATUS_COMPLETED:
+        message = f"Successfully uploaded {job['rows_inserted']} contacts."
+        if job['rows_duplicate'] > 0:
+            message += f" Skipped {job['rows_duplicate']} duplicates."
+    else:
+        message = job['error']
+
+    return {
+        'job_id': job['id'],
+        'list_name': job['list_name'],
+        'list_id': job['list_id'],
+        'status': job['status'],
+        'rows_parsed': job['rows_parsed'],
+        'rows_valid': job['rows_valid'],
+        'rows_inserted': job['rows_inserted'],
+        'rows_duplicate': job['rows_duplicate'],
+        'eta_seconds': eta_seconds,
+        'finished': job['status'] in FINAL_STATUSES,
+        'message': message
+    }
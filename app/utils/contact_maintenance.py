@@ -0,0 +1,49 @@
+# app/utils/contact_maintenance.py
+
+import logging
+from app.celery_app import celery
+from app.models.contact import reconcile_list_records_counts
+from app.models.segment import (
+    refresh_segment, refresh_segments_for, refresh_dirty_segment_contacts, get_time_based_segment_ids
+)
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task
+def reconcile_list_counts():
+    """Hourly: repairs lists.records wherever it drifted from the list_membership rows."""
+    drifted = reconcile_list_records_counts()
+    if drifted:
+        logger.warning(f"Corrected records count of {len(drifted)} lists: {drifted}")
+    return drifted
+
+
+@celery.task
+def refresh_segment_membership(segment_id):
+    """Fully re-evaluates one segment (after it is created, or on demand)."""
+    result = refresh_segment(segment_id)
+    if result:
+        logger.info(f"Segment {segment_id}: {result[0]} contacts added, {result[1]} removed.")
+    return result
+
+
+@celery.task
+def refresh_list_segments(list_id):
+    """Re-evaluates every segment for the members of one list, e.g. after an import."""
+    return refresh_segments_for(list_id=list_id)
+
+
+@celery.task
+def refresh_dirty_segments():
+    """Every minute: re-evaluates segments for contacts queued by adds, removals and sends."""
+    return refresh_dirty_segment_contacts()
+
+
+@celery.task
+def refresh_time_based_segments():
+    """Hourly: fully refreshes segments with "mailed within N days" style conditions, which age on their own."""
+    segment_ids = get_time_based_segment_ids()
+    for segment_id in segment_ids:
+        refresh_segment(segment_id)
+    return segment_ids
@@ -1,57 +1,304 @@
 import csv
-import io
-from app.utils.email_validator import check_email
+import os
+import warnings
+from app.config import Config
+from app.utils.contact_file_reader import (
+    ContactFileError, detect_format, iter_delimited_rows, open_contact_rows, open_delimited, resolve_columns
+)
+from app.utils.email_validator import (
+    check_email, validate_emails, validation_pool, is_valid_domain,
+    SIMPLE_LOCAL_PART_PATTERN, MAX_EMAIL_LENGTH, MAX_LOCAL_PART_LENGTH
+)
 import logging
 
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pandas is only needed for the columnar validation mode
+    np = pd = None
+
 logger = logging.getLogger(__name__)
 
-def validate_csv_data(csv_file):
+# Contacts handed to the insert path at a time.
+DEFAULT_BATCH_SIZE = 1000
+# Errors kept in the report; the rest are only counted so a broken file
+# cannot build an unbounded error list.
+MAX_REPORTED_ERRORS = 100
+# Rows whose emails are validated together (and split across processes in parallel mode).
+VALIDATION_CHUNK_SIZE = 5000
+# Rows per DataFrame in the columnar (pandas) validation mode.
+COLUMNAR_CHUNK_ROWS = 100000
+# local@domain with a plain ASCII dot-atom local part and an ASCII domain.
+_SIMPLE_ADDRESS_PATTERN = rf'(?:{SIMPLE_LOCAL_PART_PATTERN})@[\x00-\x3f\x41-\x7f]+'
+
+
+def _check_chunk(chunk, check_emails, pool):
+    candidates = []
+    results = []
+    for row_num, row in chunk:
+        name = (row.get('name') or '').strip()
+        email = (row.get('email') or '').strip()
+
+        # --- VALIDATION LOGIC ---
+        if not name or not email:
+            results.append((row_num, None, f"Row {row_num}: Name or Email is blank."))
+            continue
+
+        contact_data = {
+            'name': name,
+            'email': email,
+            'location': (row.get('location') or '').strip(),
+            'company_name': (row.get('company_name') or '').strip()
+        }
+        results.append((row_num, contact_data, None))
+        candidates.append(len(results) - 1)
+
+    if check_emails and candidates:
+        email_ok = validate_emails([results[i][1]['email'] for i in candidates], pool)
+        for i, ok in zip(candidates, email_ok):
+            if not ok:
+                row_num, contact_data, _error = results[i]
+                results[i] = (row_num, None, f"Row {row_num}: Email '{contact_data['email']}' is not a valid format.")
+    return results
+
+
+def _iter_rows(rows, check_emails=True, processes=None):
     """
-    Reads a CSV file and validates every row.
-    It does NOT save to the database. It only checks for validity.
+    Yields (row_num, contact_data, error) for every contact dict in `rows`.
+    Exactly one of contact_data / error is set. Emails are validated
+    VALIDATION_CHUNK_SIZE rows at a time, across `processes` worker processes
+    when more than one.
+    """
+    with validation_pool(processes) as pool:
+        chunk = []
+        for row_num, row in enumerate(rows, start=2):
+            chunk.append((row_num, row))
+            if len(chunk) >= VALIDATION_CHUNK_SIZE:
+                yield from _check_chunk(chunk, check_emails, pool)
+                chunk = []
+        if chunk:
+            yield from _check_chunk(chunk, check_emails, pool)
+
+
+def validation_processes_for(file_size):
+    """Worker processes to validate a file of `file_size` bytes with (0 = in-process)."""
+    if file_size >= Config.EMAIL_VALIDATION_PARALLEL_MIN_BYTES:
+        return Config.EMAIL_VALIDATION_PROCESSES
+    return 0
+
+
+def validate_rows(rows, max_errors=MAX_REPORTED_ERRORS, processes=None):
+    """
+    Validates every contact dict from `rows` (see app.utils.contact_file_reader)
+    in one streaming pass, keeping memory flat regardless of file size. Nothing is saved.
 
     Returns:
-        A tuple: (is_valid, data_or_errors)
-        - If all rows are valid: (True, list_of_contact_dictionaries)
-        - If any row is invalid: (False, list_of_error_messages)
+        A tuple: (is_valid, errors, stats)
+        - errors holds at most `max_errors` messages, plus a summary line when more were found
+        - stats is {'rows_parsed': int, 'rows_valid': int}
     """
-    contacts_to_save = []
     errors = []
-    
-    # Use a copy of the stream so it can be read again if needed
+    error_count = 0
+    stats = {'rows_parsed': 0, 'rows_valid': 0}
     try:
-        file_content = csv_file.stream.read().decode('utf-8-sig')
-        csv_file.stream.seek(0) # Reset stream pointer
-        text_stream = io.StringIO(file_content)
-    except Exception as e:
-        return False, [f"Error reading file: {e}"]
+        for _row_num, contact_data, error in _iter_rows(rows, processes=processes):
+            stats['rows_parsed'] += 1
+            if error:
+                error_count += 1
+                if error_count <= max_errors:
+                    errors.append(error)
+            else:
+                stats['rows_valid'] += 1
+    except (UnicodeDecodeError, csv.Error, ContactFileError) as e:
+        return False, [f"Error reading file: {e}"], stats
 
-    reader = csv.DictReader(text_stream)
+    if error_count > max_errors:
+        errors.append(f"...and {error_count - max_errors} more errors.")
+    return error_count == 0, errors, stats
 
-    for row_num, row in enumerate(reader, start=2):
-        name = row.get('name', '').strip()
-        email = row.get('email', '').strip()
 
-        # --- VALIDATION LOGIC ---
-        if not name or not email:
-            errors.append(f"Row {row_num}: Name or Email is blank.")
-            continue # Find all errors, don't stop at the first one
+def validate_csv_stream(binary_stream, max_errors=MAX_REPORTED_ERRORS, processes=None, delimiter=',', column_map=None):
+    """validate_rows for an uploaded CSV (or other delimited text) stream."""
+    return validate_rows(iter_delimited_rows(binary_stream, delimiter, column_map), max_errors, processes)
+
+
+def _stripped_column(chunk, positions, column):
+    if column not in positions:
+        return pd.Series('', index=chunk.index, dtype=object)
+    return chunk.iloc[:, positions[column]].str.strip()
+
+
+def _columnar_email_check(emails):
+    """
+    Vectorized equivalent of check_email for a Series of non-blank emails.
+    Returns (valid, normalized): normalized holds the valid emails with the
+    domain lower-cased. Plain ASCII addresses are decided by string column
+    operations plus one memoized domain check per distinct domain; the rest go
+    through check_email.
+    """
+    valid = pd.Series(False, index=emails.index)
+    if emails.empty:
+        return valid, pd.Series(dtype=object)
+
+    simple = emails.str.fullmatch(_SIMPLE_ADDRESS_PATTERN)
+    simple &= (emails.str.len() <= MAX_EMAIL_LENGTH) & (emails.str.find('@') <= MAX_LOCAL_PART_LENGTH)
+
+    addresses = emails[simple]
+    local_parts = addresses.str.replace(r'@[^@]*$', '', regex=True)
+    domains = addresses.str.replace(r'^[^@]*@', '', regex=True).str.lower()
+    domain_results = {value: is_valid_domain(value) for value in domains.unique()}
+    valid.loc[domains.index] = domains.map(domain_results).astype(bool)
+    normalized = local_parts + '@' + domains
+
+    rare = emails[~simple]
+    if not rare.empty:
+        valid.loc[rare.index] = rare.map(check_email).astype(bool)
+        rare_valid = rare[valid.loc[rare.index]]
+        if not rare_valid.empty:
+            rare_parts = rare_valid.str.rpartition('@')
+            normalized = pd.concat([normalized, rare_parts[0] + rare_parts[1] + rare_parts[2].str.lower()])
+    return valid, normalized[valid.loc[normalized.index]]
 
-        if not check_email(email):
-            errors.append(f"Row {row_num}: Email '{email}' is not a valid format.")
+
+def validate_csv_stream_columnar(binary_stream, max_errors=MAX_REPORTED_ERRORS, chunk_rows=COLUMNAR_CHUNK_ROWS,
+                                 delimiter=',', column_map=None):
+    """
+    Columnar version of validate_csv_stream for very large files: reads the CSV
+    in pandas chunks and runs trimming, blank checks, email checks and in-file
+    duplicate detection as column operations. Returns the same errors as the
+    row-wise path; stats additionally holds 'duplicates' (repeated emails,
+    compared with the domain lower-cased).
+    """
+    if pd is None:
+        raise RuntimeError("pandas is required for columnar CSV validation.")
+    errors = []
+    error_count = 0
+    stats = {'rows_parsed': 0, 'rows_valid': 0, 'duplicates': 0}
+    email_hashes = []
+    positions = None
+    try:
+        with warnings.catch_warnings():
+            # Extra trailing fields are dropped on purpose (index_col=False), as in the row-wise path.
+            warnings.filterwarnings('ignore', message='Length of header or names does not match',
+                                    category=pd.errors.ParserWarning)
+            reader = pd.read_csv(
+                binary_stream, sep=delimiter, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+                chunksize=chunk_rows,
+                # Never take the first column as the index, even when every row has
+                # a trailing extra field; the row-wise path ignores such fields too.
+                index_col=False
+            )
+            for chunk in reader:
+                # Number rows with a running counter like csv.DictReader (header is row 1).
+                chunk.index = pd.RangeIndex(stats['rows_parsed'] + 2, stats['rows_parsed'] + 2 + len(chunk))
+                if positions is None:
+                    positions = resolve_columns(list(chunk.columns), column_map)
+                name = _stripped_column(chunk, positions, 'name')
+                email = _stripped_column(chunk, positions, 'email')
+
+                blank = (name == '') | (email == '')
+                email_ok = pd.Series(False, index=chunk.index)
+                checked, normalized = _columnar_email_check(email[~blank])
+                email_ok.loc[checked.index] = checked
+                invalid = ~blank & ~email_ok
+
+                stats['rows_parsed'] += len(chunk)
+                stats['rows_valid'] += int(email_ok.sum())
+                chunk_errors = int(blank.sum() + invalid.sum())
+                remaining = max_errors - error_count
+                error_count += chunk_errors
+                if chunk_errors and remaining > 0:
+                    failed = (blank | invalid)
+                    failed_index = failed[failed].index[:remaining]
+                    for row_num in failed_index:
+                        if blank[row_num]:
+                            errors.append(f"Row {row_num}: Name or Email is blank.")
+                        else:
+                            errors.append(f"Row {row_num}: Email '{email[row_num]}' is not a valid format.")
+
+                if not normalized.empty:
+                    email_hashes.append(pd.util.hash_pandas_object(normalized, index=False).to_numpy())
+    except pd.errors.EmptyDataError:
+        return True, [], stats
+    except (UnicodeDecodeError, pd.errors.ParserError, ContactFileError) as e:
+        return False, [f"Error reading file: {e}"], stats
+
+    if email_hashes:
+        hashes = np.concatenate(email_hashes)
+        stats['duplicates'] = int(len(hashes) - len(np.unique(hashes)))
+    if error_count > max_errors:
+        errors.append(f"...and {error_count - max_errors} more errors.")
+    return error_count == 0, errors, stats
+
+
+def use_columnar_validation(file_size):
+    return (
+        pd is not None
+        and Config.COLUMNAR_VALIDATION_MIN_BYTES > 0
+        and file_size >= Config.COLUMNAR_VALIDATION_MIN_BYTES
+    )
+
+
+def validate_upload_file(path, column_map=None, max_errors=MAX_REPORTED_ERRORS):
+    """
+    Validates a stored upload of any supported format (see
+    app.utils.contact_file_reader): big delimited files column-wise with
+    pandas, everything else row by row.
+    """
+    file_size = os.path.getsize(path)
+    try:
+        if detect_format(path) != 'xlsx' and use_columnar_validation(file_size):
+            with open_delimited(path) as (binary_stream, delimiter):
+                return validate_csv_stream_columnar(
+                    binary_stream, max_errors, delimiter=delimiter, column_map=column_map
+                )
+        with open_contact_rows(path, column_map) as rows:
+            return validate_rows(rows, max_errors, processes=validation_processes_for(file_size))
+    except ContactFileError as e:
+        return False, [f"Error reading file: {e}"], {'rows_parsed': 0, 'rows_valid': 0}
+
+
+def iter_row_batches(rows, batch_size=DEFAULT_BATCH_SIZE, prevalidated=False):
+    """
+    Yields lists of up to `batch_size` validated contact dicts from `rows`,
+    skipping invalid ones. Pass prevalidated=True for rows that validation
+    already accepted to skip checking every email a second time.
+    """
+    batch = []
+    for _row_num, contact_data, _error in _iter_rows(rows, check_emails=not prevalidated):
+        if contact_data is None:
             continue
+        batch.append(contact_data)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-        # If valid, add the data to our list
-        contact_data = {
-            'name': name,
-            'email': email,
-            'location': row.get('location', '').strip(),
-            'company_name': row.get('company_name', '').strip()
-        }
-        contacts_to_save.append(contact_data)
-    
-    # If we found any errors during the process, the file is invalid
-    if errors:
+
+def iter_contact_batches(binary_stream, batch_size=DEFAULT_BATCH_SIZE, prevalidated=False):
+    """iter_row_batches for an uploaded CSV stream."""
+    return iter_row_batches(iter_delimited_rows(binary_stream), batch_size, prevalidated)
+
+
+def validate_csv_data(csv_file):
+    """
+    Reads a CSV file and validates every row.
+    It does NOT save to the database. It only checks for validity.
+
+    Prefer validate_csv_stream + iter_contact_batches for uploads: this
+    wrapper still materializes every contact in memory.
+
+    Returns:
+        A tuple: (is_valid, data_or_errors)
+        - If all rows are valid: (True, list_of_contact_dictionaries)
+        - If any row is invalid: (False, list_of_error_messages)
+    """
+    is_valid, errors, _stats = validate_csv_stream(csv_file.stream)
+    csv_file.stream.seek(0) # Reset stream pointer
+    if not is_valid:
         return False, errors
 
-    return True, contacts_to_save
\ No newline at end of file
+    contacts_to_save = [contact for batch in iter_contact_batches(csv_file.stream) for contact in batch]
+    csv_file.stream.seek(0)
+    return True, contacts_to_save
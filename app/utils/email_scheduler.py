@@ -4,10 +4,12 @@ from datetime import datetime
 import re # Using the regex module
 from app.celery_app import celery
 from app.models.sequence import get_due_steps_for_utc_time, update_step_status, get_last_sent_email_for_contact
-from app.models.contact import get_contacts_for_list, get_bounced_emails, get_replied_emails
+from app.models.contact import get_contacts_for_list, get_bounced_emails, get_replied_emails, record_email_validation
+from app.models.segment import get_contacts_for_segment
 from app.models.smtp_config import get_smtp_config_by_id
 from app.models.log import SentEmail
 from .email_sender import send_email
+from .email_validator import validate_emails
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -58,6 +60,23 @@ def _personalize_content(content, contact):
 # --- End of function ---
 
 
+def _drop_invalid_contacts(contacts):
+    """
+    Validates contacts that were never checked (stored before validation was
+    cached), records the results and returns only the contacts with valid emails.
+    """
+    unchecked = [contact for contact in contacts if contact['email_validated_at'] is None]
+    if unchecked:
+        results = validate_emails([contact['email'] for contact in unchecked])
+        for contact, email_valid in zip(unchecked, results):
+            contact['email_valid'] = email_valid
+        record_email_validation(
+            [contact['id'] for contact, ok in zip(unchecked, results) if ok],
+            [contact['id'] for contact, ok in zip(unchecked, results) if not ok]
+        )
+    return [contact for contact in contacts if contact['email_valid']]
+
+
 @celery.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(60.0, process_due_steps.s(), name='check for due emails every 60s')
@@ -79,7 +98,12 @@ def process_due_steps():
             update_step_status(step['id'], 'failed')
             continue
 
-        contacts = get_contacts_for_list(step['list_id'])
+        # Segment membership is materialized, so targeting one costs the same as a list.
+        if step['segment_id']:
+            recipients = get_contacts_for_segment(step['segment_id'])
+        else:
+            recipients = get_contacts_for_list(step['list_id'])
+        contacts = _drop_invalid_contacts(recipients)
         for contact in contacts:
             if contact['email'] in bounced_emails or contact['email'] in replied_emails:
                 continue
@@ -149,7 +173,8 @@ def process_due_steps():
                         user_id=step['user_id'], contact_id=contact['id'], subject=personalized_subject, 
                         status='sent', campaign_id=campaign_id_for_log, message_id=message_id, 
                         references=final_references, sequence_id=step['sequence_id'], step_id=step['id'],
-                        body=final_body, from_name=from_name, from_email=from_email, to_email=to_email
+                        body=final_body, from_name=from_name, from_email=from_email, to_email=to_email,
+                        smtp_config_id=step['config_id']
                     )
             except Exception as e:
                 logger.error(f"Failed to process email for {contact['email']} in step {step['id']}: {e}")
@@ -1,3 +1,7 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+import re
 from email_validator import validate_email as validator_email, EmailNotValidError
 import logging
 
@@ -5,14 +9,72 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def check_email(email):
+# RFC 5321 limits, also enforced by email_validator.
+MAX_EMAIL_LENGTH = 254
+MAX_LOCAL_PART_LENGTH = 64
+
+# Plain ASCII dot-atom local parts: what almost every real address looks like.
+# Anything else (quoted or internationalized local parts, odd spacing) goes
+# through the full validator instead of being rejected here.
+SIMPLE_LOCAL_PART_PATTERN = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+_SIMPLE_LOCAL_PART_RE = re.compile(SIMPLE_LOCAL_PART_PATTERN)
+
+# Distinct domains remembered per process; a list rarely has more than a few thousand.
+DOMAIN_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def is_valid_domain(domain):
+    """Full validation (syntax and deliverability) of a normalized domain, once per domain."""
+    try:
+        validator_email(f"postmaster@{domain}")
+        return True
+    except EmailNotValidError as e:
+        logger.debug(f"Invalid email domain {domain}: {e}")
+        return False
+
+
+def _full_check(email):
     try:
-        if not email or not isinstance(email, str):
-            logger.error("Email is empty or not a string")
-            return False
         validator_email(email)
-        logger.info(f"Valid email: {email}")
         return True
     except EmailNotValidError as e:
-        logger.error(f"Invalid email: {e}")
-        return False
\ No newline at end of file
+        logger.debug(f"Invalid email: {e}")
+        return False
+
+
+def check_email(email):
+    """
+    Returns True if `email` is a valid address. Common ASCII addresses are
+    checked with a compiled pattern and a per-domain memo of the full
+    validator; everything else falls back to the full validator.
+    """
+    if not email or not isinstance(email, str):
+        return False
+    if len(email) > MAX_EMAIL_LENGTH or email.count('@') != 1:
+        return _full_check(email)
+
+    local_part, domain = email.split('@')
+    if not local_part or len(local_part) > MAX_LOCAL_PART_LENGTH or not domain:
+        return False
+    if not domain.isascii() or not _SIMPLE_LOCAL_PART_RE.fullmatch(local_part):
+        return _full_check(email)
+    return is_valid_domain(domain.lower())
+
+
+@contextmanager
+def validation_pool(processes):
+    """Yields a process pool for validate_emails, or None when `processes` is 0/1."""
+    if not processes or processes < 2:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        yield pool
+
+
+def validate_emails(emails, pool=None):
+    """Returns a list of check_email results for `emails`, in order, using `pool` when given."""
+    if pool is None:
+        return [check_email(email) for email in emails]
+    chunksize = max(1, len(emails) // (pool._max_workers * 4))
+    return list(pool.map(check_email, emails, chunksize=chunksize))
@@ -0,0 +1,145 @@
+# app/utils/live_events.py
+
+import json
+import logging
+import queue
+import threading
+import time
+import redis
+from flask import Response
+from app.config import Config
+from app.utils.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Every stat change is published here; each web process holds one subscription
+# and fans the messages out to its connected browsers.
+CHANNEL = 'live:stats'
+# Messages buffered per browser; a client that falls further behind is told to resync.
+CLIENT_QUEUE_SIZE = 100
+# Seconds between keep-alive comments, so proxies keep idle streams open.
+KEEPALIVE_SECONDS = 15
+RECONNECT_SECONDS = 2
+# Sent to every client, whichever user it follows.
+_RESYNC = {'type': 'resync'}
+
+
+def publish_event(event_type, **data):
+    """
+    Publishes one stat change, e.g. publish_event('email', user_id=1, status='sent').
+    Failures are only logged: live updates must never break the write path.
+    """
+    try:
+        get_redis().publish(CHANNEL, json.dumps({'type': event_type, **data}, default=str))
+    except redis.RedisError as e:
+        logger.error(f"Could not publish live event {event_type}: {e}")
+
+
+class _Client:
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, event):
+        """A per-user client only gets that user's events (plus resyncs)."""
+        return self.user_id is None or event.get('user_id', self.user_id) == self.user_id
+
+
+class _Broadcaster:
+    """One Redis subscription per process, fanned out to every open stream."""
+
+    def __init__(self):
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add_client(self, user_id=None):
+        client = _Client(user_id)
+        with self._lock:
+            self._clients.add(client)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, name='live-events', daemon=True)
+                self._thread.start()
+        return client
+
+    def remove_client(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def _broadcast(self, data):
+        try:
+            event = json.loads(data)
+        except ValueError:
+            logger.error(f"Dropping malformed live event: {data!r}")
+            return
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            if not client.wants(event):
+                continue
+            try:
+                client.queue.put_nowait(data)
+            except queue.Full:
+                client.overflowed = True
+
+    def _listen(self):
+        # A dedicated connection without the cache's short socket timeout, which
+        # would otherwise cut the blocking subscription.
+        connection = redis.Redis.from_url(Config.REDIS_URL, decode_responses=True, health_check_interval=30)
+        interrupted = False
+        while True:
+            try:
+                pubsub = connection.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                if interrupted:
+                    # Whatever was published meanwhile is lost; have clients resync.
+                    self._broadcast(json.dumps(_RESYNC))
+                    interrupted = False
+                for message in pubsub.listen():
+                    self._broadcast(message['data'])
+            except redis.RedisError as e:
+                if not interrupted:
+                    logger.error(f"Live events subscription lost: {e}")
+                interrupted = True
+                time.sleep(RECONNECT_SECONDS)
+
+
+_broadcaster = _Broadcaster()
+
+
+def stream_events(user_id=None):
+    """
+    Yields Server-Sent Events frames with the published stat changes until
+    the browser disconnects: every change, or with `user_id` only that user's.
+    """
+    client = _broadcaster.add_client(user_id)
+    try:
+        yield f"retry: {RECONNECT_SECONDS * 1000}\n\n"
+        while True:
+            if client.overflowed:
+                client.overflowed = False
+                yield f"data: {json.dumps(_RESYNC)}\n\n"
+            try:
+                data = client.queue.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {data}\n\n"
+    finally:
+        _broadcaster.remove_client(client)
+
+
+def event_stream_response(user_id=None):
+    """
+    The streaming response for a live endpoint. With LIVE_EVENTS_ENABLED off
+    it is a 204, which tells EventSource not to reconnect; pages then rely
+    on their periodic resync.
+    """
+    if not Config.LIVE_EVENTS_ENABLED:
+        return Response(status=204)
+    return Response(
+        stream_events(user_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
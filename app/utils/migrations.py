@@ -0,0 +1,146 @@
+# app/utils/migrations.py
+
+import os
+import re
+import logging
+from mysql.connector import Error
+from app.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'migrations')
+_MIGRATION_FILE_RE = re.compile(r'^(\d{4})_[\w-]+\.sql$')
+
+# DDL errors that only mean "this statement already ran", so a migration that
+# stopped halfway (MySQL DDL is not transactional) can simply be re-applied.
+ALREADY_APPLIED_ERRNOS = {
+    1050,  # table already exists
+    1060,  # duplicate column name
+    1061,  # duplicate key name
+    1091,  # can't drop; column/key doesn't exist
+}
+
+
+def list_migrations(migrations_dir=MIGRATIONS_DIR):
+    """Returns [(version, filename)] for every migration file, in order."""
+    migrations = []
+    for filename in sorted(os.listdir(migrations_dir)):
+        match = _MIGRATION_FILE_RE.match(filename)
+        if match:
+            migrations.append((match.group(1), filename))
+    return migrations
+
+
+def split_statements(sql):
+    """Splits a migration file into statements on semicolons outside quotes and comments."""
+    statements, current = [], []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == '\\':
+                current.append(sql[i + 1:i + 2])
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+            current.append(char)
+        elif sql.startswith('--', i):
+            newline = sql.find('\n', i)
+            i = len(sql) if newline == -1 else newline
+            continue
+        elif char == ';':
+            statement = ''.join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(16) PRIMARY KEY,
+            filename VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def get_applied_versions():
+    """Returns the set of migration versions already recorded in schema_migrations."""
+    conn = get_db_connection(reuse=False)
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        _ensure_migrations_table(cursor)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    except Error as e:
+        logger.error(f"Error reading applied migrations: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def apply_migration(conn, version, filename, migrations_dir=MIGRATIONS_DIR):
+    with open(os.path.join(migrations_dir, filename), encoding='utf-8') as migration_file:
+        statements = split_statements(migration_file.read())
+
+    cursor = conn.cursor()
+    try:
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Error as e:
+                if e.errno not in ALREADY_APPLIED_ERRNOS:
+                    raise
+                logger.info(f"{filename}: skipping already-applied statement ({e.msg})")
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, filename) VALUES (%s, %s)",
+            (version, filename)
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def upgrade(target=None, migrations_dir=MIGRATIONS_DIR):
+    """
+    Applies every pending migration up to and including `target` (all when None).
+    Returns the list of filenames applied; raises on the first failing statement.
+    """
+    applied = get_applied_versions()
+    if applied is None:
+        raise RuntimeError("Could not read the schema_migrations table.")
+
+    pending = [
+        (version, filename) for version, filename in list_migrations(migrations_dir)
+        if version not in applied and (target is None or version <= target)
+    ]
+    if not pending:
+        return []
+
+    conn = get_db_connection(reuse=False)
+    if not conn:
+        raise RuntimeError("Database connection is not available.")
+    done = []
+    try:
+        for version, filename in pending:
+            logger.info(f"Applying migration {filename}")
+            apply_migration(conn, version, filename, migrations_dir)
+            done.append(filename)
+    finally:
+        conn.close()
+    return done
@@ -0,0 +1,101 @@
+# app/utils/query_explainer.py
+
+import ast
+import os
+import re
+import logging
+from mysql.connector import Error
+from app.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
+_QUERY_RE = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+# EXPLAIN needs literal values; a quoted '1' is accepted by integer, string and
+# datetime comparisons alike without changing which index MySQL can use.
+PLACEHOLDER_VALUE = "'1'"
+# LIMIT and OFFSET only take unquoted integers.
+_ROW_COUNT_PLACEHOLDER_RE = re.compile(r'\b(LIMIT|OFFSET)(\s+)%s(\s*,\s*)?(%s)?', re.IGNORECASE)
+
+
+def _fragment_nodes(tree):
+    """String constants that are only part of a query: f-string pieces and operands of + or %."""
+    fragments = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.JoinedStr):
+            fragments.update(id(value) for value in node.values)
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+            fragments.update((id(node.left), id(node.right)))
+    return fragments
+
+
+def collect_model_queries(models_dir=MODELS_DIR):
+    """
+    Yields (location, query, complete) for every SELECT/UPDATE/DELETE string
+    literal in app/models; `complete` is False for fragments of a query that
+    is assembled at runtime (f-strings, concatenation), which cannot be EXPLAINed.
+    """
+    for filename in sorted(os.listdir(models_dir)):
+        if not filename.endswith('.py'):
+            continue
+        path = os.path.join(models_dir, filename)
+        with open(path, encoding='utf-8') as source:
+            tree = ast.parse(source.read(), filename=path)
+        fragments = _fragment_nodes(tree)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and _QUERY_RE.match(node.value):
+                yield f"app/models/{filename}:{node.lineno}", node.value, id(node) not in fragments
+
+
+def _bind_placeholders(query):
+    query = _ROW_COUNT_PLACEHOLDER_RE.sub(
+        lambda match: f"{match.group(1)}{match.group(2)}1{match.group(3) or ''}{'1' if match.group(4) else ''}",
+        query
+    )
+    return query.replace('%s', PLACEHOLDER_VALUE).strip().rstrip(';')
+
+
+def find_full_scans(plan):
+    """Returns the plan rows that read a whole table (type ALL) or a whole index (type index)."""
+    scans = []
+    for row in plan:
+        table = row.get('table') or ''
+        # Derived tables and unions are materialized in memory; scanning them is expected.
+        if table.startswith('<'):
+            continue
+        if row.get('type') in ('ALL', 'index'):
+            scans.append(row)
+    return scans
+
+
+def explain_model_queries(models_dir=MODELS_DIR):
+    """
+    Runs EXPLAIN for every query found in app/models and returns one dict per
+    query: location, query, plan rows, full_scans, error (if EXPLAIN failed)
+    and skipped (a fragment of a query built at runtime, not EXPLAINed).
+    """
+    conn = get_db_connection(reuse=False)
+    if not conn:
+        raise RuntimeError("Database connection is not available.")
+    results = []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        for location, query, complete in collect_model_queries(models_dir):
+            result = {'location': location, 'query': ' '.join(query.split()), 'plan': [], 'full_scans': [],
+                      'error': None, 'skipped': not complete}
+            if not complete:
+                results.append(result)
+                continue
+            try:
+                cursor.execute("EXPLAIN " + _bind_placeholders(query))
+                result['plan'] = cursor.fetchall()
+                result['full_scans'] = find_full_scans(result['plan'])
+            except Error as e:
+                result['error'] = str(e)
+            results.append(result)
+        cursor.close()
+    finally:
+        conn.rollback()
+        conn.close()
+    return results
@@ -0,0 +1,290 @@
+# app/utils/query_profiler.py
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from flask import current_app, g, has_app_context, has_request_context, request
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cap on distinct statements kept in the aggregated report so a bug that
+# generates unique SQL per call cannot grow the report without bound.
+MAX_REPORTED_STATEMENTS = 500
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+
+
+def fingerprint(statement):
+    """
+    Normalizes a SQL statement so that calls differing only in literal values
+    or placeholder counts are grouped together.
+    """
+    if not isinstance(statement, str):
+        statement = str(statement)
+    normalized = _STRING_LITERAL_RE.sub('?', statement)
+    normalized = _NUMBER_LITERAL_RE.sub('?', normalized)
+    normalized = _IN_LIST_RE.sub('IN (...)', normalized)
+    normalized = _WHITESPACE_RE.sub(' ', normalized).strip().rstrip(';')
+    return normalized
+
+
+class QueryStats:
+    """Queries executed during one request or Celery task."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.total_ms = 0.0
+        self.checkouts = 0
+        # fingerprint -> [calls, total_ms, rows, max_ms, slow_calls]
+        self.statements = {}
+
+    def record(self, statement_fp, duration_ms, rows):
+        entry = self.statements.setdefault(statement_fp, [0, 0.0, 0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += duration_ms
+        entry[2] += max(rows, 0)
+        entry[3] = max(entry[3], duration_ms)
+        if duration_ms >= Config.SLOW_QUERY_MS:
+            entry[4] += 1
+        self.query_count += 1
+        self.total_ms += duration_ms
+
+    def add_fetch(self, statement_fp, duration_ms, rows):
+        entry = self.statements.get(statement_fp)
+        if entry is None:
+            return
+        entry[1] += duration_ms
+        entry[2] += rows
+        self.total_ms += duration_ms
+
+    def repeated_statements(self, threshold):
+        """Returns (fingerprint, calls) pairs executed more than `threshold` times."""
+        return [(fp, entry[0]) for fp, entry in self.statements.items() if entry[0] > threshold]
+
+    def summary_header(self, threshold):
+        return (
+            f"queries={self.query_count}; time_ms={self.total_ms:.1f}; "
+            f"checkouts={self.checkouts}; repeated={len(self.repeated_statements(threshold))}"
+        )
+
+
+class QueryReport:
+    """Process-wide aggregate of every finished request/task, served by the diagnostics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.since = datetime.utcnow()
+            self.statements = {}
+            self.units = {}
+
+    def merge(self, stats, threshold):
+        repeated = dict(stats.repeated_statements(threshold))
+        with self._lock:
+            unit = self.units.setdefault(stats.label, {
+                'runs': 0, 'queries': 0, 'max_queries': 0, 'total_ms': 0.0, 'n_plus_one_runs': 0
+            })
+            unit['runs'] += 1
+            unit['queries'] += stats.query_count
+            unit['max_queries'] = max(unit['max_queries'], stats.query_count)
+            unit['total_ms'] += stats.total_ms
+            if repeated:
+                unit['n_plus_one_runs'] += 1
+
+            for statement_fp, (calls, total_ms, rows, max_ms, slow_calls) in stats.statements.items():
+                entry = self.statements.get(statement_fp)
+                if entry is None:
+                    if len(self.statements) >= MAX_REPORTED_STATEMENTS:
+                        continue
+                    entry = self.statements[statement_fp] = {
+                        'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+                        'slow_calls': 0, 'n_plus_one_flags': 0, 'sources': set()
+                    }
+                entry['calls'] += calls
+                entry['total_ms'] += total_ms
+                entry['max_ms'] = max(entry['max_ms'], max_ms)
+                entry['rows'] += rows
+                entry['slow_calls'] += slow_calls
+                entry['sources'].add(stats.label)
+                if statement_fp in repeated:
+                    entry['n_plus_one_flags'] += 1
+
+    def snapshot(self, limit=50):
+        with self._lock:
+            statements = [
+                {
+                    'statement': statement_fp,
+                    'calls': entry['calls'],
+                    'total_ms': round(entry['total_ms'], 2),
+                    'avg_ms': round(entry['total_ms'] / entry['calls'], 2) if entry['calls'] else 0.0,
+                    'max_ms': round(entry['max_ms'], 2),
+                    'rows': entry['rows'],
+                    'slow_calls': entry['slow_calls'],
+                    'n_plus_one_flags': entry['n_plus_one_flags'],
+                    'sources': sorted(entry['sources'])
+                }
+                for statement_fp, entry in self.statements.items()
+            ]
+            units = {label: dict(unit, total_ms=round(unit['total_ms'], 2)) for label, unit in self.units.items()}
+            since = self.since
+        statements.sort(key=lambda item: item['total_ms'], reverse=True)
+        return {
+            'since': since.isoformat(),
+            'slow_query_ms': Config.SLOW_QUERY_MS,
+            'n_plus_one_threshold': Config.N_PLUS_ONE_THRESHOLD,
+            'units': units,
+            'statements': statements[:limit]
+        }
+
+
+report = QueryReport()
+
+
+def _current_label():
+    if has_request_context():
+        return request.endpoint or request.path
+    return g.get('task_name', 'app_context')
+
+
+def current_stats():
+    """Returns the QueryStats of the active request/task, or None outside an app context."""
+    if not Config.QUERY_PROFILER_ENABLED or not has_app_context():
+        return None
+    stats = g.get('_query_stats')
+    if stats is None:
+        stats = g._query_stats = QueryStats(_current_label())
+    return stats
+
+
+class ProfiledCursor:
+    """Wraps a DB-API cursor and records every statement it executes."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._fingerprint = None
+
+    def _timed(self, method, operation, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self._fingerprint = fingerprint(operation)
+            # Result-set rows are counted as they are fetched; rowcount covers writes.
+            rows = 0 if getattr(self._cursor, 'with_rows', False) else getattr(self._cursor, 'rowcount', 0)
+            stats = current_stats()
+            if stats is not None:
+                stats.record(self._fingerprint, duration_ms, rows)
+            if duration_ms >= Config.SLOW_QUERY_MS:
+                logger.warning(
+                    f"Slow query ({duration_ms:.1f} ms, rowcount {rows}) in "
+                    f"{stats.label if stats else 'unknown'}: {self._fingerprint}"
+                )
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        stats = current_stats()
+        if stats is not None and self._fingerprint is not None:
+            if isinstance(result, list):
+                rows = len(result)
+            else:
+                rows = 1 if result is not None else 0
+            stats.add_fetch(self._fingerprint, (time.perf_counter() - start) * 1000, rows)
+        return result
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._cursor.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    """Wraps a pooled connection so that the cursors it hands out are profiled."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def profile_connection(connection):
+    if not Config.QUERY_PROFILER_ENABLED:
+        return connection
+    return ProfiledConnection(connection)
+
+
+def instrument_engine(engine):
+    """Registers the pool event hooks that count checkouts per request/task."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats = current_stats()
+        if stats is not None:
+            stats.checkouts += 1
+
+
+def _add_summary_header(response):
+    if not current_app.debug:
+        return response
+    stats = g.get('_query_stats')
+    if stats is not None:
+        response.headers['X-Query-Summary'] = stats.summary_header(Config.N_PLUS_ONE_THRESHOLD)
+    return response
+
+
+def _finish(exc=None):
+    stats = g.pop('_query_stats', None)
+    if stats is None:
+        return
+    threshold = Config.N_PLUS_ONE_THRESHOLD
+    for statement_fp, calls in stats.repeated_statements(threshold):
+        logger.warning(f"Possible N+1 in {stats.label}: statement ran {calls} times: {statement_fp}")
+    report.merge(stats, threshold)
+
+
+def init_app(app):
+    """Hooks the profiler into the request/app-context lifecycle of the Flask app."""
+    if not Config.QUERY_PROFILER_ENABLED:
+        return
+    app.after_request(_add_summary_header)
+    app.teardown_appcontext(_finish)
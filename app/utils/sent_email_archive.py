@@ -0,0 +1,233 @@
+# app/utils/sent_email_archive.py
+
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from mysql.connector import Error
+from app.celery_app import celery
+from app.config import Config
+from app.database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+_MONTHLY_PARTITION_RE = re.compile(r'^p(\d{4})(\d{2})$')
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def _add_months(month, count):
+    years, month_index = divmod(month.month - 1 + count, 12)
+    return datetime(month.year + years, month_index + 1, 1)
+
+
+def _partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def _partition_month(name):
+    match = _MONTHLY_PARTITION_RE.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def archive_path(month):
+    return os.path.join(Config.ARCHIVE_DIR, 'sent_emails', f"sent_emails_{month:%Y_%m}.jsonl.gz")
+
+
+def get_sent_email_partitions(cursor):
+    """Returns the partition names of sent_emails in boundary order (empty if not partitioned)."""
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'sent_emails' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def ensure_future_partitions(months_ahead=None):
+    """
+    Splits p_future so that every month up to `months_ahead` months from now has
+    its own partition. Returns the names of the partitions created.
+    """
+    months_ahead = Config.SENT_EMAILS_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    conn = get_db_connection(reuse=False)
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        partitions = get_sent_email_partitions(cursor)
+        if 'p_future' not in partitions:
+            logger.warning("sent_emails is not partitioned yet; run 'flask db upgrade'.")
+            return []
+
+        monthly = [month for month in map(_partition_month, partitions) if month]
+        if monthly:
+            next_month = _add_months(max(monthly), 1)
+        else:
+            cursor.execute("SELECT MIN(sent_at) FROM sent_emails")
+            oldest = cursor.fetchone()[0]
+            next_month = _month_start(oldest or datetime.utcnow())
+
+        last_month = _add_months(_month_start(datetime.utcnow()), months_ahead)
+        new_months = []
+        while next_month <= last_month:
+            new_months.append(next_month)
+            next_month = _add_months(next_month, 1)
+        if not new_months:
+            return []
+
+        definitions = ", ".join(
+            f"PARTITION {_partition_name(month)} VALUES LESS THAN ('{_add_months(month, 1):%Y-%m-%d}')"
+            for month in new_months
+        )
+        cursor.execute(
+            f"ALTER TABLE sent_emails REORGANIZE PARTITION p_future INTO "
+            f"({definitions}, PARTITION p_future VALUES LESS THAN (MAXVALUE))"
+        )
+        created = [_partition_name(month) for month in new_months]
+        logger.info(f"Created sent_emails partitions: {', '.join(created)}")
+        return created
+    except Error as e:
+        logger.error(f"Error creating sent_emails partitions: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def archive_partition(partition_name):
+    """
+    Streams one monthly partition to a gzip JSONL file, verifies the row count,
+    records it in sent_emails_archive and drops the partition.
+    """
+    month = _partition_month(partition_name)
+    if month is None:
+        raise ValueError(f"Not a monthly partition: {partition_name}")
+    path = archive_path(month)
+    temp_path = path + '.tmp'
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    conn = get_db_connection(reuse=False)
+    if not conn:
+        return False
+    try:
+        # Unbuffered cursor: rows stream from the server instead of being loaded at once.
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT * FROM sent_emails PARTITION ({partition_name})")
+        written = 0
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as archive_file:
+            for row in cursor:
+                archive_file.write(json.dumps(row, default=_json_default))
+                archive_file.write('\n')
+                written += 1
+        cursor.close()
+
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM sent_emails PARTITION ({partition_name})")
+        expected = cursor.fetchone()[0]
+        if written != expected:
+            logger.error(f"Archive of {partition_name} wrote {written} rows but the partition has {expected}; not dropping.")
+            os.remove(temp_path)
+            return False
+        os.replace(temp_path, path)
+
+        cursor.execute("""
+            INSERT INTO sent_emails_archive (partition_name, month_start, file_path, row_count)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE file_path = VALUES(file_path), row_count = VALUES(row_count), archived_at = NOW()
+        """, (partition_name, month.date(), path, written))
+        conn.commit()
+        cursor.execute(f"ALTER TABLE sent_emails DROP PARTITION {partition_name}")
+        cursor.close()
+        logger.info(f"Archived {written} sent_emails rows from {partition_name} to {path}")
+        return True
+    except (Error, OSError) as e:
+        logger.error(f"Error archiving sent_emails partition {partition_name}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    finally:
+        conn.close()
+
+
+def archive_old_partitions(keep_months=None):
+    """Archives every monthly partition that ended more than `keep_months` months ago."""
+    keep_months = Config.SENT_EMAILS_HOT_MONTHS if keep_months is None else keep_months
+    conn = get_db_connection(reuse=False)
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor()
+        partitions = get_sent_email_partitions(cursor)
+        cursor.close()
+    except Error as e:
+        logger.error(f"Error listing sent_emails partitions: {e}")
+        return []
+    finally:
+        conn.close()
+
+    cutoff = _add_months(_month_start(datetime.utcnow()), -keep_months)
+    archived = []
+    for name in partitions:
+        month = _partition_month(name)
+        if month and _add_months(month, 1) <= cutoff and archive_partition(name):
+            archived.append(name)
+    return archived
+
+
+def get_archived_months():
+    conn = get_db_connection()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT partition_name, month_start, file_path, row_count, archived_at FROM sent_emails_archive ORDER BY month_start")
+        return cursor.fetchall()
+    except Error as e:
+        logger.error(f"Error fetching sent_emails archive index: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def iter_archived_sent_emails(start, end, **filters):
+    """
+    Yields archived sent_emails rows with start <= sent_at < end whose columns
+    equal the given filters (e.g. to_email='a@b.com', contact_id=7). Only the
+    monthly files overlapping the range are read.
+    """
+    for archive in get_archived_months():
+        month = _month_start(archive['month_start'])
+        if _add_months(month, 1) <= start or month >= end:
+            continue
+        with gzip.open(archive['file_path'], 'rt', encoding='utf-8') as archive_file:
+            for line in archive_file:
+                row = json.loads(line)
+                sent_at = datetime.fromisoformat(row['sent_at'])
+                if not (start <= sent_at < end):
+                    continue
+                if all(str(row.get(column)) == str(value) for column, value in filters.items()):
+                    yield row
+
+
+@celery.task
+def maintain_sent_email_partitions():
+    """Daily: pre-create upcoming monthly partitions and archive the ones past retention."""
+    ensure_future_partitions()
+    archive_old_partitions()
@@ -0,0 +1,16 @@
+# app/utils/stats_maintenance.py
+
+import logging
+from app.celery_app import celery
+from app.models.email_stats import reconcile_user_email_stats
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task
+def reconcile_user_stats():
+    """Hourly: repairs user_email_stats wherever it drifted from the email_stats_daily rollup."""
+    drifted = reconcile_user_email_stats()
+    if drifted:
+        logger.warning(f"Corrected email stats of {len(drifted)} users: {drifted}")
+    return drifted
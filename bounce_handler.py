@@ -9,6 +9,7 @@ import logging
 import boto3
 import mysql.connector
 from mysql.connector import Error
+from app.models.log import SentEmail
 
 # --- Logging Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -107,6 +108,8 @@ def main_loop():
                             email_address = recipient.get('emailAddress')
                             if email_address:
                                 add_email_to_bounce_list(email_address)
+                                # Keeps sent_emails and the reporting rollups in step with the bounce.
+                                SentEmail.mark_bounced(email_address)
 
                     # Delete the message from the queue after processing
                     sqs_client.delete_message(
@@ -9,6 +9,10 @@ eventlet.monkey_patch()
 from dotenv import load_dotenv
 load_dotenv()
 
+# Size the DB pool for hundreds of green threads rather than a web worker.
+import os
+os.environ.setdefault('PROCESS_ROLE', 'worker')
+
 from app import create_app
 
 # Create the Flask app which in turn creates the Celery app
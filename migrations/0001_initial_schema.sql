@@ -0,0 +1,109 @@
+-- 0001_initial_schema.sql
+-- Canonical schema for every table the application reads or writes.
+-- Uses CREATE TABLE IF NOT EXISTS so it can be applied to existing databases.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(100) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_users_username (username)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    subject VARCHAR(1000) NOT NULL,
+    body MEDIUMTEXT NOT NULL,
+    created_by INT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_campaigns_created_by (created_by)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS lists (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    list_name VARCHAR(255) NOT NULL,
+    records INT NOT NULL DEFAULT 0,
+    created_by INT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_lists_list_name (list_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS contacts (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    list_id INT NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    location VARCHAR(255) NULL,
+    company_name VARCHAR(255) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_contacts_list_email (list_id, email)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS smtp_configs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    host VARCHAR(255) NOT NULL,
+    port INT NOT NULL,
+    username VARCHAR(255) NOT NULL,
+    password TEXT NOT NULL,
+    use_tls TINYINT(1) NOT NULL DEFAULT 1,
+    use_ssl TINYINT(1) NOT NULL DEFAULT 0,
+    from_email VARCHAR(255) NOT NULL,
+    from_name VARCHAR(255) NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_smtp_configs_user_name (user_id, name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS sequences (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    list_id INT NOT NULL,
+    created_by INT NOT NULL,
+    config_type VARCHAR(20) NOT NULL DEFAULT 'smtp',
+    config_id INT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'active',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_sequences_created_by (created_by),
+    KEY idx_sequences_list_id (list_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS sequence_steps (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    sequence_id INT NOT NULL,
+    step_number INT NOT NULL,
+    step_type VARCHAR(20) NOT NULL,
+    campaign_id INT NULL,
+    reply_body MEDIUMTEXT NULL,
+    schedule_time DATETIME NOT NULL,
+    is_re_reply TINYINT(1) NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'scheduled',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_sequence_steps_sequence (sequence_id, step_number)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS sent_emails (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    contact_id INT NOT NULL,
+    campaign_id INT NULL,
+    sequence_id INT NULL,
+    step_id INT NULL,
+    subject VARCHAR(1000) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    message_id VARCHAR(255) NULL,
+    `references` TEXT NULL,
+    body MEDIUMTEXT NULL,
+    from_name VARCHAR(255) NULL,
+    from_email VARCHAR(255) NULL,
+    to_email VARCHAR(255) NULL,
+    sent_at DATETIME NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS bounced_emails (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    email VARCHAR(255) NOT NULL,
+    bounced_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_bounced_emails_email (email)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,18 @@
+-- 0002_hot_path_indexes.sql
+-- Composite indexes for the queries the application runs on every scheduler
+-- tick, follow-up send and dashboard load.
+
+-- app.models.sequence.get_due_steps_for_utc_time
+ALTER TABLE sequence_steps ADD INDEX idx_sequence_steps_status_schedule (status, schedule_time);
+
+-- app.models.sequence.get_last_sent_email_for_contact (threading lookups)
+ALTER TABLE sent_emails ADD INDEX idx_sent_emails_thread (sequence_id, contact_id, sent_at);
+
+-- app.models.log.SentEmail home page counters
+ALTER TABLE sent_emails ADD INDEX idx_sent_emails_user_status (user_id, status);
+
+-- app.models.reports sent totals and last-24-hours counts
+ALTER TABLE sent_emails ADD INDEX idx_sent_emails_status_sent_at (status, sent_at);
+
+-- app.models.contact.get_contacts_for_list and list record counts
+ALTER TABLE contacts ADD INDEX idx_contacts_list_id (list_id);
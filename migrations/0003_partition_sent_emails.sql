@@ -0,0 +1,26 @@
+-- 0003_partition_sent_emails.sql
+-- Range-partitions sent_emails on sent_at so old months can be archived and
+-- dropped without a DELETE (see app.utils.sent_email_archive).
+--
+-- MySQL requires the partitioning column in every unique key, so the primary
+-- key becomes (id, sent_at). Partitioned InnoDB tables cannot have foreign keys.
+-- Rebuilding the table copies it once; run during a quiet period.
+--
+-- Monthly partitions (pYYYYMM) are split out of p_future by the daily
+-- maintenance task, starting from the month of the oldest row.
+
+ALTER TABLE sent_emails DROP PRIMARY KEY, ADD PRIMARY KEY (id, sent_at);
+
+ALTER TABLE sent_emails PARTITION BY RANGE COLUMNS (sent_at) (
+    PARTITION p_history VALUES LESS THAN ('2000-01-01'),
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS sent_emails_archive (
+    partition_name VARCHAR(16) PRIMARY KEY,
+    month_start DATE NOT NULL,
+    file_path VARCHAR(1024) NOT NULL,
+    row_count BIGINT NOT NULL,
+    archived_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_sent_emails_archive_month (month_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
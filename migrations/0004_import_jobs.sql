@@ -0,0 +1,23 @@
+-- 0004_import_jobs.sql
+-- Background contact imports (see app.utils.contact_importer). The upload
+-- request stores the file and creates a job row; the Celery task fills in the
+-- counters as it validates and inserts.
+
+CREATE TABLE IF NOT EXISTS import_jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    list_name VARCHAR(255) NOT NULL,
+    list_id INT NULL,
+    file_path VARCHAR(1024) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    rows_parsed INT NOT NULL DEFAULT 0,
+    rows_valid INT NOT NULL DEFAULT 0,
+    rows_inserted INT NOT NULL DEFAULT 0,
+    rows_duplicate INT NOT NULL DEFAULT 0,
+    error TEXT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME NULL,
+    import_started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    KEY idx_import_jobs_user_created (user_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
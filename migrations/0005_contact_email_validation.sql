@@ -0,0 +1,8 @@
+-- 0005_contact_email_validation.sql
+-- Caches the result of email validation on the contact. Imports and the add
+-- contact form validate before inserting; the scheduler validates legacy rows
+-- (email_validated_at IS NULL) once and stores the result.
+
+ALTER TABLE contacts
+    ADD COLUMN email_valid TINYINT(1) NULL,
+    ADD COLUMN email_validated_at DATETIME NULL;
@@ -0,0 +1,5 @@
+-- 0006_import_job_column_map.sql
+-- Optional user-supplied header mapping for an import, stored as JSON
+-- ({"email": "Work Email", ...}); see app.utils.contact_file_reader.
+
+ALTER TABLE import_jobs ADD COLUMN column_map TEXT NULL AFTER file_path;
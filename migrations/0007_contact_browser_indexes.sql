@@ -0,0 +1,17 @@
+-- 0007_contact_browser_indexes.sql
+-- Indexes for the paginated contact browser (app.models.contact.get_contacts_page):
+-- each sortable/searchable column gets a (list_id, column) index, which InnoDB
+-- extends with the primary key, so keyset pages on (column, id) are index range
+-- scans. Empty location/company is stored as '' instead of NULL so the keyset
+-- comparison needs no NULL handling.
+
+UPDATE contacts SET location = '' WHERE location IS NULL;
+UPDATE contacts SET company_name = '' WHERE company_name IS NULL;
+
+ALTER TABLE contacts
+    MODIFY location VARCHAR(255) NOT NULL DEFAULT '',
+    MODIFY company_name VARCHAR(255) NOT NULL DEFAULT '';
+
+ALTER TABLE contacts ADD INDEX idx_contacts_list_name (list_id, name);
+ALTER TABLE contacts ADD INDEX idx_contacts_list_company (list_id, company_name);
+ALTER TABLE contacts ADD INDEX idx_contacts_list_location (list_id, location);
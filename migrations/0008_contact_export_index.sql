@@ -0,0 +1,7 @@
+-- 0008_contact_export_index.sql
+-- Per-contact send history for the contact list export
+-- (app.models.contact.iter_contacts_for_export): last send time, send count
+-- and bounce status are aggregated straight from this index without touching
+-- the wide sent_emails rows.
+
+ALTER TABLE sent_emails ADD INDEX idx_sent_emails_contact (contact_id, sent_at, status);
@@ -0,0 +1,65 @@
+-- 0009_global_contacts.sql
+-- Turns contacts into one row per person, keyed by normalized email, with
+-- list_membership recording which lists each person belongs to. Existing
+-- per-list copies are merged into the oldest row for that email and
+-- sent_emails is repointed at it, so a person's history lives on one id.
+-- Every step here can be re-run while contacts.list_id exists; dropping it
+-- and the per-list indexes is left to 0015_drop_contact_list_id.sql.
+
+CREATE TABLE IF NOT EXISTS list_membership (
+    list_id INT NOT NULL,
+    contact_id INT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (list_id, contact_id),
+    KEY idx_list_membership_contact (contact_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE contacts
+    ADD COLUMN email_normalized VARCHAR(255) AS (LOWER(TRIM(email))) STORED,
+    ADD INDEX idx_contacts_email_normalized (email_normalized);
+
+-- old contact id -> surviving contact id
+CREATE TABLE IF NOT EXISTS contact_merge_map (
+    old_id INT PRIMARY KEY,
+    canonical_id INT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO contact_merge_map (old_id, canonical_id)
+SELECT c.id, canon.id
+FROM contacts c
+JOIN (SELECT email_normalized, MIN(id) AS id FROM contacts GROUP BY email_normalized) canon
+  ON canon.email_normalized = c.email_normalized;
+
+INSERT IGNORE INTO list_membership (list_id, contact_id, created_at)
+SELECT c.list_id, m.canonical_id, c.created_at
+FROM contacts c
+JOIN contact_merge_map m ON m.old_id = c.id;
+
+UPDATE sent_emails se
+JOIN contact_merge_map m ON m.old_id = se.contact_id
+SET se.contact_id = m.canonical_id
+WHERE m.old_id <> m.canonical_id;
+
+-- Keep the most recent validation result of the merged copies; copies
+-- validated at the same moment are decided by the highest id.
+UPDATE contacts c
+JOIN (
+    SELECT m.canonical_id,
+           (SELECT dup.id
+            FROM contact_merge_map m3
+            JOIN contacts dup ON dup.id = m3.old_id
+            WHERE m3.canonical_id = m.canonical_id AND dup.email_validated_at IS NOT NULL
+            ORDER BY dup.email_validated_at DESC, dup.id DESC
+            LIMIT 1) AS source_id
+    FROM contact_merge_map m
+    GROUP BY m.canonical_id
+) latest ON latest.canonical_id = c.id
+JOIN contacts src ON src.id = latest.source_id
+SET c.email_valid = src.email_valid, c.email_validated_at = src.email_validated_at;
+
+DELETE c FROM contacts c
+JOIN contact_merge_map m ON m.old_id = c.id
+WHERE m.old_id <> m.canonical_id;
+
+UPDATE lists l
+SET l.records = (SELECT COUNT(*) FROM list_membership lm WHERE lm.list_id = l.id);
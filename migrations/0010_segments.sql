@@ -0,0 +1,35 @@
+-- 0010_segments.sql
+-- Saved segments: a filter over contact fields and send history whose
+-- matching contacts are materialized in segment_membership, so a sequence
+-- can target a segment as cheaply as a list. Single-contact writes (manual
+-- adds, removals, sends) queue the contact in segment_dirty_contacts and a
+-- periodic task re-evaluates just those contacts.
+
+CREATE TABLE IF NOT EXISTS segments (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    created_by INT NOT NULL,
+    filter TEXT NOT NULL,
+    time_based TINYINT(1) NOT NULL DEFAULT 0,
+    records INT NOT NULL DEFAULT 0,
+    refreshed_at DATETIME NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS segment_membership (
+    segment_id INT NOT NULL,
+    contact_id INT NOT NULL,
+    PRIMARY KEY (segment_id, contact_id),
+    KEY idx_segment_membership_contact (contact_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS segment_dirty_contacts (
+    contact_id INT PRIMARY KEY,
+    marked_at DATETIME(6) NOT NULL,
+    KEY idx_segment_dirty_marked_at (marked_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE sequences
+    MODIFY list_id INT NULL,
+    ADD COLUMN segment_id INT NULL AFTER list_id,
+    ADD KEY idx_sequences_segment_id (segment_id);
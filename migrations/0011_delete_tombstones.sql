@@ -0,0 +1,9 @@
+-- 0011_delete_tombstones.sql
+-- Deleting a list or sequence now only sets deleted_at (the row disappears
+-- from every read at once); app.utils.background_deletes then removes its
+-- memberships/steps in small batches and finally the row itself.
+
+ALTER TABLE lists ADD COLUMN deleted_at DATETIME NULL;
+ALTER TABLE sequences ADD COLUMN deleted_at DATETIME NULL;
+ALTER TABLE lists ADD INDEX idx_lists_deleted_at (deleted_at);
+ALTER TABLE sequences ADD INDEX idx_sequences_deleted_at (deleted_at);
@@ -0,0 +1,31 @@
+-- 0012_email_stats_rollups.sql
+-- Hourly and daily send counts per (user, sequence, SMTP config, status),
+-- maintained by app.models.email_stats as emails are logged and bounced, so
+-- reports no longer scan sent_emails. sequence_id/smtp_config_id use 0 for
+-- "none" because they are part of the primary key. Fill them for existing
+-- data with `flask reports rebuild-rollups`.
+
+ALTER TABLE sent_emails ADD COLUMN smtp_config_id INT NULL AFTER step_id;
+
+CREATE TABLE IF NOT EXISTS email_stats_hourly (
+    bucket_hour DATETIME NOT NULL,
+    user_id INT NOT NULL,
+    sequence_id INT NOT NULL DEFAULT 0,
+    smtp_config_id INT NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL,
+    email_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_hour, user_id, sequence_id, smtp_config_id, status),
+    KEY idx_email_stats_hourly_user (user_id, bucket_hour)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS email_stats_daily (
+    bucket_date DATE NOT NULL,
+    user_id INT NOT NULL,
+    sequence_id INT NOT NULL DEFAULT 0,
+    smtp_config_id INT NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL,
+    email_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_date, user_id, sequence_id, smtp_config_id, status),
+    KEY idx_email_stats_daily_user (user_id, bucket_date),
+    KEY idx_email_stats_daily_status (status, bucket_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,24 @@
+-- 0013_user_email_stats.sql
+-- One row of running totals per user for the home page, updated by
+-- app.models.email_stats in the same transaction as every send and bounce,
+-- and reconciled hourly against the email_stats_daily rollup.
+
+CREATE TABLE IF NOT EXISTS user_email_stats (
+    user_id INT NOT NULL PRIMARY KEY,
+    total_sent BIGINT NOT NULL DEFAULT 0,
+    delivered BIGINT NOT NULL DEFAULT 0,
+    bounced_failed BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO user_email_stats (user_id, total_sent, delivered, bounced_failed)
+SELECT user_id,
+       SUM(email_count),
+       SUM(CASE WHEN status = 'sent' THEN email_count ELSE 0 END),
+       SUM(CASE WHEN status IN ('bounced', 'failed') THEN email_count ELSE 0 END)
+FROM email_stats_daily
+GROUP BY user_id
+ON DUPLICATE KEY UPDATE
+    total_sent = VALUES(total_sent),
+    delivered = VALUES(delivered),
+    bounced_failed = VALUES(bounced_failed);
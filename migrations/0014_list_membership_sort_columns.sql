@@ -0,0 +1,22 @@
+-- 0014_list_membership_sort_columns.sql
+-- 0015 drops the (list_id, column) contact indexes that 0007 added for the
+-- contact browser, since contacts no longer carry a list_id. The sortable and
+-- searchable columns are now copied onto list_membership (kept in step by
+-- app.models.contact on every contact upsert) and indexed there; with the
+-- (list_id, contact_id) primary key appended by InnoDB, keyset pages on
+-- (column, contact_id) within a list are index range scans again.
+
+ALTER TABLE list_membership
+    ADD COLUMN name VARCHAR(255) NOT NULL DEFAULT '',
+    ADD COLUMN email VARCHAR(255) NOT NULL DEFAULT '',
+    ADD COLUMN company_name VARCHAR(255) NOT NULL DEFAULT '',
+    ADD COLUMN location VARCHAR(255) NOT NULL DEFAULT '';
+
+UPDATE list_membership m
+JOIN contacts c ON c.id = m.contact_id
+SET m.name = c.name, m.email = c.email, m.company_name = c.company_name, m.location = c.location;
+
+ALTER TABLE list_membership ADD INDEX idx_list_membership_name (list_id, name);
+ALTER TABLE list_membership ADD INDEX idx_list_membership_email (list_id, email);
+ALTER TABLE list_membership ADD INDEX idx_list_membership_company (list_id, company_name);
+ALTER TABLE list_membership ADD INDEX idx_list_membership_location (list_id, location);
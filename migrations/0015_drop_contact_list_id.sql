@@ -0,0 +1,15 @@
+-- 0015_drop_contact_list_id.sql
+-- The destructive tail of 0009_global_contacts.sql, split out so 0009 can be
+-- re-run until it has finished. Every statement is safe to repeat: missing
+-- keys/columns (1091) and an existing unique key (1061) count as applied.
+-- On databases that applied the old 0009 in full this is a no-op.
+
+ALTER TABLE contacts DROP INDEX uq_contacts_list_email;
+ALTER TABLE contacts DROP INDEX idx_contacts_list_id;
+ALTER TABLE contacts DROP INDEX idx_contacts_list_name;
+ALTER TABLE contacts DROP INDEX idx_contacts_list_company;
+ALTER TABLE contacts DROP INDEX idx_contacts_list_location;
+ALTER TABLE contacts DROP INDEX idx_contacts_email_normalized;
+ALTER TABLE contacts ADD UNIQUE KEY uq_contacts_email_normalized (email_normalized);
+ALTER TABLE contacts DROP COLUMN list_id;
+DROP TABLE IF EXISTS contact_merge_map;
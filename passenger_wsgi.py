@@ -1 +1,7 @@
-from run import app as application
\ No newline at end of file
+import os
+
+# Passenger runs sync workers: an open Server-Sent Events stream would hold one
+# for as long as a dashboard stays open, so live pages poll instead.
+os.environ.setdefault('LIVE_EVENTS_ENABLED', 'false')
+
+from run import app as application
@@ -0,0 +1,11 @@
+# tests/conftest.py
+# The suite covers pure helpers only; no MySQL or Redis server is needed.
+
+import os
+import sys
+
+from cryptography.fernet import Fernet
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+# app.models.smtp_config refuses to import without a key.
+os.environ.setdefault('ENCRYPTION_KEY', Fernet.generate_key().decode())
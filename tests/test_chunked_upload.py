@@ -0,0 +1,81 @@
+# tests/test_chunked_upload.py
+
+import hashlib
+import io
+
+import pytest
+
+from app.config import Config
+from app.utils import chunked_upload
+from app.utils.chunked_upload import ChunkedUploadError
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'UPLOAD_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'UPLOAD_CHUNK_SIZE', 4)
+    return chunked_upload.create_upload(1, 'contacts.csv', 10, 'Leads')
+
+
+def test_chunks_are_stored_and_assembled_in_order(manifest, tmp_path):
+    assert manifest['total_chunks'] == 3
+    for index, data in reversed(list(enumerate([b'name', b',ema', b'il']))):
+        chunked_upload.save_chunk(manifest, index, io.BytesIO(data), _sha256(data))
+    assert chunked_upload.received_chunks(manifest) == [0, 1, 2]
+
+    destination = chunked_upload.assemble_upload(manifest, str(tmp_path / 'contacts.upload'))
+    with open(destination, 'rb') as assembled:
+        assert assembled.read() == b'name,email'
+    assert chunked_upload.load_upload(manifest['upload_id'], 1) is None
+
+
+def test_checksum_mismatch_is_rejected(manifest):
+    with pytest.raises(ChunkedUploadError) as error:
+        chunked_upload.save_chunk(manifest, 0, io.BytesIO(b'name'), _sha256(b'nope'))
+    assert error.value.status == 422
+    assert chunked_upload.received_chunks(manifest) == []
+
+
+def test_checksum_is_required(manifest):
+    with pytest.raises(ChunkedUploadError) as error:
+        chunked_upload.save_chunk(manifest, 0, io.BytesIO(b'name'), None)
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize('index, data, status', [
+    (0, b'nam', 400),       # short chunk
+    (0, b'names', 413),     # longer than the chunk size
+    (2, b'ila', 413),       # the last chunk is only 2 bytes
+    (3, b'xx', 400),        # index out of range
+])
+def test_chunk_size_and_index_are_checked(manifest, index, data, status):
+    with pytest.raises(ChunkedUploadError) as error:
+        chunked_upload.save_chunk(manifest, index, io.BytesIO(data), _sha256(data))
+    assert error.value.status == status
+    assert chunked_upload.received_chunks(manifest) == []
+
+
+def test_assembly_needs_every_chunk_and_can_be_retried(manifest, tmp_path):
+    chunked_upload.save_chunk(manifest, 0, io.BytesIO(b'name'), _sha256(b'name'))
+    with pytest.raises(ChunkedUploadError) as error:
+        chunked_upload.assemble_upload(manifest, str(tmp_path / 'contacts.upload'))
+    assert error.value.status == 409
+
+    for index, data in ((1, b',ema'), (2, b'il')):
+        chunked_upload.save_chunk(manifest, index, io.BytesIO(data), _sha256(data))
+    chunked_upload.assemble_upload(manifest, str(tmp_path / 'contacts.upload'))
+
+
+def test_concurrent_completion_gets_409(manifest, tmp_path):
+    for index, data in enumerate([b'name', b',ema', b'il']):
+        chunked_upload.save_chunk(manifest, index, io.BytesIO(data), _sha256(data))
+    lock_path = tmp_path / 'chunked' / manifest['upload_id'] / chunked_upload.ASSEMBLY_LOCK_NAME
+    lock_path.touch()  # another request is assembling
+    with pytest.raises(ChunkedUploadError) as error:
+        chunked_upload.assemble_upload(manifest, str(tmp_path / 'contacts.upload'))
+    assert error.value.status == 409
+    assert not (tmp_path / 'contacts.upload').exists()
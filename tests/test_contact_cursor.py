@@ -0,0 +1,28 @@
+# tests/test_contact_cursor.py
+
+import base64
+
+import pytest
+
+from app.routes.contact_routes import _decode_cursor, _encode_cursor
+
+
+@pytest.mark.parametrize('sort_value', ['Zoë Smith', '', None, 'a,b"c'])
+def test_cursor_round_trips(sort_value):
+    cursor = _encode_cursor(sort_value, 42)
+    assert _decode_cursor(cursor) == (sort_value, 42)
+
+
+def test_cursor_is_url_safe():
+    cursor = _encode_cursor('???>>>', 1)
+    assert '+' not in cursor and '/' not in cursor
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    base64.urlsafe_b64encode(b'{"a": 1}').decode('ascii'),
+    base64.urlsafe_b64encode(b'["x", "y"]').decode('ascii'),
+    base64.urlsafe_b64encode(b'["x", 1, 2]').decode('ascii'),
+])
+def test_invalid_cursors_are_rejected(cursor):
+    assert _decode_cursor(cursor) is None
@@ -0,0 +1,79 @@
+# tests/test_csv_validation.py
+
+import io
+
+import pytest
+
+from app.utils import csv_processor, email_validator
+
+pytest.importorskip('pandas')
+
+
+@pytest.fixture(autouse=True)
+def offline_domains(monkeypatch):
+    """Domain deliverability checks need DNS; treat example.* as deliverable."""
+    def is_valid_domain(domain):
+        return domain.startswith('example.')
+    monkeypatch.setattr(email_validator, 'is_valid_domain', is_valid_domain)
+    monkeypatch.setattr(csv_processor, 'is_valid_domain', is_valid_domain)
+
+
+def _both(text, **kwargs):
+    data = text.encode('utf-8')
+    row_wise = csv_processor.validate_csv_stream(io.BytesIO(data), **kwargs)
+    columnar = csv_processor.validate_csv_stream_columnar(io.BytesIO(data), chunk_rows=2, **kwargs)
+    return row_wise, columnar
+
+
+def test_valid_file_matches():
+    (ok, errors, stats), (c_ok, c_errors, c_stats) = _both(
+        "name,email,location\nAsha, asha@example.com ,Pune\nRavi,ravi@Example.ORG,\nMeera,meera@example.net,Delhi\n"
+    )
+    assert ok and c_ok
+    assert errors == c_errors == []
+    assert stats['rows_parsed'] == c_stats['rows_parsed'] == 3
+    assert stats['rows_valid'] == c_stats['rows_valid'] == 3
+
+
+def test_errors_match_across_chunks():
+    text = (
+        "name,email\n"
+        "Asha,asha@example.com\n"
+        ",blank@example.com\n"
+        "Ravi,not-an-email\n"
+        "Meera,meera@nowhere.invalid\n"
+        "Kiran,\n"
+    )
+    (ok, errors, stats), (c_ok, c_errors, c_stats) = _both(text)
+    assert not ok and not c_ok
+    assert errors == c_errors == [
+        "Row 3: Name or Email is blank.",
+        "Row 4: Email 'not-an-email' is not a valid format.",
+        "Row 5: Email 'meera@nowhere.invalid' is not a valid format.",
+        "Row 6: Name or Email is blank.",
+    ]
+    assert stats['rows_valid'] == c_stats['rows_valid'] == 1
+
+
+def test_trailing_extra_field_on_every_row_matches():
+    text = "name,email\nAsha,asha@example.com,extra\nRavi,,extra\nMeera,meera@example.com,extra\n"
+    (ok, errors, stats), (c_ok, c_errors, c_stats) = _both(text)
+    assert not ok and not c_ok
+    assert errors == c_errors == ["Row 3: Name or Email is blank."]
+    assert stats['rows_parsed'] == c_stats['rows_parsed'] == 3
+
+
+def test_error_report_is_capped_the_same_way():
+    text = "name,email\n" + "".join(f"Person {i},\n" for i in range(5))
+    (_ok, errors, _stats), (_c_ok, c_errors, _c_stats) = _both(text, max_errors=2)
+    assert errors == c_errors == [
+        "Row 2: Name or Email is blank.",
+        "Row 3: Name or Email is blank.",
+        "...and 3 more errors.",
+    ]
+
+
+def test_columnar_counts_duplicates_case_insensitively_by_domain():
+    text = "name,email\nAsha,asha@example.com\nAsha,asha@EXAMPLE.com\nRavi,ravi@example.com\n"
+    _ok, _errors, stats = csv_processor.validate_csv_stream_columnar(io.BytesIO(text.encode('utf-8')))
+    assert stats['duplicates'] == 1
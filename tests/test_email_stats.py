@@ -0,0 +1,110 @@
+# tests/test_email_stats.py
+
+from datetime import datetime
+
+from app.models import email_stats
+
+
+class FakeCursor:
+    """Records executed statements and answers fetchone() from a script."""
+
+    def __init__(self, results=()):
+        self.executed = []
+        self._results = list(results)
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchone(self):
+        return self._results.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = self.rolled_back = False
+
+    def cursor(self, *args, **kwargs):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+SENT_AT = datetime(2024, 5, 17, 14, 35, 12)
+
+
+def _params_by_table(cursor):
+    tables = {}
+    for query, params in cursor.executed:
+        table = query.split('INSERT INTO')[1].split()[0]
+        tables.setdefault(table, []).append(params)
+    return tables
+
+
+def test_record_email_stats_buckets_and_user_totals():
+    cursor = FakeCursor()
+    email_stats.record_email_stats(cursor, SENT_AT, 7, None, 3, 'sent')
+    tables = _params_by_table(cursor)
+    assert tables['email_stats_hourly'] == [(datetime(2024, 5, 17, 14), 7, 0, 3, 'sent', 1)]
+    assert tables['email_stats_daily'] == [(SENT_AT.date(), 7, 0, 3, 'sent', 1)]
+    assert tables['user_email_stats'] == [(7, 1, 1, 0)]
+    # The user row is locked last, after the rollup rows.
+    assert 'user_email_stats' in cursor.executed[-1][0]
+
+
+def test_record_email_stats_failed_counts_as_bounced_failed():
+    cursor = FakeCursor()
+    email_stats.record_email_stats(cursor, SENT_AT, 7, 2, None, 'failed')
+    assert _params_by_table(cursor)['user_email_stats'] == [(7, 1, 0, 1)]
+
+
+def test_shift_email_stats_moves_one_email_between_statuses():
+    cursor = FakeCursor()
+    email = {'user_id': 7, 'sequence_id': 2, 'smtp_config_id': 3, 'sent_at': SENT_AT}
+    email_stats.shift_email_stats(cursor, email, 'sent', 'bounced')
+    tables = _params_by_table(cursor)
+    assert tables['email_stats_daily'] == [
+        (SENT_AT.date(), 7, 2, 3, 'sent', -1),
+        (SENT_AT.date(), 7, 2, 3, 'bounced', 1),
+    ]
+    assert tables['email_stats_hourly'][0][0] == tables['email_stats_hourly'][1][0] == datetime(2024, 5, 17, 14)
+    # Total unchanged, one fewer delivered, one more bounced.
+    user_rows = tables['user_email_stats']
+    assert [sum(column) for column in zip(*(row[1:] for row in user_rows))] == [0, -1, 1]
+
+
+def test_reconcile_user_row_leaves_a_correct_row_alone(monkeypatch):
+    cursor = FakeCursor([(10, 8, 2), (10, 8, 2)])
+    conn = FakeConnection(cursor)
+    monkeypatch.setattr(email_stats, 'get_db_connection', lambda: conn)
+    assert email_stats.reconcile_user_email_stats_row(7) is False
+    assert conn.rolled_back and not conn.committed
+    assert len(cursor.executed) == 2
+
+
+def test_reconcile_user_row_rewrites_a_drifted_row(monkeypatch):
+    cursor = FakeCursor([(10, 9, 1), (10, 8, 2)])
+    conn = FakeConnection(cursor)
+    monkeypatch.setattr(email_stats, 'get_db_connection', lambda: conn)
+    assert email_stats.reconcile_user_email_stats_row(7) is True
+    assert conn.committed
+    assert 'FOR UPDATE' in cursor.executed[0][0]
+    assert cursor.executed[-1][1] == (7, 10, 8, 2)
+
+
+def test_reconcile_user_row_creates_a_missing_row(monkeypatch):
+    cursor = FakeCursor([None, (3, 3, 0)])
+    conn = FakeConnection(cursor)
+    monkeypatch.setattr(email_stats, 'get_db_connection', lambda: conn)
+    assert email_stats.reconcile_user_email_stats_row(7) is True
+    assert cursor.executed[-1][1] == (7, 3, 3, 0)
@@ -0,0 +1,74 @@
+# tests/test_query_profiler.py
+
+import pytest
+
+from app.config import Config
+from app.utils import query_profiler
+from app.utils.query_profiler import QueryReport, QueryStats, fingerprint
+
+
+@pytest.mark.parametrize('statement, expected', [
+    ("SELECT * FROM contacts WHERE id = 42", "SELECT * FROM contacts WHERE id = ?"),
+    ("SELECT * FROM t WHERE name = 'O\\'Brien' AND x = 1.5", "SELECT * FROM t WHERE name = ? AND x = ?"),
+    ("SELECT id FROM t WHERE id IN (%s, %s, %s)", "SELECT id FROM t WHERE id IN (...)"),
+    ("SELECT id FROM t WHERE id IN (%s)", "SELECT id FROM t WHERE id IN (...)"),
+    ("  UPDATE t\n   SET a = %s\n  WHERE id = %s;", "UPDATE t SET a = %s WHERE id = %s"),
+])
+def test_fingerprint_groups_calls_that_differ_only_in_literals(statement, expected):
+    assert fingerprint(statement) == expected
+
+
+def test_fingerprint_keeps_digits_inside_identifiers():
+    assert fingerprint("SELECT * FROM email_stats_daily") == "SELECT * FROM email_stats_daily"
+
+
+def test_stats_track_calls_rows_max_and_slow_calls(monkeypatch):
+    monkeypatch.setattr(Config, 'SLOW_QUERY_MS', 100)
+    stats = QueryStats('contacts.list')
+    stats.record('q', 5.0, 1)
+    stats.record('q', 150.0, -1)  # rowcount is -1 for unknown
+    stats.add_fetch('q', 2.0, 10)
+    stats.add_fetch('unknown', 1.0, 3)
+    assert stats.statements['q'] == [2, 157.0, 11, 150.0, 1]
+    assert stats.query_count == 2
+    assert stats.total_ms == 157.0
+
+
+def test_repeated_statements_use_the_threshold():
+    stats = QueryStats('loop')
+    for _ in range(3):
+        stats.record('SELECT ?', 1.0, 1)
+    stats.record('other', 1.0, 1)
+    assert stats.repeated_statements(2) == [('SELECT ?', 3)]
+    assert stats.repeated_statements(3) == []
+    assert stats.summary_header(2).endswith('repeated=1')
+
+
+def test_report_merges_the_real_max_and_slow_calls(monkeypatch):
+    monkeypatch.setattr(Config, 'SLOW_QUERY_MS', 100)
+    report = QueryReport()
+    first, second = QueryStats('a'), QueryStats('b')
+    first.record('q', 10.0, 0)
+    first.record('q', 300.0, 0)
+    second.record('q', 20.0, 0)
+    report.merge(first, threshold=10)
+    report.merge(second, threshold=1)
+    [entry] = report.snapshot()['statements']
+    assert entry['calls'] == 3
+    assert entry['max_ms'] == 300.0
+    assert entry['avg_ms'] == 110.0
+    assert entry['slow_calls'] == 1
+    assert entry['sources'] == ['a', 'b']
+    assert report.snapshot()['units']['a']['max_queries'] == 2
+
+
+def test_report_caps_distinct_statements(monkeypatch):
+    monkeypatch.setattr(query_profiler, 'MAX_REPORTED_STATEMENTS', 2)
+    report = QueryReport()
+    stats = QueryStats('x')
+    for statement in ('a', 'b', 'c'):
+        stats.record(statement, 1.0, 0)
+    report.merge(stats, threshold=10)
+    assert len(report.snapshot()['statements']) == 2
+    report.reset()
+    assert report.snapshot()['statements'] == []
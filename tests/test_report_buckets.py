@@ -0,0 +1,43 @@
+# tests/test_report_buckets.py
+
+from datetime import datetime
+
+import pytest
+
+from app.models import reports
+
+
+def test_hour_buckets_start_on_the_hour():
+    buckets = reports._series_buckets(datetime(2024, 5, 1, 10, 30), datetime(2024, 5, 1, 13), 'hour')
+    assert buckets == [datetime(2024, 5, 1, 10), datetime(2024, 5, 1, 11), datetime(2024, 5, 1, 12)]
+
+
+def test_day_buckets_cover_a_partial_last_day():
+    buckets = reports._series_buckets(datetime(2024, 2, 28), datetime(2024, 3, 1, 6), 'day')
+    assert buckets == [datetime(2024, 2, 28), datetime(2024, 2, 29), datetime(2024, 3, 1)]
+
+
+def test_week_buckets_start_on_monday():
+    # 2024-05-01 is a Wednesday.
+    buckets = reports._series_buckets(datetime(2024, 5, 1), datetime(2024, 5, 14), 'week')
+    assert buckets == [datetime(2024, 4, 29), datetime(2024, 5, 6), datetime(2024, 5, 13)]
+    assert all(bucket.weekday() == 0 for bucket in buckets)
+
+
+def test_series_rejects_bad_ranges_before_querying():
+    with pytest.raises(reports.ReportRangeError):
+        reports.get_email_series(datetime(2024, 5, 2), datetime(2024, 5, 1))
+    with pytest.raises(reports.ReportRangeError):
+        reports.get_email_series(datetime(2024, 1, 1), datetime(2024, 5, 1), granularity='minute')
+    with pytest.raises(reports.ReportRangeError):
+        reports.get_email_series(datetime(2024, 1, 1), datetime(2024, 5, 1), granularity='hour')
+def test_calendar_version_keys_span_every_month_across_a_year_end():
+    keys = reports._calendar_version_keys(datetime(2024, 11, 20), datetime(2025, 1, 5))
+    assert keys == [
+        'reports:calendar_version:2024-11',
+        'reports:calendar_version:2024-12',
+        'reports:calendar_version:2025-01',
+    ]
+    assert reports._calendar_version_keys(datetime(2024, 3, 1), datetime(2024, 3, 31)) == [
+        'reports:calendar_version:2024-03'
+    ]
@@ -0,0 +1,60 @@
+# tests/test_segment_filter.py
+
+import pytest
+
+from app.models.segment import SegmentFilterError, compile_segment_filter
+
+
+def test_all_conditions_are_joined_with_and():
+    sql, params, time_based = compile_segment_filter({'match': 'all', 'conditions': [
+        {'field': 'location', 'op': 'eq', 'value': ' Pune '},
+        {'field': 'company_name', 'op': 'starts_with', 'value': 'Acme'},
+    ]})
+    assert sql == "(c.location = %s) AND (c.company_name LIKE %s)"
+    assert params == ['Pune', 'Acme%']
+    assert time_based is False
+
+
+def test_any_uses_or_and_like_wildcards_are_escaped():
+    sql, params, _time_based = compile_segment_filter({'match': 'any', 'conditions': [
+        {'field': 'name', 'op': 'contains', 'value': '50%_off'},
+        {'field': 'email', 'op': 'neq', 'value': 'a@example.com'},
+    ]})
+    assert ' OR ' in sql
+    assert params == ['%50\\%\\_off%', 'a@example.com']
+
+
+def test_list_membership_skips_deleted_lists():
+    sql, params, _time_based = compile_segment_filter({'conditions': [
+        {'field': 'list', 'op': 'not_member_of', 'value': '12'},
+    ]})
+    assert sql.startswith('(NOT EXISTS')
+    assert 'l.deleted_at IS NULL' in sql
+    assert params == [12]
+
+
+def test_last_sent_is_time_based():
+    sql, params, time_based = compile_segment_filter({'conditions': [
+        {'field': 'last_sent', 'op': 'not_within_days', 'value': 14},
+        {'field': 'bounced', 'op': 'is', 'value': False},
+    ]})
+    assert params == [14]
+    assert time_based is True
+    assert sql.count('NOT EXISTS') == 2
+
+
+@pytest.mark.parametrize('filters', [
+    [],
+    {'match': 'some', 'conditions': [{'field': 'name', 'op': 'eq', 'value': 'x'}]},
+    {'conditions': []},
+    {'conditions': ['name = x']},
+    {'conditions': [{'field': 'phone', 'op': 'eq', 'value': '1'}]},
+    {'conditions': [{'field': 'name', 'op': 'within_days', 'value': 1}]},
+    {'conditions': [{'field': 'name', 'op': 'eq', 'value': '  '}]},
+    {'conditions': [{'field': 'list', 'op': 'member_of', 'value': 'abc'}]},
+    {'conditions': [{'field': 'last_sent', 'op': 'within_days', 'value': 0}]},
+    {'conditions': [{'field': 'bounced', 'op': 'is', 'value': 'yes'}]},
+])
+def test_malformed_filters_are_rejected(filters):
+    with pytest.raises(SegmentFilterError):
+        compile_segment_filter(filters)